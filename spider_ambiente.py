@@ -0,0 +1,266 @@
+"""Ambiente no estilo Gym para treinar agentes, simples e vetorizado.
+
+``AmbienteSpider`` segue a API do Gymnasium sem depender dele:
+``reset(seed) -> (obs, info)``, ``step(acao) -> (obs, recompensa, terminou,
+truncou, info)`` e ``legal_action_mask()``. As ações são as de ``spider_lote``
+(``codificar_acao(src, qtd, dst)`` e ``ACAO_DISTRIBUIR``).
+
+A observação é um array int8 ``[11, 104]`` reescrito no lugar, só nas colunas
+cuja ``Pilha.versao`` mudou: as linhas 0-9 são as colunas (código da carta,
+``OCULTA`` para carta virada para baixo, ``VAZIO`` depois do topo) e a linha
+10 traz ``[cartas no estoque, sequências na fundação]``.
+
+``AmbientesParalelos`` roda K ambientes em subprocessos que escrevem
+observações, máscaras e recompensas direto em ``shared_memory``; o processo
+principal lê views NumPy desses buffers, sem cópia.
+"""
+import multiprocessing as mp
+import random
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from spider_estado import INDICE_NAIPE
+from spider_lote import ACAO_DISTRIBUIR, ALTURA_MAX, N_ACOES, N_PILHAS, codificar_acao, decodificar_acao
+from spider_regras import Baralho, Jogo
+
+OBS_FORMA = (N_PILHAS + 1, ALTURA_MAX)
+VAZIO = -1
+OCULTA = -2
+
+RECOMPENSA_SEQUENCIA = 1.0
+RECOMPENSA_REVELAR = 0.1
+PENALIDADE_INVALIDA = -0.1
+LIMITE_PASSOS = 1000
+
+
+class AmbienteSpider:
+    """Uma partida. ``obs`` pode ser um buffer externo (ex.: fatia de memória compartilhada)."""
+
+    def __init__(self, obs: Optional[np.ndarray] = None, limite_passos: int = LIMITE_PASSOS):
+        self.obs = obs if obs is not None else np.empty(OBS_FORMA, dtype=np.int8)
+        self.limite_passos = limite_passos
+        self.jogo: Optional[Jogo] = None
+        self.semente: Optional[int] = None
+        self.passos = 0
+        self._versoes = [-1] * N_PILHAS
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[np.ndarray, Dict]:
+        self.semente = seed if seed is not None else random.getrandbits(64)
+        self.jogo = Jogo(Baralho(semente=self.semente))
+        self.jogo.iniciar_jogo()
+        self.passos = 0
+        self._versoes = [-1] * N_PILHAS
+        self.obs[N_PILHAS] = 0
+        self._observar()
+        return self.obs, {"semente": self.semente}
+
+    def _observar(self):
+        jogo = self.jogo
+        for p, pilha in enumerate(jogo.tableau):
+            if pilha.versao == self._versoes[p]:
+                continue
+            self._versoes[p] = pilha.versao
+            linha = self.obs[p]
+            n = len(pilha.cartas)
+            linha[:n] = [INDICE_NAIPE[c.naipe] * 13 + c.valor - 1 if c.virada_para_cima else OCULTA
+                         for c in pilha.cartas]
+            linha[n:] = VAZIO
+        self.obs[N_PILHAS, 0] = jogo.estoque.restante()
+        self.obs[N_PILHAS, 1] = len(jogo.fundacao)
+
+    def legal_action_mask(self) -> np.ndarray:
+        mascara = np.zeros(N_ACOES, dtype=bool)
+        self.mascara_em(mascara)
+        return mascara
+
+    def mascara_em(self, mascara: np.ndarray):
+        # Preenche um buffer já existente (usado pela versão paralela)
+        mascara[:] = False
+        movs = self.jogo.movimentos_validos()
+        if movs:
+            mascara[[codificar_acao(*m) for m in movs]] = True
+        mascara[ACAO_DISTRIBUIR] = self.jogo.pode_distribuir()
+
+    def _terminou(self) -> bool:
+        return self.jogo.verificar_vitoria() or self.jogo.sem_movimentos_validos()
+
+    def step(self, acao: int) -> Tuple[np.ndarray, float, bool, bool, Dict]:
+        jogo = self.jogo
+        fundacao = len(jogo.fundacao)
+        ocultas = sum(p._indice_inicio_bloco_visivel() for p in jogo.tableau)
+
+        if acao == ACAO_DISTRIBUIR:
+            valida = jogo.distribuir_estoque()
+        elif 0 <= acao < ACAO_DISTRIBUIR:
+            valida = jogo.mover(*decodificar_acao(acao))
+        else:
+            valida = False
+
+        self.passos += 1
+        if valida:
+            self._observar()
+            reveladas = ocultas - sum(p._indice_inicio_bloco_visivel() for p in jogo.tableau)
+            recompensa = (RECOMPENSA_SEQUENCIA * (len(jogo.fundacao) - fundacao)
+                          + RECOMPENSA_REVELAR * max(reveladas, 0))
+        else:
+            recompensa = PENALIDADE_INVALIDA
+        vitoria = jogo.verificar_vitoria()
+        terminou = vitoria or self._terminou()
+        truncou = not terminou and self.passos >= self.limite_passos
+        return self.obs, recompensa, terminou, truncou, {"valida": valida, "vitoria": vitoria}
+
+
+# ===== VERSÃO PARALELA =====
+
+def _tamanho_buffers(k: int) -> int:
+    off = 2 * k * OBS_FORMA[0] * OBS_FORMA[1] + k * N_ACOES
+    off = (off + 7) & ~7
+    return off + 8 * k + 4 * k + 2 * k
+
+
+def _views(buf, k: int):
+    # Layout do bloco compartilhado:
+    # obs | obs final | máscara | (alinha 8) ações | recompensas | terminou | truncou
+    off = k * OBS_FORMA[0] * OBS_FORMA[1]
+    obs = np.ndarray((k,) + OBS_FORMA, dtype=np.int8, buffer=buf)
+    obs_final = np.ndarray((k,) + OBS_FORMA, dtype=np.int8, buffer=buf, offset=off)
+    off *= 2
+    mascara = np.ndarray((k, N_ACOES), dtype=bool, buffer=buf, offset=off)
+    off = (off + k * N_ACOES + 7) & ~7
+    acoes = np.ndarray((k,), dtype=np.int64, buffer=buf, offset=off)
+    off += 8 * k
+    recompensas = np.ndarray((k,), dtype=np.float32, buffer=buf, offset=off)
+    off += 4 * k
+    terminou = np.ndarray((k,), dtype=bool, buffer=buf, offset=off)
+    truncou = np.ndarray((k,), dtype=bool, buffer=buf, offset=off + k)
+    return obs, obs_final, mascara, acoes, recompensas, terminou, truncou
+
+
+def _trabalhador(conexao, nome: str, k: int, indices: List[int], limite_passos: int):
+    shm = shared_memory.SharedMemory(name=nome)
+    obs, obs_final, mascara, acoes, recompensas, terminou, truncou = _views(shm.buf, k)
+    ambientes = {i: AmbienteSpider(obs[i], limite_passos) for i in indices}
+    try:
+        while True:
+            cmd, arg = conexao.recv()
+            if cmd == "reset":
+                for i in indices:
+                    ambientes[i].reset(arg[i])
+                    ambientes[i].mascara_em(mascara[i])
+                terminou[indices] = False
+                truncou[indices] = False
+                recompensas[indices] = 0.0
+                conexao.send(None)
+            elif cmd == "step":
+                sementes = {}
+                for i in indices:
+                    amb = ambientes[i]
+                    _, r, term, trunc, _ = amb.step(int(acoes[i]))
+                    recompensas[i] = r
+                    terminou[i] = term
+                    truncou[i] = trunc
+                    if term or trunc:
+                        # Reinício automático: a observação já é da partida nova e
+                        # a última da que acabou fica em obs_final
+                        obs_final[i] = obs[i]
+                        sementes[i] = amb.semente
+                        amb.reset()
+                    amb.mascara_em(mascara[i])
+                conexao.send(sementes)
+            elif cmd == "fechar":
+                break
+    finally:
+        # As views precisam sumir antes de fechar o bloco
+        ambientes.clear()
+        del obs, obs_final, mascara, acoes, recompensas, terminou, truncou
+        shm.close()
+        conexao.close()
+
+
+class AmbientesParalelos:
+    """K ambientes em ``processos`` subprocessos, com estado em memória compartilhada.
+
+    ``obs``, ``mascara``, ``recompensas``, ``terminou`` e ``truncou`` são views
+    do bloco compartilhado, atualizadas no lugar a cada ``step``. Quem precisar
+    guardar um passo deve copiar. Ambiente que termina é reiniciado na hora
+    (semente aleatória): ``info["sementes_finalizadas"]`` diz de qual partida
+    ele veio e, como no Gymnasium, ``info["final_observation"]`` (array de
+    objetos, None para quem não terminou; ``info["_final_observation"]`` é a
+    máscara) traz a última observação dela, já copiada.
+    """
+
+    def __init__(self, k: int, processos: Optional[int] = None,
+                 limite_passos: int = LIMITE_PASSOS, contexto: str = "spawn"):
+        self.k = k
+        processos = max(1, min(processos or mp.cpu_count(), k))
+        self._shm = shared_memory.SharedMemory(create=True, size=_tamanho_buffers(k))
+        (self.obs, self._obs_final, self.mascara, self._acoes, self.recompensas,
+         self.terminou, self.truncou) = _views(self._shm.buf, k)
+        ctx = mp.get_context(contexto)
+        self._conexoes = []
+        self._processos = []
+        for w in range(processos):
+            indices = list(range(w, k, processos))
+            pai, filho = ctx.Pipe()
+            proc = ctx.Process(target=_trabalhador, daemon=True,
+                               args=(filho, self._shm.name, k, indices, limite_passos))
+            proc.start()
+            filho.close()
+            self._conexoes.append(pai)
+            self._processos.append(proc)
+
+    def reset(self, seeds: Optional[Sequence[Optional[int]]] = None) -> Tuple[np.ndarray, Dict]:
+        seeds = list(seeds) if seeds is not None else [None] * self.k
+        for c in self._conexoes:
+            c.send(("reset", seeds))
+        for c in self._conexoes:
+            c.recv()
+        return self.obs, {}
+
+    def legal_action_mask(self) -> np.ndarray:
+        return self.mascara
+
+    def step(self, acoes: Sequence[int]):
+        self._acoes[:] = acoes
+        for c in self._conexoes:
+            c.send(("step", None))
+        finalizadas = {}
+        for c in self._conexoes:
+            finalizadas.update(c.recv())
+        final = np.full(self.k, None, dtype=object)
+        acabou = np.zeros(self.k, dtype=bool)
+        for i in finalizadas:
+            final[i] = self._obs_final[i].copy()
+            acabou[i] = True
+        return (self.obs, self.recompensas, self.terminou, self.truncou,
+                {"sementes_finalizadas": finalizadas, "final_observation": final,
+                 "_final_observation": acabou})
+
+    def close(self):
+        if self._shm is None:
+            return
+        for c in self._conexoes:
+            try:
+                c.send(("fechar", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for p in self._processos:
+            p.join(timeout=2.0)
+            if p.is_alive():
+                p.terminate()
+        del (self.obs, self._obs_final, self.mascara, self._acoes, self.recompensas,
+             self.terminou, self.truncou)
+        try:
+            self._shm.close()
+        except BufferError:
+            pass  # ainda há views do chamador; o bloco some quando elas forem liberadas
+        self._shm.unlink()
+        self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
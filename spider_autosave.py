@@ -0,0 +1,325 @@
+"""Salvamento automático da partida em andamento, resistente a queda do processo.
+
+Dois arquivos no diretório de autosave:
+
+    instantaneo.spas : b"SPAS" | versão u16 | reservado u16 | partida u64 | ações u32 | jogo
+    registro.spaj    : b"SPAJ" | versão u16 | reservado u16 | partida u64 | base u32 | ação u16*
+
+``jogo`` é o estado inteiro (ordem do baralho, tableau, fundação e o
+histórico de desfazer/refazer); as ações do registro usam os códigos de
+``spider_replay``. O registro só cresce: cada jogada vira 2 bytes numa fila
+que uma thread grava em lotes (com fsync), sem travar o quadro. A cada
+``instantaneo_a_cada`` ações a mesma thread grava um instantâneo novo
+(arquivo temporário + ``os.replace``) e recomeça o registro a partir dele.
+Se uma gravação falhar, o registro aberto para de crescer até o próximo
+instantâneo que der certo: o que está no disco continua sendo um prefixo da
+partida.
+
+Para retomar, ``recuperar`` carrega o instantâneo e reaplica as ações do
+registro que vieram depois dele; um fim de registro cortado no meio de uma
+ação é ignorado.
+"""
+import os
+import queue
+import secrets
+import struct
+import sys
+import threading
+import time
+from array import array
+from typing import Optional, Tuple
+
+from spider_estado import INDICE_NAIPE, NAIPES, codificar, naipe_de, valor_de
+from spider_regras import Baralho, Carta, Jogada, Jogo
+from spider_replay import (
+    ACAO_DESFAZER, ACAO_DISTRIBUIR, ACAO_REFAZER, aplicar_acao, codificar_movimento,
+)
+
+VERSAO = 1
+CABECALHO_INSTANTANEO = struct.Struct("<4sHHQI")
+CABECALHO_REGISTRO = struct.Struct("<4sHHQI")
+ARQUIVO_INSTANTANEO = "instantaneo.spas"
+ARQUIVO_REGISTRO = "registro.spaj"
+
+INSTANTANEO_A_CADA = 100
+# Janela em que a thread junta jogadas antes de gravar (e fazer fsync) de uma vez
+INTERVALO_LOTE = 0.05
+
+_BARALHO = struct.Struct("<BQBB")  # tem semente, semente, cartas, já sacadas
+_PILHA = struct.Struct("<BB")  # cartas, viradas para baixo
+_JOGADA = struct.Struct("<BBBB")  # src, qtd, dst, flags (255 = distribuição)
+
+
+# ===== SERIALIZAÇÃO =====
+
+def serializar_jogo(jogo: Jogo) -> bytes:
+    baralho = jogo.estoque
+    semente = baralho.semente
+    partes = [_BARALHO.pack(semente is not None, semente or 0, len(baralho.cartas), baralho.pos),
+              bytes(codificar(c.valor, c.naipe) for c in baralho.cartas)]
+    for pilha in jogo.tableau:
+        cartas = pilha.cartas
+        ocultas = pilha._indice_inicio_bloco_visivel()
+        partes.append(_PILHA.pack(len(cartas), ocultas))
+        partes.append(bytes(codificar(c.valor, c.naipe) for c in cartas))
+    partes.append(bytes([len(jogo.fundacao)]))
+    partes.append(bytes(INDICE_NAIPE[seq[0].naipe] for seq in jogo.fundacao))
+    for jogadas in (jogo.diario.feitas, jogo.diario.desfeitas):
+        partes.append(struct.pack("<H", len(jogadas)))
+        partes.extend(_JOGADA.pack(j.src & 0xFF, j.qtd, j.dst & 0xFF,
+                                   j.virou_origem | j.completou << 1 | j.virou_destino << 2)
+                      for j in jogadas)
+    return b"".join(partes)
+
+
+def desserializar_jogo(dados: bytes) -> Jogo:
+    tem_semente, semente, n, pos = _BARALHO.unpack_from(dados)
+    k = _BARALHO.size
+    baralho = Baralho([Carta(valor_de(c), naipe_de(c), False) for c in dados[k:k + n]],
+                      semente if tem_semente else None)
+    baralho.pos = pos
+    k += n
+    jogo = Jogo(baralho)
+    for pilha in jogo.tableau:
+        n, ocultas = _PILHA.unpack_from(dados, k)
+        k += _PILHA.size
+        pilha.push([Carta(valor_de(c), naipe_de(c), i >= ocultas)
+                    for i, c in enumerate(dados[k:k + n])])
+        k += n
+    n = dados[k]
+    for naipe in dados[k + 1:k + 1 + n]:
+        jogo.fundacao.append([Carta(v, NAIPES[naipe], True) for v in range(13, 0, -1)])
+    k += 1 + n
+    for jogadas in (jogo.diario.feitas, jogo.diario.desfeitas):
+        (n,) = struct.unpack_from("<H", dados, k)
+        k += 2
+        for _ in range(n):
+            src, qtd, dst, flags = _JOGADA.unpack_from(dados, k)
+            k += _JOGADA.size
+            jogadas.append(Jogada(-1 if src == 255 else src, qtd, -1 if dst == 255 else dst,
+                                  bool(flags & 1), bool(flags & 2), bool(flags & 4)))
+    return jogo
+
+
+# ===== GRAVAÇÃO =====
+
+def _gravar_atomico(caminho: str, dados: bytes):
+    temp = caminho + ".tmp"
+    with open(temp, "wb") as f:
+        f.write(dados)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp, caminho)
+    if hasattr(os, "O_DIRECTORY"):
+        # Sem isso a troca de nome pode não sobreviver a uma queda de energia
+        fd = os.open(os.path.dirname(caminho) or ".", os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class Autosave:
+    """Salva a partida ligada por ``iniciar`` numa thread de fundo.
+
+    Entra no lugar de ``Jogo.gravador`` e repassa cada aviso ao gravador que
+    já estava lá (ex.: ``GravadorReplay``). Do lado do jogo, uma jogada custa
+    só um ``put`` na fila; o instantâneo é serializado aqui, mas gravado pela
+    thread.
+    """
+
+    def __init__(self, diretorio: str, instantaneo_a_cada: int = INSTANTANEO_A_CADA,
+                 intervalo: float = INTERVALO_LOTE):
+        self.diretorio = diretorio
+        self.instantaneo_a_cada = instantaneo_a_cada
+        self.intervalo = intervalo
+        self.jogo: Optional[Jogo] = None
+        self.repassar = None
+        self.partida = 0
+        self.acoes = 0
+        self.erro: Optional[OSError] = None
+        os.makedirs(diretorio, exist_ok=True)
+        self._fila: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._laco, name="spider-autosave", daemon=True)
+        self._thread.start()
+
+    def iniciar(self, jogo: Jogo):
+        """Passa a salvar ``jogo`` (partida nova ou retomada), a partir de um instantâneo."""
+        self.jogo = jogo
+        self.repassar = jogo.gravador
+        jogo.gravador = self
+        self.partida = secrets.randbits(64)
+        self.acoes = 0
+        self._instantaneo()
+
+    def _instantaneo(self):
+        cabecalho = CABECALHO_INSTANTANEO.pack(b"SPAS", VERSAO, 0, self.partida, self.acoes)
+        self._fila.put((self.partida, self.acoes, cabecalho + serializar_jogo(self.jogo)))
+
+    def _acao(self, codigo: int):
+        self.acoes += 1
+        if self.acoes % self.instantaneo_a_cada == 0:
+            self._instantaneo()
+        else:
+            self._fila.put(codigo)
+
+    # ----- interface de Jogo.gravador -----
+    def mover(self, src: int, qtd: int, dst: int):
+        if self.repassar is not None:
+            self.repassar.mover(src, qtd, dst)
+        self._acao(codificar_movimento(src, qtd, dst))
+
+    def distribuir(self):
+        if self.repassar is not None:
+            self.repassar.distribuir()
+        self._acao(ACAO_DISTRIBUIR)
+
+    def desfazer(self):
+        if self.repassar is not None:
+            self.repassar.desfazer()
+        self._acao(ACAO_DESFAZER)
+
+    def refazer(self):
+        if self.repassar is not None:
+            self.repassar.refazer()
+        self._acao(ACAO_REFAZER)
+
+    # ----- thread de gravação -----
+    def _laco(self):
+        registro = None
+        parar = False
+        while not parar:
+            lote = [self._fila.get()]
+            limite = time.monotonic() + self.intervalo
+            # Fecha o lote antes da hora quando alguém espera por ele
+            while lote[-1] is not None and not isinstance(lote[-1], threading.Event):
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    lote.append(self._fila.get(timeout=restante))
+                except queue.Empty:
+                    break
+            pendentes = array("H")
+            avisar = []
+            for item in lote:
+                if item is None:
+                    parar = True
+                elif isinstance(item, int):
+                    pendentes.append(item)
+                elif isinstance(item, threading.Event):
+                    avisar.append(item)
+                else:
+                    partida, acoes, dados = item
+                    try:
+                        _gravar_atomico(os.path.join(self.diretorio, ARQUIVO_INSTANTANEO), dados)
+                    except OSError as e:
+                        self._falhou(e)
+                        # O instantâneo antigo continua valendo: o registro dele recebe as
+                        # ações anteriores a este e para aqui, já que a ação que pediu o
+                        # instantâneo não está na fila (continuar deixaria um buraco)
+                        registro = self._anexar(registro, pendentes)
+                        if registro is not None:
+                            registro.close()
+                            registro = None
+                        del pendentes[:]
+                        continue
+                    # As ações ainda não gravadas já estão dentro do instantâneo
+                    del pendentes[:]
+                    if registro is not None:
+                        registro.close()
+                        registro = None
+                    try:
+                        registro = open(os.path.join(self.diretorio, ARQUIVO_REGISTRO), "wb")
+                        registro.write(CABECALHO_REGISTRO.pack(b"SPAJ", VERSAO, 0, partida, acoes))
+                    except OSError as e:
+                        self._falhou(e)
+                        if registro is not None:
+                            registro.close()
+                            registro = None
+            registro = self._anexar(registro, pendentes)
+            for gravado in avisar:
+                gravado.set()
+        if registro is not None:
+            registro.close()
+
+    def _anexar(self, registro, pendentes: array):
+        # Devolve o registro, ou None se a escrita falhou: daí em diante ele não recebe
+        # mais nada até o próximo instantâneo, senão a recuperação pularia ações
+        if not pendentes or registro is None:
+            return registro
+        if sys.byteorder == "big":
+            pendentes.byteswap()
+        try:
+            registro.write(pendentes.tobytes())
+            registro.flush()
+            os.fsync(registro.fileno())
+        except OSError as e:
+            self._falhou(e)
+            registro.close()
+            return None
+        return registro
+
+    def _falhou(self, erro: OSError):
+        if self.erro is None:
+            print(f"autosave: {erro}", file=sys.stderr)
+        self.erro = erro
+
+    def esvaziar(self, timeout: float = 5.0):
+        """Espera a thread gravar tudo o que já está na fila."""
+        gravado = threading.Event()
+        self._fila.put(gravado)
+        gravado.wait(timeout)
+
+    def fechar(self, instantaneo: bool = True):
+        """Grava um instantâneo final (se ``instantaneo``) e encerra a thread."""
+        if instantaneo and self.jogo is not None:
+            self._instantaneo()
+        self._fila.put(None)
+        self._thread.join(timeout=5.0)
+
+
+# ===== RECUPERAÇÃO =====
+
+def _ler_registro(caminho: str, partida: int) -> Tuple[int, array]:
+    try:
+        with open(caminho, "rb") as f:
+            dados = f.read()
+    except FileNotFoundError:
+        return 0, array("H")
+    if len(dados) < CABECALHO_REGISTRO.size:
+        return 0, array("H")
+    magico, versao, _, dono, base = CABECALHO_REGISTRO.unpack_from(dados)
+    if magico != b"SPAJ" or versao != VERSAO or dono != partida:
+        # Registro de outra partida: o processo caiu entre o instantâneo e a troca do registro
+        return 0, array("H")
+    acoes = array("H")
+    corpo = dados[CABECALHO_REGISTRO.size:]
+    acoes.frombytes(corpo[:len(corpo) & ~1])
+    if sys.byteorder == "big":
+        acoes.byteswap()
+    return base, acoes
+
+
+def recuperar(diretorio: str) -> Optional[Jogo]:
+    """Partida salva em ``diretorio`` (instantâneo + registro), ou None se não houver."""
+    try:
+        with open(os.path.join(diretorio, ARQUIVO_INSTANTANEO), "rb") as f:
+            dados = f.read()
+    except FileNotFoundError:
+        return None
+    if len(dados) < CABECALHO_INSTANTANEO.size:
+        return None
+    magico, versao, _, partida, acoes = CABECALHO_INSTANTANEO.unpack_from(dados)
+    if magico != b"SPAS" or versao != VERSAO:
+        return None
+    try:
+        jogo = desserializar_jogo(dados[CABECALHO_INSTANTANEO.size:])
+    except (struct.error, IndexError):
+        return None  # instantâneo cortado: não há o que recuperar
+    base, registro = _ler_registro(os.path.join(diretorio, ARQUIVO_REGISTRO), partida)
+    if base <= acoes:
+        for codigo in registro[acoes - base:]:
+            if not aplicar_acao(jogo, codigo):
+                break
+    return jogo
@@ -0,0 +1,204 @@
+"""Base de distribuições pré-resolvidas, com registros fixos lidos via mmap.
+
+Construção (offline, em paralelo):
+
+    python -m spider_baralhos construir --jogos 20000 --workers 8 --saida baralhos.spdb
+
+Cada semente passa pelo solver; o arquivo guarda semente, status, tamanho da
+solução, nós expandidos e uma pontuação de dificuldade. Os registros ficam
+ordenados por faixa (fácil, médio, difícil, sem solução, desconhecido) e o
+cabeçalho diz onde cada faixa começa, então sortear uma partida de uma faixa
+é O(1): um índice aleatório e uma leitura de 24 bytes, sem solver em tempo de
+execução. "sem_solucao" só recebe sementes que a busca completa esgotou;
+as que bateram no limite de nós/tempo vão para "desconhecido".
+
+    arquivo  : cabeçalho | registro*
+    cabeçalho: b"SPDB" | versão u16 | reservado u16 | (início u32, qtd u32) * 5
+    registro : semente u64 | status u8 | faixa u8 | tamanho u16 | nós u32
+               | pontuação f32 | reservado u32
+"""
+import argparse
+import math
+import mmap
+import random
+import struct
+import sys
+import time
+from multiprocessing import Pool
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from spider_regras import Baralho, Jogo
+
+MAGICO = b"SPDB"
+# Versão 2: faixa "desconhecido" separada; bases antigas saíram de um solver
+# que podia dar "insoluvel" sem ter esgotado a busca e precisam ser refeitas
+VERSAO = 2
+FAIXAS = ("facil", "medio", "dificil", "sem_solucao", "desconhecido")
+CABECALHO = struct.Struct("<4sHH" + "II" * len(FAIXAS))
+REGISTRO = struct.Struct("<QBBHIfI")
+
+# status do registro
+INSOLUVEL, RESOLVIDO, DESCONHECIDO = 0, 1, 2
+_STATUS = {"insoluvel": INSOLUVEL, "resolvido": RESOLVIDO, "desconhecido": DESCONHECIDO}
+_FAIXA_STATUS = {INSOLUVEL: FAIXAS.index("sem_solucao"), DESCONHECIDO: FAIXAS.index("desconhecido")}
+
+
+class RegistroBaralho(NamedTuple):
+    semente: int
+    status: int
+    faixa: int
+    tamanho: int  # jogadas da solução (0 se não resolvido)
+    nos: int
+    pontuacao: float
+
+    @property
+    def resolvivel(self) -> bool:
+        return self.status == RESOLVIDO
+
+
+def pontuar(tamanho: int, nos: int) -> float:
+    # Esforço de busca domina; o tamanho da solução desempata
+    return math.log2(1 + nos) + tamanho / 100
+
+
+# ===== CONSTRUÇÃO =====
+
+def _resolver_semente(args: Tuple[int, int, float]) -> Tuple[int, int, int, int]:
+    from spider_solver import resolver
+
+    semente, limite_nos, limite_tempo = args
+    jogo = Jogo(Baralho(semente=semente))
+    jogo.iniciar_jogo()
+    res = resolver(jogo, limite_nos, limite_tempo)
+    tamanho = len(res.movimentos) if res.resolvido else 0
+    return semente, _STATUS[res.status], tamanho, res.nos
+
+
+def resolver_sementes(sementes: List[int], workers: int, limite_nos: int,
+                      limite_tempo: float) -> Iterator[Tuple[int, int, int, int]]:
+    tarefas = ((s, limite_nos, limite_tempo) for s in sementes)
+    if workers <= 1:
+        yield from map(_resolver_semente, tarefas)
+        return
+    with Pool(workers) as pool:
+        yield from pool.imap_unordered(_resolver_semente, tarefas, chunksize=4)
+
+
+def montar_registros(resultados: List[Tuple[int, int, int, int]]) -> List[RegistroBaralho]:
+    """Classifica em faixas: resolvidas divididas em terços pela pontuação, insolúveis em
+    sem_solucao e as que estouraram o limite em desconhecido."""
+    resolvidas = sorted((pontuar(t, n), s, t, n) for s, st, t, n in resultados if st == RESOLVIDO)
+    registros = []
+    terco = max(1, math.ceil(len(resolvidas) / 3))
+    for k, (p, s, t, n) in enumerate(resolvidas):
+        registros.append(RegistroBaralho(s, RESOLVIDO, min(k // terco, 2), t, n, p))
+    resto = sorted((_FAIXA_STATUS[st], s, st, n) for s, st, t, n in resultados if st != RESOLVIDO)
+    for f, s, st, n in resto:
+        registros.append(RegistroBaralho(s, st, f, 0, n, pontuar(0, n)))
+    return registros
+
+
+def gravar_base(caminho: str, registros: List[RegistroBaralho]):
+    # registros já em ordem de faixa (montar_registros)
+    faixas = []
+    inicio = 0
+    for f in range(len(FAIXAS)):
+        qtd = sum(1 for r in registros if r.faixa == f)
+        faixas += [inicio, qtd]
+        inicio += qtd
+    with open(caminho, "wb") as arq:
+        arq.write(CABECALHO.pack(MAGICO, VERSAO, 0, *faixas))
+        for r in registros:
+            arq.write(REGISTRO.pack(r.semente, r.status, r.faixa, r.tamanho,
+                                    min(r.nos, 0xFFFFFFFF), r.pontuacao, 0))
+
+
+# ===== LEITURA =====
+
+class BaseBaralhos:
+    """Arquivo .spdb mapeado em memória; só lê os registros consultados."""
+
+    def __init__(self, caminho: str):
+        self._arquivo = open(caminho, "rb")
+        try:
+            self._mm = mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._arquivo.close()
+            raise ValueError(f"{caminho}: base de baralhos vazia")
+        if len(self._mm) < CABECALHO.size:
+            self.fechar()
+            raise ValueError(f"{caminho}: base de baralhos cortada (sem cabeçalho)")
+        campos = CABECALHO.unpack_from(self._mm, 0)
+        if campos[0] != MAGICO:
+            self.fechar()
+            raise ValueError(f"{caminho}: não é uma base de baralhos")
+        if campos[1] != VERSAO:
+            self.fechar()
+            raise ValueError(f"{caminho}: versão {campos[1]} não suportada (esperada {VERSAO})")
+        self.faixas: Dict[str, Tuple[int, int]] = {
+            nome: (campos[3 + 2 * k], campos[4 + 2 * k]) for k, nome in enumerate(FAIXAS)}
+        if any(inicio + qtd > len(self) for inicio, qtd in self.faixas.values()):
+            self.fechar()
+            raise ValueError(f"{caminho}: base de baralhos cortada")
+
+    def __len__(self) -> int:
+        return (len(self._mm) - CABECALHO.size) // REGISTRO.size
+
+    def registro(self, i: int) -> RegistroBaralho:
+        s, st, f, t, n, p, _ = REGISTRO.unpack_from(self._mm, CABECALHO.size + i * REGISTRO.size)
+        return RegistroBaralho(s, st, f, t, n, p)
+
+    def quantidade(self, faixa: str) -> int:
+        return self.faixas[faixa][1]
+
+    def sortear(self, faixa: str, rng: random.Random = random) -> Optional[RegistroBaralho]:
+        inicio, qtd = self.faixas[faixa]
+        if qtd == 0:
+            return None
+        return self.registro(inicio + rng.randrange(qtd))
+
+    def fechar(self):
+        self._mm.close()
+        self._arquivo.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m spider_baralhos")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    con = sub.add_parser("construir", help="resolve sementes em paralelo e grava a base")
+    con.add_argument("--jogos", type=int, default=1000)
+    con.add_argument("--semente-inicial", type=int, default=0)
+    con.add_argument("--workers", type=int, default=1)
+    con.add_argument("--limite-nos", type=int, default=200_000)
+    con.add_argument("--limite-tempo", type=float, default=10.0, help="segundos por semente")
+    con.add_argument("--saida", default="baralhos.spdb")
+    res = sub.add_parser("resumo", help="mostra quantas partidas há em cada faixa")
+    res.add_argument("arquivo")
+    args = parser.parse_args(argv)
+
+    if args.comando == "resumo":
+        base = BaseBaralhos(args.arquivo)
+        for nome in FAIXAS:
+            print(f"{nome:12s} {base.quantidade(nome):8d}")
+        print(f"{'total':12s} {len(base):8d}")
+        base.fechar()
+        return 0
+
+    sementes = list(range(args.semente_inicial, args.semente_inicial + args.jogos))
+    inicio = time.perf_counter()
+    resultados = []
+    for k, r in enumerate(resolver_sementes(sementes, args.workers, args.limite_nos,
+                                            args.limite_tempo), 1):
+        resultados.append(r)
+        if k % 100 == 0:
+            print(f"{k}/{len(sementes)} ({k / (time.perf_counter() - inicio):.1f}/s)", file=sys.stderr)
+    registros = montar_registros(resultados)
+    gravar_base(args.saida, registros)
+    resolvidas = sum(r.resolvivel for r in registros)
+    print(f"{len(registros)} sementes em {time.perf_counter() - inicio:.1f}s; "
+          f"{resolvidas} resolvidas; base gravada em {args.saida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
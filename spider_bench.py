@@ -0,0 +1,351 @@
+"""Benchmarks dos caminhos quentes do motor e da renderização.
+
+Roda sem janela (``SDL_VIDEODRIVER=dummy``) e com sementes fixas:
+
+    python -m spider_bench                      # mede e compara com a base
+    python -m spider_bench --salvar-base        # grava a base atual
+    python -m spider_bench --tolerancia 15 --so mover,quadro
+
+Para cada métrica mostra mediana e p95 (µs por chamada). Com uma base em
+JSON, termina com código 1 se alguma mediana piorar mais que ``--tolerancia``
+por cento.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from spider_regras import Baralho, Carta, Jogo, encontrar_primeiro_movimento_valido
+
+BASE_PADRAO = "bench_base.json"
+SEMENTE = 1234
+
+
+def _jogo_em_andamento(semente: int, jogadas: int = 60) -> Jogo:
+    # Partida avançada de forma determinística (pilhas mais altas que no início)
+    jogo = Jogo(Baralho(semente=semente))
+    jogo.iniciar_jogo()
+    rng = random.Random(semente)
+    for _ in range(jogadas):
+        movs = sorted(jogo.movimentos_validos())
+        if movs and rng.random() < 0.85:
+            jogo.mover(*rng.choice(movs))
+        elif not jogo.distribuir_estoque():
+            break
+    return jogo
+
+
+def _jogo_pilhas_altas() -> Jogo:
+    # Pior caso para desenho e clique: colunas com muitas cartas, quase todas viradas
+    baralho = Baralho(semente=SEMENTE)
+    jogo = Jogo(Baralho([]))
+    cartas = baralho.cartas
+    for i in range(10):
+        bloco = cartas[i * 10:(i + 1) * 10] + ([cartas[100 + i]] if i < 4 else [])
+        for k, c in enumerate(bloco):
+            c.virada_para_cima = k >= 3
+        jogo.tableau[i].push(bloco)
+    # Coluna 0 com uma sequência K→2 extra por cima
+    jogo.tableau[0].push([Carta(v, virada_para_cima=True) for v in range(13, 1, -1)])
+    return jogo
+
+
+def medir(fn: Callable[[], float], amostras: int) -> List[float]:
+    # fn devolve a duração (s) de uma chamada medida; setup fica fora da medição
+    return [fn() for _ in range(amostras)]
+
+
+# ===== BENCHMARKS =====
+# Cada fábrica prepara o cenário e devolve uma função que mede uma chamada
+
+def bench_mover():
+    jogos = [_jogo_em_andamento(SEMENTE + i) for i in range(20)]
+    rng = random.Random(SEMENTE)
+
+    def uma():
+        jogo = rng.choice(jogos)
+        movs = sorted(jogo.movimentos_validos())
+        if not movs:
+            return 0.0
+        mov = rng.choice(movs)
+        t = time.perf_counter()
+        jogo.mover(*mov)
+        dt = time.perf_counter() - t
+        jogo.desfazer()
+        return dt
+    return uma
+
+
+def _depois_de_mover(consulta: Callable[[Jogo], object]):
+    # Mede a consulta logo após uma jogada (índice precisa ser atualizado)
+    jogos = [_jogo_em_andamento(SEMENTE + i) for i in range(20)]
+    rng = random.Random(SEMENTE)
+
+    def uma():
+        jogo = rng.choice(jogos)
+        movs = sorted(jogo.movimentos_validos())
+        moveu = bool(movs) and jogo.mover(*rng.choice(movs))
+        t = time.perf_counter()
+        consulta(jogo)
+        dt = time.perf_counter() - t
+        if moveu:
+            jogo.desfazer()
+        return dt
+    return uma
+
+
+def bench_sem_movimentos():
+    return _depois_de_mover(lambda j: j.sem_movimentos_validos())
+
+
+def bench_dica():
+    return _depois_de_mover(encontrar_primeiro_movimento_valido)
+
+
+def bench_iniciar_jogo():
+    sementes = iter(range(SEMENTE, SEMENTE + 10**9))
+
+    def uma():
+        s = next(sementes)
+        t = time.perf_counter()
+        jogo = Jogo(Baralho(semente=s))
+        jogo.iniciar_jogo()
+        return time.perf_counter() - t
+    return uma
+
+
+def bench_recuperar_autosave():
+    # Partida de 500 ações salva sem fechar (como numa queda): instantâneo + registro com 99 ações
+    from spider_autosave import Autosave, recuperar
+
+    diretorio = tempfile.TemporaryDirectory()
+    salvamento = Autosave(diretorio.name)
+    jogo = Jogo(Baralho(semente=SEMENTE))
+    jogo.iniciar_jogo()
+    salvamento.iniciar(jogo)
+    rng = random.Random(SEMENTE)
+    acoes = 0
+    while acoes < 499:
+        movs = sorted(jogo.movimentos_validos())
+        if movs and rng.random() < 0.9:
+            acoes += jogo.mover(*rng.choice(movs))
+        else:
+            acoes += jogo.distribuir_estoque() or jogo.desfazer()
+    salvamento.esvaziar()
+    # Encerra a thread (e o arquivo do registro) sem o instantâneo final: os
+    # arquivos ficam como numa queda
+    salvamento.fechar(instantaneo=False)
+
+    def uma():
+        t = time.perf_counter()
+        recuperar(diretorio.name)
+        return time.perf_counter() - t
+    uma.diretorio = diretorio  # apagado junto com a função
+    return uma
+
+
+def _cache_dicas(max_memoria: int):
+    # Posições de partidas em andamento já no cache; max_memoria=1 força a leitura do disco
+    from spider_cache import CachePosicoes
+    from spider_estado import EstadoCompacto
+    from spider_solver import INSOLUVEL
+
+    diretorio = tempfile.TemporaryDirectory()
+    cache = CachePosicoes(os.path.join(diretorio.name, "posicoes.sppc"), max_memoria)
+    estados = [EstadoCompacto.de_jogo(_jogo_em_andamento(SEMENTE + i)) for i in range(20)]
+    for e in estados:
+        # "desconhecido" não vai para o disco; o status aqui tem que ser definitivo
+        cache.guardar(e, None, INSOLUVEL)
+    rng = random.Random(SEMENTE)
+
+    def uma():
+        e = rng.choice(estados)
+        t = time.perf_counter()
+        cache.buscar(e)
+        return time.perf_counter() - t
+    uma.diretorio = diretorio
+    return uma
+
+
+def bench_cache_dicas():
+    return _cache_dicas(1000)
+
+
+def bench_cache_dicas_disco():
+    return _cache_dicas(1)
+
+
+def bench_clique():
+    import spider_pygame as ui
+
+    jogo = _jogo_pilhas_altas()
+    pilha = jogo.tableau[0]
+    rng = random.Random(SEMENTE)
+    x0 = ui.coluna_x(0)
+
+    def uma():
+        y = rng.randrange(ui.TOP_TABLEAU_Y, ui.ALTURA)
+        t = time.perf_counter()
+        ui.coordenada_para_indice_carta(pilha, x0 + 10, y, x0)
+        return time.perf_counter() - t
+    return uma
+
+
+def _quadro(com_cache: bool):
+    import spider_pygame as ui
+
+    ui.inicializar_ui()
+    jogo = _jogo_pilhas_altas()
+    drag = {"arrastando": False, "origem": None, "cartas": [], "mouse": (0, 0)}
+    dica = {(0, len(jogo.tableau[0].cartas) - 1), (3, len(jogo.tableau[3].cartas) - 1)}
+
+    def uma():
+        if not com_cache:
+            for p in jogo.tableau:
+                p.versao += 1
+        t = time.perf_counter()
+        ui.screen.fill(ui.BG)
+        ui.desenhar_ui_topo(jogo)
+        ui.desenhar_tableau(jogo, drag, dica)
+        return time.perf_counter() - t
+    return uma
+
+
+def bench_quadro():
+    return _quadro(True)
+
+
+def bench_quadro_sem_cache():
+    return _quadro(False)
+
+
+def bench_quadro_distribuicao():
+    # Quadro inteiro no meio da animação de distribuir, com as colunas altas
+    import pygame
+    import spider_pygame as ui
+
+    ui.inicializar_ui()
+    jogo = _jogo_pilhas_altas()
+    jogo.estoque = Baralho([Carta(v) for v in range(1, 11)])
+    drag = {"arrastando": False, "origem": None, "cartas": [], "mouse": (0, 0)}
+    animacoes = ui.Animacoes()
+    antes = animacoes.posicoes(jogo)
+    jogo.distribuir_estoque()
+    passo = [0]
+
+    def uma():
+        if not animacoes.ativa:
+            passo[0] = 0
+            animacoes.iniciar(antes, jogo, 0)
+        passo[0] += 1
+        t = time.perf_counter()
+        sujos = animacoes.avancar(passo[0] * 1000 // 60)
+        ui.screen.set_clip(sujos[0].unionall(sujos[1:]))
+        ui.screen.fill(ui.BG)
+        ui.desenhar_ui_topo(jogo)
+        ui.desenhar_tableau(jogo, drag, set(), animacoes)
+        ui.screen.set_clip(None)
+        pygame.display.update(sujos)
+        return time.perf_counter() - t
+    return uma
+
+
+BENCHMARKS = {
+    "mover": (bench_mover, 2000),
+    "sem_movimentos_validos": (bench_sem_movimentos, 2000),
+    "encontrar_primeiro_movimento_valido": (bench_dica, 2000),
+    "iniciar_jogo": (bench_iniciar_jogo, 500),
+    "recuperar_autosave": (bench_recuperar_autosave, 200),
+    "cache_dicas": (bench_cache_dicas, 2000),
+    "cache_dicas_disco": (bench_cache_dicas_disco, 2000),
+    "coordenada_para_indice_carta": (bench_clique, 2000),
+    "quadro": (bench_quadro, 200),
+    "quadro_sem_cache": (bench_quadro_sem_cache, 100),
+    "quadro_distribuicao": (bench_quadro_distribuicao, 200),
+}
+
+
+def percentil(valores: List[float], p: float) -> float:
+    ordenados = sorted(valores)
+    k = min(len(ordenados) - 1, max(0, round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[k]
+
+
+def rodar(nomes: List[str], escala: float = 1.0) -> Dict[str, Dict[str, float]]:
+    resultados = {}
+    for nome in nomes:
+        fabrica, amostras = BENCHMARKS[nome]
+        fn = fabrica()
+        # Aquecimento (caches, atlas, JIT de caminhos do SDL)
+        medir(fn, max(5, amostras // 20))
+        tempos = medir(fn, max(5, int(amostras * escala)))
+        resultados[nome] = {
+            "mediana_us": round(statistics.median(tempos) * 1e6, 3),
+            "p95_us": round(percentil(tempos, 95) * 1e6, 3),
+            "amostras": len(tempos),
+        }
+    return resultados
+
+
+def comparar(atual: Dict, base: Dict, tolerancia: float) -> List[str]:
+    regressoes = []
+    for nome, r in atual.items():
+        if nome not in base:
+            continue
+        limite = base[nome]["mediana_us"] * (1 + tolerancia / 100)
+        if r["mediana_us"] > limite:
+            regressoes.append(f"{nome}: mediana {r['mediana_us']:.1f}µs > "
+                              f"{limite:.1f}µs (base {base[nome]['mediana_us']:.1f}µs + {tolerancia:g}%)")
+    return regressoes
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m spider_bench")
+    parser.add_argument("--base", default=BASE_PADRAO, help="arquivo JSON com a base de comparação")
+    parser.add_argument("--salvar-base", action="store_true", help="grava os resultados como nova base")
+    parser.add_argument("--tolerancia", type=float, default=20.0,
+                        help="piora máxima aceita na mediana, em %% (padrão: 20)")
+    parser.add_argument("--so", help="lista de benchmarks separados por vírgula")
+    parser.add_argument("--escala", type=float, default=1.0, help="multiplica o número de amostras")
+    args = parser.parse_args(argv)
+
+    nomes = args.so.split(",") if args.so else list(BENCHMARKS)
+    desconhecidos = [n for n in nomes if n not in BENCHMARKS]
+    if desconhecidos:
+        parser.error(f"benchmark desconhecido: {', '.join(desconhecidos)}")
+
+    resultados = rodar(nomes, args.escala)
+    base = {}
+    if os.path.exists(args.base):
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f)
+
+    for nome, r in resultados.items():
+        linha = f"{nome:38s} mediana {r['mediana_us']:10.1f}µs   p95 {r['p95_us']:10.1f}µs"
+        if nome in base:
+            delta = 100 * (r["mediana_us"] / base[nome]["mediana_us"] - 1)
+            linha += f"   ({delta:+.1f}% vs base)"
+        print(linha)
+
+    if args.salvar_base:
+        base.update(resultados)
+        with open(args.base, "w", encoding="utf-8") as f:
+            json.dump(base, f, indent=2, sort_keys=True)
+        print(f"base gravada em {args.base}")
+        return 0
+
+    regressoes = comparar(resultados, base, args.tolerancia)
+    for r in regressoes:
+        print("REGRESSÃO:", r)
+    return 1 if regressoes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""Cache de dicas por posição: LRU em memória na frente de uma tabela em disco.
+
+A chave é o hash de ``chave_canonica()``, que sem estoque ignora a ordem
+das colunas (com estoque ela importa: a carta k da distribuição vai para a
+coluna k); o movimento é guardado em posições canônicas e traduzido de volta
+para as colunas reais na consulta. Cada entrada traz o melhor movimento
+conhecido, o status do solver e, para posições resolvidas, quantas jogadas
+faltam para a vitória. Do mesmo hash sai, além da chave de 64 bits, um
+verificador de 32 bits conferido na consulta, para uma colisão de chave não
+devolver a resposta de outra posição. Entradas ``desconhecido`` (solver
+parou no limite) ficam só na memória.
+
+O disco é uma tabela de tamanho fixo lida via mmap, em baldes de 4 entradas
+(quando o balde enche, sai a entrada gravada há mais tempo):
+
+    arquivo  : cabeçalho | entrada * slots
+    cabeçalho: b"SPPC" | versão u16 | reservado u16 | slots u32 | contador u32
+    entrada  : chave u64 (0 = livre) | verificador u32 | src u8 | qtd u8 | dst u8
+               | status u8 | distância i16 | uso u16
+"""
+import mmap
+import os
+import struct
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from spider_estado import N_PILHAS, EstadoCompacto
+from spider_solver import DESCONHECIDO, DISTRIBUIR, INSOLUVEL, RESOLVIDO, Movimento, aplicar
+
+MAGICO = b"SPPC"
+VERSAO = 2
+CABECALHO = struct.Struct("<4sHHII")
+ENTRADA = struct.Struct("<QIBBBBhH")
+BALDE = 4
+
+MAX_MEMORIA = 50_000
+MAX_DISCO = 1 << 18  # entradas (5 MiB)
+
+_STATUS = (INSOLUVEL, RESOLVIDO, DESCONHECIDO)
+_CODIGO_STATUS = {s: i for i, s in enumerate(_STATUS)}
+_DESCONHECIDO = _CODIGO_STATUS[DESCONHECIDO]
+# Movimento canônico (src, qtd, dst); qtd == 0 marca distribuir ou "nada a fazer"
+_DISTRIBUIR = (255, 0, 255)
+_NENHUM = (0, 0, 0)
+
+# Entrada canônica, como vai para a memória, para o disco e entre processos
+# chave, verificador, movimento, status, distância
+Canonica = Tuple[int, int, Tuple[int, int, int], int, int]
+
+
+class EntradaCache(NamedTuple):
+    movimento: Optional[Movimento]  # DISTRIBUIR ou None como em spider_dica
+    status: str
+    distancia: int  # jogadas até a vitória; -1 se não se sabe
+
+
+def posicao_canonica(estado: EstadoCompacto) -> Tuple[int, int, List[int]]:
+    """Chave e verificador de ``chave_canonica()`` e a ordem das colunas
+    (posição canônica -> coluna real)."""
+    colunas = [bytes([len(p), oc]) + bytes(p) for p, oc in zip(estado.pilhas, estado.ocultas)]
+    restante = estado.restante_estoque()
+    if restante:
+        ordem = list(range(len(colunas)))
+    else:
+        ordem = sorted(range(len(colunas)), key=colunas.__getitem__)
+    h = blake2b(bytes([len(estado.fundacao)]), digest_size=12)
+    h.update(bytes(estado.fundacao))
+    h.update(bytes([len(restante)]))
+    h.update(restante)
+    for i in ordem:
+        h.update(colunas[i])
+    digest = h.digest()
+    # 0 marca entrada livre no disco
+    return (int.from_bytes(digest[:8], "little") or 1, int.from_bytes(digest[8:], "little"),
+            ordem)
+
+
+def _para_canonico(mov: Optional[Movimento], ordem: List[int]) -> Tuple[int, int, int]:
+    if mov is None:
+        return _NENHUM
+    if mov == DISTRIBUIR:
+        return _DISTRIBUIR
+    src, qtd, dst = mov
+    return ordem.index(src), qtd, ordem.index(dst)
+
+
+def _de_canonico(mov: Tuple[int, int, int], ordem: List[int]) -> Optional[Movimento]:
+    src, qtd, dst = mov
+    if qtd == 0:
+        return DISTRIBUIR if mov == _DISTRIBUIR else None
+    return ordem[src], qtd, ordem[dst]
+
+
+def _valido(estado: EstadoCompacto, mov: Optional[Movimento]) -> bool:
+    if mov is None:
+        return True
+    if mov == DISTRIBUIR:
+        return all(estado.pilhas) and len(estado.restante_estoque()) >= N_PILHAS
+    return estado.pode_mover(*mov)
+
+
+def entrada_canonica(estado: EstadoCompacto, mov: Optional[Movimento], status: str,
+                     distancia: int = -1) -> Canonica:
+    chave, verificador, ordem = posicao_canonica(estado)
+    return chave, verificador, _para_canonico(mov, ordem), _CODIGO_STATUS[status], distancia
+
+
+def entradas_solucao(estado: EstadoCompacto, movimentos: List[Movimento]) -> List[Canonica]:
+    """Uma entrada resolvida para cada posição do caminho até a vitória."""
+    estado = estado.copia()
+    entradas = []
+    for k, mov in enumerate(movimentos):
+        entradas.append(entrada_canonica(estado, mov, RESOLVIDO, len(movimentos) - k))
+        if not aplicar(estado, mov):
+            break
+    return entradas
+
+
+class CachePosicoes:
+    """Sem ``caminho`` fica só a camada em memória.
+
+    ``max_memoria`` limita as entradas do LRU; ``max_disco`` é o tamanho da
+    tabela em entradas (20 bytes cada). Abrir um arquivo com outro tamanho
+    redistribui as entradas que já estavam nele; um arquivo que não começa
+    com ``b"SPPC"`` dá ``ValueError`` e não é tocado.
+    """
+
+    def __init__(self, caminho: Optional[str] = None, max_memoria: int = MAX_MEMORIA,
+                 max_disco: int = MAX_DISCO):
+        self.caminho = caminho
+        self.max_memoria = max_memoria
+        # Da menos para a mais recentemente usada
+        self._memoria: "OrderedDict[int, Tuple]" = OrderedDict()
+        self.acertos_memoria = self.acertos_disco = self.faltas = 0
+        self._arquivo = None
+        self._mm = None
+        self._slots = 0
+        self._contador = 0
+        if caminho:
+            self._abrir(caminho, max(BALDE, -(-max_disco // BALDE) * BALDE))
+
+    # ----- disco -----
+    def _abrir(self, caminho: str, slots: int):
+        antigas = []
+        if os.path.exists(caminho):
+            with open(caminho, "rb") as f:
+                dados = f.read()
+            if dados[:len(MAGICO)] != MAGICO[:len(dados)]:
+                # Não é um cache (caminho trocado?): melhor falhar do que apagar o arquivo
+                raise ValueError(f"{caminho}: não é um cache de posições")
+            if len(dados) >= CABECALHO.size:
+                magico, versao, _, slots_antigos, contador = CABECALHO.unpack_from(dados)
+                tamanho = CABECALHO.size + slots_antigos * ENTRADA.size
+                if magico == MAGICO and versao == VERSAO and len(dados) == tamanho:
+                    if slots_antigos == slots:
+                        self._mapear(caminho, slots, contador)
+                        return
+                    antigas = [e for e in ENTRADA.iter_unpack(dados[CABECALHO.size:]) if e[0]]
+                    # As mais antigas primeiro, para as recentes ganharem a disputa por balde
+                    antigas.sort(key=lambda e: -((contador - e[7]) & 0xFFFF))
+        os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+        temp = caminho + ".tmp"
+        with open(temp, "wb") as f:
+            f.write(CABECALHO.pack(MAGICO, VERSAO, 0, slots, 0))
+            f.truncate(CABECALHO.size + slots * ENTRADA.size)
+        os.replace(temp, caminho)
+        self._mapear(caminho, slots, 0)
+        for chave, verificador, src, qtd, dst, status, distancia, _ in antigas:
+            self._gravar_disco((chave, verificador, (src, qtd, dst), status, distancia))
+
+    def _mapear(self, caminho: str, slots: int, contador: int):
+        self._arquivo = open(caminho, "r+b")
+        self._mm = mmap.mmap(self._arquivo.fileno(), 0)
+        self._slots = slots
+        self._contador = contador
+
+    def _balde(self, chave: int) -> int:
+        return CABECALHO.size + (chave % (self._slots // BALDE)) * BALDE * ENTRADA.size
+
+    def _ler_disco(self, chave: int) -> Optional[Tuple]:
+        off = self._balde(chave)
+        for _ in range(BALDE):
+            e = ENTRADA.unpack_from(self._mm, off)
+            if e[0] == chave:
+                return e[1], (e[2], e[3], e[4]), e[5], e[6]
+            off += ENTRADA.size
+        return None
+
+    def _gravar_disco(self, entrada: Canonica):
+        chave, verificador, (src, qtd, dst), status, distancia = entrada
+        self._contador = (self._contador + 1) & 0xFFFFFFFF
+        inicio = self._balde(chave)
+        alvo = None
+        idade_alvo = -1
+        off = inicio
+        for _ in range(BALDE):
+            dono, *_, uso = ENTRADA.unpack_from(self._mm, off)
+            if dono == chave or dono == 0:
+                alvo = off
+                break
+            idade = (self._contador - uso) & 0xFFFF
+            if idade > idade_alvo:
+                alvo, idade_alvo = off, idade
+            off += ENTRADA.size
+        ENTRADA.pack_into(self._mm, alvo, chave, verificador, src, qtd, dst, status,
+                          max(-1, min(distancia, 0x7FFF)), self._contador & 0xFFFF)
+
+    # ----- consulta -----
+    def buscar(self, estado: EstadoCompacto) -> Optional[EntradaCache]:
+        chave, verificador, ordem = posicao_canonica(estado)
+        valor = self._memoria.get(chave)
+        if valor is not None:
+            self._memoria.move_to_end(chave)
+            self.acertos_memoria += 1
+        else:
+            valor = self._ler_disco(chave) if self._mm is not None else None
+            if valor is None:
+                self.faltas += 1
+                return None
+            self._lembrar(chave, valor)
+            self.acertos_disco += 1
+        dono, canonico, status, distancia = valor
+        mov = _de_canonico(canonico, ordem)
+        if dono != verificador or not _valido(estado, mov):
+            # Colisão de chave: a entrada é de outra posição
+            return None
+        return EntradaCache(mov, _STATUS[status], distancia)
+
+    def guardar(self, estado: EstadoCompacto, mov: Optional[Movimento], status: str,
+                distancia: int = -1):
+        self.guardar_canonicas([entrada_canonica(estado, mov, status, distancia)])
+
+    def guardar_canonicas(self, entradas: Iterable[Canonica]):
+        for entrada in entradas:
+            chave, verificador, canonico, status, distancia = entrada
+            self._lembrar(chave, (verificador, canonico, status, distancia))
+            # Sem resposta definitiva não vale ocupar o disco: outra busca pode achar
+            if self._mm is not None and status != _DESCONHECIDO:
+                self._gravar_disco(entrada)
+
+    def _lembrar(self, chave: int, valor: Tuple):
+        self._memoria[chave] = valor
+        self._memoria.move_to_end(chave)
+        while len(self._memoria) > self.max_memoria:
+            self._memoria.popitem(last=False)
+
+    def fechar(self):
+        if self._mm is None:
+            return
+        CABECALHO.pack_into(self._mm, 0, MAGICO, VERSAO, 0, self._slots, self._contador)
+        self._mm.flush()
+        self._mm.close()
+        self._arquivo.close()
+        self._mm = None
@@ -0,0 +1,173 @@
+"""Dica calculada em segundo plano, num processo separado.
+
+A interface chama ``pedir(jogo)``: o estado vai como ``EstadoCompacto`` para o
+processo trabalhador, que responde primeiro com o melhor movimento de um passo
+e depois com cada melhora encontrada pelo solver (resultado "a qualquer
+momento"). ``coletar()`` é chamado uma vez por quadro e nunca bloqueia.
+``cancelar()`` descarta o pedido em andamento (jogada, distribuição,
+reinício); o trabalhador percebe pela geração compartilhada e para a busca.
+
+Com um ``CachePosicoes``, ``pedir`` responde na hora quando a posição já foi
+analisada, sem passar pelo processo (se a análise anterior terminou em
+``desconhecido``, o movimento guardado vale só como resposta parcial e a
+busca roda de novo); a resposta final de cada busca volta com
+as entradas a guardar (todas as posições do caminho, quando a partida tem
+solução).
+"""
+import multiprocessing as mp
+import queue
+from typing import List, NamedTuple, Optional, Tuple
+
+from spider_cache import CachePosicoes, entrada_canonica, entradas_solucao
+from spider_estado import EstadoCompacto
+from spider_solver import DESCONHECIDO, RESOLVIDO, aplicar, avaliar, gerar_movimentos, resolver
+
+Movimento = Tuple[int, int, int]
+
+LIMITE_NOS = 400_000
+LIMITE_TEMPO = 8.0
+
+
+class RespostaDica(NamedTuple):
+    geracao: int
+    movimento: Optional[Movimento]  # DISTRIBUIR = distribuir o estoque; None = nada a fazer
+    final: bool
+    status: str  # "parcial", RESOLVIDO, INSOLUVEL ou DESCONHECIDO
+    distancia: int = -1  # jogadas até a vitória, quando resolvido
+    entradas: Optional[list] = None  # para o cache (só na resposta final)
+
+
+def melhor_movimento_imediato(estado: EstadoCompacto) -> Optional[Movimento]:
+    # Um passo de busca: o filho com melhor avaliação (empate fica com a ordem do gerador)
+    melhor = None
+    melhor_pontos = None
+    for mov in gerar_movimentos(estado):
+        filho = estado.copia()
+        if not aplicar(filho, mov):
+            continue
+        pontos = avaliar(filho)
+        if melhor_pontos is None or pontos > melhor_pontos:
+            melhor, melhor_pontos = mov, pontos
+    return melhor
+
+
+def _trabalhador(pedidos, respostas, geracao_atual):
+    while True:
+        pedido = pedidos.get()
+        if pedido is None:
+            return
+        geracao, estado = pedido
+        if geracao != geracao_atual.value:
+            continue
+
+        def parar():
+            return geracao_atual.value != geracao
+
+        ultimo = melhor_movimento_imediato(estado)
+        respostas.put(RespostaDica(geracao, ultimo, False, "parcial"))
+        melhor_pontos = None
+
+        def ao_melhorar(mov, pontos):
+            nonlocal ultimo, melhor_pontos
+            # A segunda passada do solver recomeça a contagem: só repassa melhoras reais
+            if melhor_pontos is not None and pontos <= melhor_pontos:
+                return
+            melhor_pontos = pontos
+            if mov != ultimo:
+                ultimo = mov
+                respostas.put(RespostaDica(geracao, mov, False, "parcial"))
+
+        res = resolver(estado, LIMITE_NOS, LIMITE_TEMPO, parar, ao_melhorar)
+        if parar():
+            continue
+        if res.status == RESOLVIDO:
+            ultimo = res.movimentos[0] if res.movimentos else None
+            entradas = entradas_solucao(estado, res.movimentos)
+            distancia = len(res.movimentos)
+        else:
+            entradas = [entrada_canonica(estado, ultimo, res.status)]
+            distancia = -1
+        respostas.put(RespostaDica(geracao, ultimo, True, res.status, distancia, entradas))
+
+
+class TrabalhadorDica:
+    """Processo de dica, criado no primeiro pedido e reaproveitado depois."""
+
+    def __init__(self, cache: Optional[CachePosicoes] = None):
+        self.cache = cache
+        self._prontas: List[RespostaDica] = []
+        self._ctx = mp.get_context("spawn")
+        self._processo = None
+        self._pedidos = None
+        self._respostas = None
+        self._geracao = None
+        self.geracao = 0
+        self.pensando = False
+
+    def _iniciar(self):
+        self._pedidos = self._ctx.Queue()
+        self._respostas = self._ctx.Queue()
+        self._geracao = self._ctx.Value("q", 0, lock=False)
+        self._processo = self._ctx.Process(
+            target=_trabalhador, args=(self._pedidos, self._respostas, self._geracao),
+            name="spider-dica", daemon=True)
+        self._processo.start()
+
+    def pedir(self, jogo):
+        estado = EstadoCompacto.de_jogo(jogo)
+        self.cancelar()
+        self.geracao += 1
+        if self.cache is not None:
+            e = self.cache.buscar(estado)
+            if e is not None and e.status != DESCONHECIDO:
+                self._prontas = [RespostaDica(self.geracao, e.movimento, True, e.status, e.distancia)]
+                return
+            if e is not None:
+                # Busca anterior parou no limite: o movimento dela sai já, como parcial,
+                # e a posição é analisada de novo
+                self._prontas = [RespostaDica(self.geracao, e.movimento, False, "parcial")]
+        if self._processo is None or not self._processo.is_alive():
+            self._iniciar()
+        self._geracao.value = self.geracao
+        self._pedidos.put((self.geracao, estado))
+        self.pensando = True
+
+    def cancelar(self):
+        self._prontas = []
+        if not self.pensando:
+            return
+        self.geracao += 1
+        self._geracao.value = self.geracao
+        self.pensando = False
+
+    def coletar(self) -> List[RespostaDica]:
+        """Respostas do pedido atual que chegaram desde a última chamada."""
+        novas, self._prontas = self._prontas, []
+        if self._respostas is None:
+            return novas
+        if self.pensando and not self._processo.is_alive():
+            self.pensando = False
+        while True:
+            try:
+                r = self._respostas.get_nowait()
+            except queue.Empty:
+                break
+            if r.final and self.cache is not None and r.entradas:
+                # Vale guardar mesmo se o pedido já foi cancelado: a chave é a posição
+                self.cache.guardar_canonicas(r.entradas)
+            if r.geracao != self.geracao:
+                continue
+            novas.append(r)
+            if r.final:
+                self.pensando = False
+        return novas
+
+    def fechar(self):
+        if self._processo is None:
+            return
+        self.cancelar()
+        self._pedidos.put(None)
+        self._processo.join(timeout=1.0)
+        if self._processo.is_alive():
+            self._processo.terminate()
+        self._processo = None
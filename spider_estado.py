@@ -0,0 +1,302 @@
+"""Representação compacta do estado do Spider com hash Zobrist incremental.
+
+Cada carta vira um inteiro pequeno (``naipe * 13 + valor - 1``, de 0 a 51) e
+cada coluna do tableau um ``bytearray`` com o número de cartas viradas para
+baixo na base (que no Spider são sempre as primeiras da pilha). O estado
+copia, compara e serve de chave de dicionário muito mais barato que 104
+objetos ``Carta``. ``de_jogo``/``para_jogo`` fazem a ponte com o motor de
+objetos usado pela interface.
+"""
+import random
+from hashlib import blake2b
+from typing import Dict, List, Optional, Tuple
+
+from spider_regras import Baralho, Carta, Jogo
+
+NAIPES = ('♠', '♥', '♦', '♣')
+INDICE_NAIPE = {n: i for i, n in enumerate(NAIPES)}
+
+N_PILHAS = 10
+N_CODIGOS = 52
+# Nenhuma coluna passa de 104 cartas (o baralho inteiro)
+ALTURA_MAX = 104
+
+_MASCARA_64 = (1 << 64) - 1
+
+
+def codificar(valor: int, naipe: str) -> int:
+    return INDICE_NAIPE[naipe] * 13 + valor - 1
+
+
+def valor_de(codigo: int) -> int:
+    return codigo % 13 + 1
+
+
+def naipe_de(codigo: int) -> str:
+    return NAIPES[codigo // 13]
+
+
+class CartaFixa:
+    """Carta imutável e compartilhada (flyweight): uma instância por código."""
+
+    __slots__ = ("valor", "naipe", "codigo")
+    _instancias: Dict[int, 'CartaFixa'] = {}
+
+    def __new__(cls, codigo: int):
+        inst = cls._instancias.get(codigo)
+        if inst is None:
+            inst = object.__new__(cls)
+            object.__setattr__(inst, "valor", valor_de(codigo))
+            object.__setattr__(inst, "naipe", naipe_de(codigo))
+            object.__setattr__(inst, "codigo", codigo)
+            cls._instancias[codigo] = inst
+        return inst
+
+    def __setattr__(self, nome, valor):
+        raise AttributeError("CartaFixa é imutável.")
+
+    def __reduce__(self):
+        return (CartaFixa, (self.codigo,))
+
+    def __repr__(self):
+        return f"CartaFixa({self.valor}{self.naipe})"
+
+
+# ===== TABELAS ZOBRIST =====
+# Semente fixa: o mesmo estado tem o mesmo hash em qualquer processo
+_rng = random.Random(0x5B1DE2)
+# Índice: ((pilha * ALTURA_MAX + posição) * N_CODIGOS + código) * 2 + virada_para_cima
+Z_CARTA: List[int] = [_rng.getrandbits(64) for _ in range(N_PILHAS * ALTURA_MAX * N_CODIGOS * 2)]
+# Quantas cartas restam no estoque (o conteúdo restante é fixo para a partida)
+Z_ESTOQUE: List[int] = [_rng.getrandbits(64) for _ in range(105)]
+# Fundação: (posição da sequência completa, naipe)
+Z_FUNDACAO: List[int] = [_rng.getrandbits(64) for _ in range(8 * len(NAIPES))]
+del _rng
+
+
+def z_carta(pilha: int, pos: int, codigo: int, para_cima: bool) -> int:
+    return Z_CARTA[((pilha * ALTURA_MAX + pos) * N_CODIGOS + codigo) * 2 + para_cima]
+
+
+class EstadoCompacto:
+    """Estado completo de uma partida em ints/bytes, com hash Zobrist de 64 bits.
+
+    ``pilhas[i]`` guarda os códigos das cartas da coluna ``i`` (base primeiro) e
+    ``ocultas[i]`` quantas delas, a partir da base, estão viradas para baixo.
+    ``estoque`` é a ordem de saque e ``pos_estoque`` quantas já saíram.
+    ``mover``, ``distribuir_estoque`` e a remoção de K→A atualizam ``hash``
+    com XOR, sem recalcular o estado inteiro.
+    """
+
+    __slots__ = ("pilhas", "ocultas", "estoque", "pos_estoque", "fundacao", "hash")
+
+    def __init__(self, pilhas: List[bytearray], ocultas: List[int], estoque: bytes,
+                 pos_estoque: int = 0, fundacao: Optional[bytearray] = None):
+        self.pilhas = pilhas
+        self.ocultas = ocultas
+        self.estoque = bytes(estoque)
+        self.pos_estoque = pos_estoque
+        self.fundacao = fundacao if fundacao is not None else bytearray()
+        self.hash = self.zobrist_completo()
+
+    # ----- conversão -----
+    @classmethod
+    def de_jogo(cls, jogo: Jogo) -> 'EstadoCompacto':
+        pilhas = []
+        ocultas = []
+        for pilha in jogo.tableau:
+            cods = bytearray(codificar(c.valor, c.naipe) for c in pilha.cartas)
+            n_ocultas = 0
+            while n_ocultas < len(pilha.cartas) and not pilha.cartas[n_ocultas].virada_para_cima:
+                n_ocultas += 1
+            if any(not c.virada_para_cima for c in pilha.cartas[n_ocultas:]):
+                raise ValueError("Carta virada para baixo acima de carta visível.")
+            pilhas.append(cods)
+            ocultas.append(n_ocultas)
+        estoque = bytes(codificar(c.valor, c.naipe) for c in jogo.estoque.restantes())
+        fundacao = bytearray(INDICE_NAIPE[seq[0].naipe] for seq in jogo.fundacao)
+        return cls(pilhas, ocultas, estoque, 0, fundacao)
+
+    def para_jogo(self) -> Jogo:
+        jogo = Jogo(Baralho([Carta(valor_de(c), naipe_de(c), False) for c in self.restante_estoque()]))
+        for i, cods in enumerate(self.pilhas):
+            oc = self.ocultas[i]
+            jogo.tableau[i].push([Carta(valor_de(c), naipe_de(c), k >= oc) for k, c in enumerate(cods)])
+        for n in self.fundacao:
+            jogo.fundacao.append([Carta(v, NAIPES[n], True) for v in range(13, 0, -1)])
+        return jogo
+
+    def copia(self) -> 'EstadoCompacto':
+        novo = object.__new__(EstadoCompacto)
+        novo.pilhas = [bytearray(p) for p in self.pilhas]
+        novo.ocultas = list(self.ocultas)
+        novo.estoque = self.estoque
+        novo.pos_estoque = self.pos_estoque
+        novo.fundacao = bytearray(self.fundacao)
+        novo.hash = self.hash
+        return novo
+
+    # ----- consulta -----
+    def restante_estoque(self) -> bytes:
+        return self.estoque[self.pos_estoque:]
+
+    def cartas(self, i: int) -> Tuple[CartaFixa, ...]:
+        return tuple(CartaFixa(c) for c in self.pilhas[i])
+
+    def visiveis(self, i: int) -> int:
+        return len(self.pilhas[i]) - self.ocultas[i]
+
+    def chave(self) -> bytes:
+        # Serialização canônica do estado (sem o hash), útil para igualdade exata
+        restante = self.restante_estoque()
+        partes = [bytes([len(self.fundacao)]), bytes(self.fundacao), bytes([len(restante)]), restante]
+        for p, oc in zip(self.pilhas, self.ocultas):
+            partes.append(bytes([len(p), oc]))
+            partes.append(bytes(p))
+        return b"".join(partes)
+
+    @classmethod
+    def de_chave(cls, chave: bytes) -> 'EstadoCompacto':
+        # Inverso de chave(): o estoque volta só com as cartas restantes
+        n_fund = chave[0]
+        fundacao = bytearray(chave[1:1 + n_fund])
+        k = 1 + n_fund
+        n_est = chave[k]
+        estoque = chave[k + 1:k + 1 + n_est]
+        k += 1 + n_est
+        pilhas = []
+        ocultas = []
+        for _ in range(N_PILHAS):
+            n, oc = chave[k], chave[k + 1]
+            pilhas.append(bytearray(chave[k + 2:k + 2 + n]))
+            ocultas.append(oc)
+            k += 2 + n
+        return cls(pilhas, ocultas, estoque, 0, fundacao)
+
+    def chave_canonica(self, simetrica: bool = False) -> bytes:
+        # Como chave(), mas sem estoque as colunas vão ordenadas: estados que só
+        # diferem pela ordem delas (ex.: qual coluna vazia recebeu o bloco)
+        # coincidem. Com estoque não, porque distribuir põe a carta k na coluna
+        # k; ``simetrica=True`` ordena mesmo assim (junta estados distintos)
+        restante = self.restante_estoque()
+        colunas = [bytes([len(p), oc]) + bytes(p) for p, oc in zip(self.pilhas, self.ocultas)]
+        if simetrica or not restante:
+            colunas.sort()
+        return b"".join([bytes([len(self.fundacao)]), bytes(self.fundacao),
+                         bytes([len(restante)]), restante] + colunas)
+
+    def hash_canonico(self, simetrica: bool = False) -> int:
+        # 64 bits estáveis entre processos (hash() de bytes muda a cada execução)
+        return int.from_bytes(blake2b(self.chave_canonica(simetrica), digest_size=8).digest(),
+                              "little")
+
+    def __hash__(self):
+        return self.hash
+
+    def __eq__(self, outro):
+        if not isinstance(outro, EstadoCompacto):
+            return NotImplemented
+        return (self.hash == outro.hash and self.ocultas == outro.ocultas
+                and self.pilhas == outro.pilhas and self.fundacao == outro.fundacao
+                and self.restante_estoque() == outro.restante_estoque())
+
+    def zobrist_completo(self) -> int:
+        h = Z_ESTOQUE[len(self.estoque) - self.pos_estoque]
+        for i, (cods, oc) in enumerate(zip(self.pilhas, self.ocultas)):
+            for pos, c in enumerate(cods):
+                h ^= z_carta(i, pos, c, pos >= oc)
+        for k, n in enumerate(self.fundacao):
+            h ^= Z_FUNDACAO[k * len(NAIPES) + n]
+        return h & _MASCARA_64
+
+    def verificar_vitoria(self) -> bool:
+        return len(self.fundacao) == 8
+
+    # ----- regras (mesmas de Pilha/Jogo) -----
+    def tamanho_sequencia_topo(self, i: int) -> int:
+        # Quantas cartas do topo formam sequência decrescente do mesmo naipe, todas visíveis
+        cods = self.pilhas[i]
+        n = len(cods)
+        oc = self.ocultas[i]
+        if n == oc:
+            return 0
+        k = n - 1
+        while k > oc and cods[k - 1] == cods[k] + 1 and cods[k - 1] // 13 == cods[k] // 13:
+            k -= 1
+        return n - k
+
+    def pode_mover(self, src: int, qtd: int, dst: int) -> bool:
+        if not (0 <= src < N_PILHAS and 0 <= dst < N_PILHAS) or src == dst:
+            return False
+        if qtd <= 0 or qtd > self.tamanho_sequencia_topo(src):
+            return False
+        destino = self.pilhas[dst]
+        if not destino:
+            return True
+        if self.ocultas[dst] == len(destino):
+            return False
+        base = self.pilhas[src][-qtd]
+        topo = destino[-1]
+        return topo // 13 == base // 13 and topo == base + 1
+
+    def mover(self, src: int, qtd: int, dst: int) -> bool:
+        if not self.pode_mover(src, qtd, dst):
+            return False
+        origem = self.pilhas[src]
+        destino = self.pilhas[dst]
+        h = self.hash
+        n_orig = len(origem)
+        n_dest = len(destino)
+        bloco = origem[n_orig - qtd:]
+        for k, c in enumerate(bloco):
+            h ^= z_carta(src, n_orig - qtd + k, c, True) ^ z_carta(dst, n_dest + k, c, True)
+        del origem[n_orig - qtd:]
+        destino += bloco
+        self.hash = h
+        self._virar_topo(src)
+        self._remover_sequencia_completa(dst)
+        return True
+
+    def distribuir_estoque(self) -> bool:
+        if any(not p for p in self.pilhas):
+            return False
+        if len(self.estoque) - self.pos_estoque < N_PILHAS:
+            return False
+
+        restante = len(self.estoque) - self.pos_estoque
+        h = self.hash ^ Z_ESTOQUE[restante] ^ Z_ESTOQUE[restante - N_PILHAS]
+        for i, p in enumerate(self.pilhas):
+            c = self.estoque[self.pos_estoque + i]
+            h ^= z_carta(i, len(p), c, True)
+            p.append(c)
+        self.pos_estoque += N_PILHAS
+        self.hash = h
+        return True
+
+    def _virar_topo(self, i: int):
+        p = self.pilhas[i]
+        if p and self.ocultas[i] == len(p):
+            pos = len(p) - 1
+            self.hash ^= z_carta(i, pos, p[pos], False) ^ z_carta(i, pos, p[pos], True)
+            self.ocultas[i] -= 1
+
+    def _remover_sequencia_completa(self, i: int) -> bool:
+        p = self.pilhas[i]
+        n = len(p)
+        if n < 13 or p[n - 13] % 13 != 12 or self.tamanho_sequencia_topo(i) < 13:
+            return False
+        h = self.hash
+        for pos in range(n - 13, n):
+            h ^= z_carta(i, pos, p[pos], True)
+        naipe = p[n - 1] // 13
+        h ^= Z_FUNDACAO[len(self.fundacao) * len(NAIPES) + naipe]
+        self.fundacao.append(naipe)
+        del p[n - 13:]
+        self.hash = h
+        self._virar_topo(i)
+        return True
+
+
+def hash_jogo(jogo: Jogo) -> int:
+    # O mesmo hash de EstadoCompacto.de_jogo(jogo).hash, mantido pelo próprio Jogo
+    return jogo.hash_zobrist
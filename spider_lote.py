@@ -0,0 +1,289 @@
+"""Motor em lote (NumPy): N partidas avançando juntas, uma ação por partida.
+
+Guarda o tableau de todas as partidas em arrays e calcula máscaras de ações
+válidas e aplica ações de forma vetorizada, com as mesmas regras de
+``Pilha.pode_mover_bloco_para``, ``Jogo.distribuir_estoque`` e
+``Pilha.remover_sequencia_completa``. As cartas usam os mesmos códigos de
+``spider_estado`` (``naipe * 13 + valor - 1``; -1 = posição vazia).
+
+Espaço de ações fixo: ``(src * 10 + dst) * 13 + (qtd - 1)`` para mover e
+``ACAO_DISTRIBUIR`` para distribuir o estoque. ``python -m spider_lote``
+roda a checagem diferencial contra o motor de objetos.
+"""
+import random
+import sys
+from typing import Iterable, Tuple
+
+import numpy as np
+
+from spider_estado import EstadoCompacto, codificar
+from spider_regras import Baralho, Jogo
+
+N_PILHAS = 10
+# Uma sequência válida tem no máximo 13 cartas (K→A)
+QTD_MAX = 13
+# Maior altura possível de uma coluna
+ALTURA_MAX = 104
+N_ACOES = N_PILHAS * N_PILHAS * QTD_MAX + 1
+ACAO_DISTRIBUIR = N_ACOES - 1
+SEM_ACAO = -1
+
+_DISTRIBUICAO_INICIAL = [6] * 4 + [5] * 6
+_QTDS = np.arange(1, QTD_MAX + 1, dtype=np.int16)
+
+
+def codificar_acao(src: int, qtd: int, dst: int) -> int:
+    return (src * N_PILHAS + dst) * QTD_MAX + (qtd - 1)
+
+
+def decodificar_acao(acao: int) -> Tuple[int, int, int]:
+    # Devolve (src, qtd, dst); para ACAO_DISTRIBUIR, (-1, 0, -1) como no solver
+    if acao == ACAO_DISTRIBUIR:
+        return -1, 0, -1
+    par, q = divmod(acao, QTD_MAX)
+    src, dst = divmod(par, N_PILHAS)
+    return src, q + 1, dst
+
+
+def ordem_baralho(semente: int) -> np.ndarray:
+    cartas = Baralho(semente=semente).cartas
+    return np.array([codificar(c.valor, c.naipe) for c in cartas], dtype=np.int8)
+
+
+class LoteJogos:
+    """N partidas em arrays NumPy.
+
+    ``cartas[n, p, k]`` é o código da k-ésima carta (da base) da coluna p,
+    ``altura[n, p]`` o tamanho da coluna, ``ocultas[n, p]`` quantas cartas da
+    base estão viradas para baixo e ``seq[n, p]`` o tamanho da sequência
+    decrescente do mesmo naipe no topo. ``baralho[n]`` é a ordem de saque e
+    ``pos_estoque[n]`` quantas cartas já saíram dele.
+    """
+
+    def __init__(self, n: int):
+        self.n = n
+        self.cartas = np.full((n, N_PILHAS, ALTURA_MAX), -1, dtype=np.int8)
+        self.altura = np.zeros((n, N_PILHAS), dtype=np.int16)
+        self.ocultas = np.zeros((n, N_PILHAS), dtype=np.int16)
+        self.seq = np.zeros((n, N_PILHAS), dtype=np.int16)
+        self.baralho = np.zeros((n, 104), dtype=np.int8)
+        self.pos_estoque = np.zeros(n, dtype=np.int16)
+        self.fundacao = np.zeros(n, dtype=np.int8)
+
+    # ----- criação -----
+    @classmethod
+    def novos(cls, sementes: Iterable[int]) -> 'LoteJogos':
+        # Mesma distribuição que Jogo(Baralho(semente=s)).iniciar_jogo()
+        sementes = list(sementes)
+        lote = cls(len(sementes))
+        for i, s in enumerate(sementes):
+            lote.baralho[i] = ordem_baralho(s)
+        pos = 0
+        for p, qtd in enumerate(_DISTRIBUICAO_INICIAL):
+            lote.cartas[:, p, :qtd] = lote.baralho[:, pos:pos + qtd]
+            lote.altura[:, p] = qtd
+            lote.ocultas[:, p] = qtd - 1
+            lote.seq[:, p] = 1
+            pos += qtd
+        lote.pos_estoque[:] = pos
+        return lote
+
+    @classmethod
+    def de_estados(cls, estados: Iterable[EstadoCompacto]) -> 'LoteJogos':
+        estados = list(estados)
+        lote = cls(len(estados))
+        for i, e in enumerate(estados):
+            for p, cods in enumerate(e.pilhas):
+                lote.cartas[i, p, :len(cods)] = np.frombuffer(bytes(cods), dtype=np.int8)
+                lote.altura[i, p] = len(cods)
+                lote.ocultas[i, p] = e.ocultas[p]
+                lote.seq[i, p] = e.tamanho_sequencia_topo(p)
+            restante = e.restante_estoque()
+            # O baralho do lote guarda só o que interessa: o estoque no fim do array
+            inicio = 104 - len(restante)
+            lote.baralho[i, inicio:] = np.frombuffer(restante, dtype=np.int8)
+            lote.pos_estoque[i] = inicio
+            lote.fundacao[i] = len(e.fundacao)
+        return lote
+
+    def estado(self, i: int) -> EstadoCompacto:
+        pilhas = [bytearray(self.cartas[i, p, :self.altura[i, p]].astype(np.uint8).tobytes())
+                  for p in range(N_PILHAS)]
+        ocultas = [int(x) for x in self.ocultas[i]]
+        estoque = self.baralho[i].astype(np.uint8).tobytes()
+        # Fundação sem naipe registrado: no Spider de 1 naipe é sempre ♠ (índice 0)
+        return EstadoCompacto(pilhas, ocultas, estoque, int(self.pos_estoque[i]),
+                              bytearray(int(self.fundacao[i])))
+
+    def para_jogo(self, i: int) -> Jogo:
+        return self.estado(i).para_jogo()
+
+    # ----- consultas vetorizadas -----
+    def topos(self) -> np.ndarray:
+        idx = np.maximum(self.altura - 1, 0).astype(np.intp)
+        topo = np.take_along_axis(self.cartas, idx[..., None], axis=2)[..., 0].astype(np.int16)
+        return np.where(self.altura > 0, topo, -1)
+
+    def pode_distribuir(self) -> np.ndarray:
+        return (self.altura > 0).all(axis=1) & (104 - self.pos_estoque >= N_PILHAS)
+
+    def vitorias(self) -> np.ndarray:
+        return self.fundacao == 8
+
+    def mascara_acoes(self) -> np.ndarray:
+        """Máscara booleana [N, N_ACOES] das ações válidas em cada partida."""
+        topo = self.topos()
+        seq = self.seq
+        # Um bloco de qtd cartas do topo de s tem base topo[s] + qtd - 1; encaixa em d
+        # se topo[d] == base + 1 (mesmo naipe) e o topo de d estiver virado para cima
+        diff = topo[:, None, :] - topo[:, :, None]                    # [N, s, d]
+        mesmo_naipe = (topo[:, None, :] // 13) == (topo[:, :, None] // 13)
+        dest_ok = (self.altura > self.ocultas)[:, None, :] & mesmo_naipe
+        q = _QTDS[None, None, None, :]
+        cabe = q <= seq[:, :, None, None]                            # [N, s, 1, q]
+        encaixa = dest_ok[..., None] & (diff[..., None] == q)
+        vazia = (self.altura == 0)[:, None, :, None]
+        m = cabe & (encaixa | vazia)
+        m &= ~np.eye(N_PILHAS, dtype=bool)[None, :, :, None]
+        mascara = np.empty((self.n, N_ACOES), dtype=bool)
+        mascara[:, :ACAO_DISTRIBUIR] = m.reshape(self.n, -1)
+        mascara[:, ACAO_DISTRIBUIR] = self.pode_distribuir()
+        return mascara
+
+    # ----- aplicação -----
+    def aplicar(self, acoes: np.ndarray) -> np.ndarray:
+        """Aplica uma ação por partida (``SEM_ACAO`` = nada). Devolve quais foram aceitas."""
+        acoes = np.asarray(acoes, dtype=np.int64)
+        mascara = self.mascara_acoes()
+        validas = acoes >= 0
+        validas[validas] = mascara[np.nonzero(validas)[0], acoes[validas]]
+
+        distribui = validas & (acoes == ACAO_DISTRIBUIR)
+        if distribui.any():
+            self._distribuir(np.nonzero(distribui)[0])
+
+        move = validas & (acoes != ACAO_DISTRIBUIR)
+        if move.any():
+            jogos = np.nonzero(move)[0]
+            par, q = np.divmod(acoes[jogos], QTD_MAX)
+            src, dst = np.divmod(par, N_PILHAS)
+            self._mover(jogos, src, q + 1, dst)
+        return validas
+
+    def _mover(self, jogos, src, qtd, dst):
+        h_src = self.altura[jogos, src].astype(np.intp)
+        h_dst = self.altura[jogos, dst].astype(np.intp)
+        for k in range(QTD_MAX):
+            sel = qtd > k
+            if not sel.any():
+                break
+            g, s, d = jogos[sel], src[sel], dst[sel]
+            origem = h_src[sel] - qtd[sel] + k
+            self.cartas[g, d, h_dst[sel] + k] = self.cartas[g, s, origem]
+            self.cartas[g, s, origem] = -1
+        self.altura[jogos, src] -= qtd
+        self.altura[jogos, dst] += qtd
+        # Destino: o bloco encaixou (ou a coluna estava vazia), a sequência cresce
+        self.seq[jogos, dst] = np.where(h_dst == 0, qtd, self.seq[jogos, dst] + qtd)
+        # Origem: se sobrou parte da sequência, basta descontar; senão vira/recalcula
+        sobra = self.seq[jogos, src] - qtd
+        self.seq[jogos, src] = np.maximum(sobra, 0)
+        recalc = sobra <= 0
+        if recalc.any():
+            self._ajustar_topo(jogos[recalc], src[recalc])
+        self._remover_sequencias(jogos, dst)
+
+    def _distribuir(self, jogos):
+        topo = self.topos()[jogos]
+        pos = self.pos_estoque[jogos].astype(np.intp)
+        for p in range(N_PILHAS):
+            c = self.baralho[jogos, pos + p]
+            h = self.altura[jogos, p].astype(np.intp)
+            self.cartas[jogos, p, h] = c
+            t = topo[:, p]
+            continua = (h > self.ocultas[jogos, p]) & (t == c.astype(np.int16) + 1) & (t // 13 == c // 13)
+            self.seq[jogos, p] = np.where(continua, self.seq[jogos, p] + 1, 1)
+            self.altura[jogos, p] += 1
+        self.pos_estoque[jogos] += N_PILHAS
+
+    def _ajustar_topo(self, jogos, pilhas):
+        # Depois de tirar cartas: vira o topo se ficou virado para baixo, ou
+        # recalcula a sequência do topo (no máximo 13 cartas)
+        h = self.altura[jogos, pilhas].astype(np.intp)
+        oc = self.ocultas[jogos, pilhas]
+        virar = (h > 0) & (h == oc)
+        self.ocultas[jogos[virar], pilhas[virar]] -= 1
+        oc = self.ocultas[jogos, pilhas]
+        seq = np.where(h > oc, 1, 0).astype(np.int16)
+        ativo = h > oc
+        for k in range(1, QTD_MAX):
+            ativo &= h - k - 1 >= oc
+            if not ativo.any():
+                break
+            idx_b = np.maximum(h - k, 0)
+            idx_a = np.maximum(h - k - 1, 0)
+            a = self.cartas[jogos, pilhas, idx_a].astype(np.int16)
+            b = self.cartas[jogos, pilhas, idx_b].astype(np.int16)
+            ativo &= (a == b + 1) & (a // 13 == b // 13)
+            seq += ativo
+        self.seq[jogos, pilhas] = seq
+
+    def _remover_sequencias(self, jogos, pilhas):
+        h = self.altura[jogos, pilhas].astype(np.intp)
+        base = self.cartas[jogos, pilhas, np.maximum(h - QTD_MAX, 0)]
+        completa = (self.seq[jogos, pilhas] >= QTD_MAX) & (base % 13 == 12)
+        if not completa.any():
+            return
+        g, p, hh = jogos[completa], pilhas[completa], h[completa]
+        for k in range(QTD_MAX):
+            self.cartas[g, p, hh - 1 - k] = -1
+        self.altura[g, p] -= QTD_MAX
+        self.fundacao[g] += 1
+        self._ajustar_topo(g, p)
+
+
+# ===== CHECAGEM DIFERENCIAL =====
+def checar_contra_objetos(n_jogos: int = 64, passos: int = 300, semente: int = 0) -> int:
+    """Joga ações aleatórias válidas nos dois motores e compara o estado a cada passo.
+
+    Levanta AssertionError na primeira divergência; devolve quantas ações foram comparadas.
+    """
+    rng = random.Random(semente)
+    sementes = [semente * 100_003 + i for i in range(n_jogos)]
+    lote = LoteJogos.novos(sementes)
+    jogos = []
+    for s in sementes:
+        j = Jogo(Baralho(semente=s))
+        j.iniciar_jogo()
+        jogos.append(j)
+
+    comparadas = 0
+    for passo in range(passos):
+        mascara = lote.mascara_acoes()
+        acoes = np.full(n_jogos, SEM_ACAO, dtype=np.int64)
+        for i, jogo in enumerate(jogos):
+            esperado = {codificar_acao(*m) for m in jogo.movimentos_validos()}
+            if jogo.pode_distribuir():
+                esperado.add(ACAO_DISTRIBUIR)
+            obtido = set(np.nonzero(mascara[i])[0].tolist())
+            assert obtido == esperado, f"máscara diverge: jogo {i}, passo {passo}"
+            if esperado:
+                acoes[i] = rng.choice(sorted(esperado))
+        aceitas = lote.aplicar(acoes)
+        for i, jogo in enumerate(jogos):
+            a = int(acoes[i])
+            if a == SEM_ACAO:
+                continue
+            src, qtd, dst = decodificar_acao(a)
+            ok = jogo.distribuir_estoque() if a == ACAO_DISTRIBUIR else jogo.mover(src, qtd, dst)
+            assert ok == bool(aceitas[i]), f"aceitação diverge: jogo {i}, passo {passo}"
+            e = EstadoCompacto.de_jogo(jogo)
+            assert lote.estado(i).chave() == e.chave(), f"estado diverge: jogo {i}, passo {passo}"
+            assert [int(x) for x in lote.seq[i]] == [p.tamanho_sequencia_topo() for p in jogo.tableau]
+            comparadas += 1
+    return comparadas
+
+
+if __name__ == "__main__":
+    n = checar_contra_objetos(*(int(a) for a in sys.argv[1:]))
+    print(f"ok: {n} ações idênticas nos dois motores")
@@ -0,0 +1,125 @@
+"""Perfilador de quadros do jogo: overlay com tempos por etapa e trace do Chrome.
+
+O laço principal chama ``inicio_quadro()``, ``marcar(etapa)`` ao fim de cada
+etapa e ``fim_quadro()``. Desligado, cada chamada é só um teste de atributo.
+Ligado, guarda os tempos dos últimos quadros (para o gráfico p50/p99) e os
+eventos dos últimos segundos (para ``exportar_trace``, no formato
+trace-event JSON lido pelo chrome://tracing e pelo Perfetto).
+"""
+import json
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+import pygame
+
+ETAPAS = ("eventos", "logica", "ui_topo", "tableau", "overlay", "flip")
+CORES_ETAPAS = {
+    "eventos": (120, 200, 255),
+    "logica": (255, 200, 80),
+    "ui_topo": (160, 255, 140),
+    "tableau": (255, 120, 120),
+    "overlay": (150, 150, 150),
+    "flip": (200, 140, 255),
+}
+
+
+def percentil(valores: List[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+class Perfilador:
+    def __init__(self, quadros_grafico: int = 240, segundos_trace: float = 10.0):
+        self.ativo = False
+        self.segundos_trace = segundos_trace
+        # Por quadro: {etapa: ms} e o total do quadro
+        self.quadros: Deque[Tuple[Dict[str, float], float]] = deque(maxlen=quadros_grafico)
+        # (etapa, início em µs, duração em µs) dos últimos segundos_trace
+        self.eventos: Deque[Tuple[str, float, float]] = deque()
+        self._inicio = 0.0
+        self._ultima = 0.0
+        self._atual: Dict[str, float] = {}
+
+    def alternar(self):
+        self.ativo = not self.ativo
+        self.quadros.clear()
+        self.eventos.clear()
+
+    def inicio_quadro(self):
+        if not self.ativo:
+            return
+        self._inicio = self._ultima = time.perf_counter()
+        self._atual = {}
+
+    def marcar(self, etapa: str):
+        if not self.ativo:
+            return
+        agora = time.perf_counter()
+        dur = agora - self._ultima
+        self._atual[etapa] = self._atual.get(etapa, 0.0) + dur * 1000
+        self.eventos.append((etapa, self._ultima * 1e6, dur * 1e6))
+        self._ultima = agora
+
+    def fim_quadro(self):
+        if not self.ativo:
+            return
+        total = (self._ultima - self._inicio) * 1000
+        self.quadros.append((self._atual, total))
+        self.eventos.append(("quadro", self._inicio * 1e6, total * 1000))
+        # Descarta o que ficou fora da janela do trace
+        limite = (self._ultima - self.segundos_trace) * 1e6
+        while self.eventos and self.eventos[0][1] < limite:
+            self.eventos.popleft()
+
+    # ----- exportação -----
+    def exportar_trace(self, caminho: str = None) -> str:
+        if caminho is None:
+            caminho = os.path.abspath(time.strftime("spider_trace_%Y%m%d_%H%M%S.json"))
+        eventos = [{"name": nome, "cat": "quadro" if nome == "quadro" else "etapa",
+                    "ph": "X", "ts": round(ts, 1), "dur": round(dur, 1),
+                    "pid": os.getpid(), "tid": 1 if nome == "quadro" else 2}
+                   for nome, ts, dur in self.eventos]
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": eventos, "displayTimeUnit": "ms"}, f)
+        return caminho
+
+    # ----- overlay -----
+    def desenhar(self, surf: pygame.Surface, fonte: pygame.font.Font, rect: pygame.Rect):
+        pygame.draw.rect(surf, (10, 10, 15), rect)
+        pygame.draw.rect(surf, (90, 90, 110), rect, 1)
+        totais = [t for _, t in self.quadros]
+        p50, p99 = percentil(totais, 50), percentil(totais, 99)
+
+        y = rect.y + 4
+        cab = fonte.render(f"quadro p50 {p50:5.2f} ms  p99 {p99:5.2f} ms", True, (240, 240, 240))
+        surf.blit(cab, (rect.x + 6, y))
+        y += cab.get_height() + 2
+
+        # Média das etapas na janela
+        n = max(len(self.quadros), 1)
+        for etapa in ETAPAS:
+            media = sum(q.get(etapa, 0.0) for q, _ in self.quadros) / n
+            txt = fonte.render(f"{etapa:8s} {media:6.2f} ms", True, CORES_ETAPAS[etapa])
+            surf.blit(txt, (rect.x + 6, y))
+            y += txt.get_height()
+
+        # Gráfico: uma coluna por quadro, empilhando as etapas; linhas de p50, p99 e 16,7 ms
+        graf = pygame.Rect(rect.x + 6, y + 4, rect.width - 12, rect.bottom - y - 10)
+        escala = graf.height / max(p99 * 1.2, 1000 / 60 * 1.2)
+        largura = max(1, graf.width // max(self.quadros.maxlen, 1))
+        for k, (etapas, _) in enumerate(self.quadros):
+            x = graf.x + k * largura
+            base = graf.bottom
+            for etapa in ETAPAS:
+                h = etapas.get(etapa, 0.0) * escala
+                if h >= 0.5:
+                    pygame.draw.rect(surf, CORES_ETAPAS[etapa], (x, base - h, largura, h))
+                    base -= h
+        for valor, cor in ((1000 / 60, (90, 90, 110)), (p50, (240, 240, 240)), (p99, (255, 80, 80))):
+            yy = graf.bottom - valor * escala
+            if yy >= graf.y:
+                pygame.draw.line(surf, cor, (graf.x, yy), (graf.right, yy))
@@ -1,204 +1,28 @@
-import sys
+import time
+# Referência do --medir-inicio: antes de importar o pygame
+_INICIO = time.perf_counter()
+
+import json
+import os
+from collections import OrderedDict
 import random
+import sys
+import weakref
+from bisect import bisect_right
 import pygame
-from typing import List, Optional, Tuple
-
-
-NAIPE = '♠'
-VALOR_NOME = {
-    1: 'A', 2: '2', 3: '3', 4: '4', 5: '5', 6: '6', 7: '7',
-    8: '8', 9: '9', 10: '10', 11: 'J', 12: 'Q', 13: 'K'
-}
-
-
-class Carta:
-    def __init__(self, valor: int, naipe: str = NAIPE, virada_para_cima: bool = False):
-        self.valor = valor
-        self.naipe = naipe
-        self.virada_para_cima = virada_para_cima
-
-    def virar(self):
-        self.virada_para_cima = True
-
-    def __str__(self):
-        return f"{VALOR_NOME[self.valor]}{self.naipe}" if self.virada_para_cima else "##"
-
-
-class Pilha:
-    def __init__(self):
-        self.cartas: List[Carta] = []
-
-    def esta_vazia(self) -> bool:
-        return len(self.cartas) == 0
-
-    def topo(self) -> Optional[Carta]:
-        return self.cartas[-1] if self.cartas else None
-
-    def push(self, cartas: List[Carta]):
-        self.cartas.extend(cartas)
-
-    def pop(self, n: int = 1) -> List[Carta]:
-        if n <= 0 or n > len(self.cartas):
-            raise ValueError("Quantidade inválida no pop.")
-        ret = self.cartas[-n:]
-        self.cartas = self.cartas[:-n]
-        return ret
-
-    def _indice_inicio_bloco_visivel(self) -> int:
-        if self.esta_vazia() or not self.topo().virada_para_cima:
-            return len(self.cartas)
-        i = len(self.cartas) - 1
-        while i >= 0 and self.cartas[i].virada_para_cima:
-            i -= 1
-        return i + 1
-
-    def bloco_visivel(self) -> List[Carta]:
-        i = self._indice_inicio_bloco_visivel()
-        return self.cartas[i:] if i < len(self.cartas) else []
-
-    def _sequencia_decrescente_mesmo_naipe(self, cartas: List[Carta]) -> bool:
-        if not cartas:
-            return False
-        for i in range(len(cartas) - 1):
-            a, b = cartas[i], cartas[i+1]
-            if a.valor != b.valor + 1 or a.naipe != b.naipe:
-                return False
-        return True
-
-    def pode_mover_bloco_para(self, qtd: int, destino: 'Pilha') -> bool:
-        bloco = self.cartas[-qtd:] if qtd <= len(self.cartas) else []
-        if not bloco or not all(c.virada_para_cima for c in bloco):
-            return False
-        if not self._sequencia_decrescente_mesmo_naipe(bloco):
-            return False
-        if destino.esta_vazia():
-            return True
-        topo_dest = destino.topo()
-        base = bloco[0]
-        return topo_dest.virada_para_cima and topo_dest.naipe == base.naipe and topo_dest.valor == base.valor + 1
-
-    def mover_bloco_para(self, qtd: int, destino: 'Pilha') -> bool:
-        if self.pode_mover_bloco_para(qtd, destino):
-            movidas = self.pop(qtd)
-            destino.push(movidas)
-            if not self.esta_vazia() and not self.topo().virada_para_cima:
-                self.topo().virar()
-            return True
-        return False
-
-    def remover_sequencia_completa(self) -> Optional[List[Carta]]:
-        if len(self.cartas) < 13:
-            return None
-        topo_bloco = self.cartas[-13:]
-        if not all(c.virada_para_cima for c in topo_bloco):
-            return None
-        if topo_bloco[0].valor == 13 and self._sequencia_decrescente_mesmo_naipe(topo_bloco):
-            if topo_bloco[-1].valor == 1:
-                seq = self.pop(13)
-                if not self.esta_vazia() and not self.topo().virada_para_cima:
-                    self.topo().virar()
-                return seq
-        return None
-
-
-class Baralho:
-    def __init__(self):
-        self.cartas: List[Carta] = [Carta(v, NAIPE, False) for _ in range(8) for v in range(1, 14)]
-        random.shuffle(self.cartas)
-
-    def sacar(self, n: int) -> List[Carta]:
-        if n > len(self.cartas):
-            raise ValueError("Sem cartas suficientes no baralho.")
-        ret = self.cartas[:n]
-        self.cartas = self.cartas[n:]
-        return ret
-
-    def restante(self) -> int:
-        return len(self.cartas)
-
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
-class Jogo:
-    def __init__(self):
-        self.tableau: List[Pilha] = [Pilha() for _ in range(10)]
-        self.fundacao: List[List[Carta]] = []
-        self.estoque = Baralho()
-
-    def iniciar_jogo(self):
-        distribuicoes = [6]*4 + [5]*6
-        for i, qtd in enumerate(distribuicoes):
-            cartas = self.estoque.sacar(qtd)
-            self.tableau[i].push(cartas)
-        for pilha in self.tableau:
-            if not pilha.esta_vazia():
-                pilha.topo().virar()
-
-    def distribuir_estoque(self) -> bool:
-        if any(p.esta_vazia() for p in self.tableau):
-            return False
-        if self.estoque.restante() < 10:
-            return False
-        for pilha in self.tableau:
-            carta = self.estoque.sacar(1)[0]
-            carta.virar()
-            pilha.push([carta])
-        return True
-
-    def mover(self, src: int, qtd: int, dst: int) -> bool:
-        if not (0 <= src < 10 and 0 <= dst < 10) or src == dst:
-            return False
-        origem = self.tableau[src]
-        destino = self.tableau[dst]
-        if qtd <= 0 or qtd > len(origem.cartas):
-            return False
-        ok = origem.mover_bloco_para(qtd, destino)
-        if ok:
-            seq = destino.remover_sequencia_completa()
-            if seq:
-                self.fundacao.append(seq)
-        return ok
-
-    def verificar_vitoria(self) -> bool:
-        return len(self.fundacao) == 8
-
-    def sem_movimentos_validos(self) -> bool:
-        if self.estoque.restante() >= 10 and all(not p.esta_vazia() for p in self.tableau):
-            return False
-        for i, origem in enumerate(self.tableau):
-            start = origem._indice_inicio_bloco_visivel()
-            visiveis = len(origem.cartas) - start
-            if visiveis <= 0:
-                continue
-            for qtd in range(1, visiveis+1):
-                for j, destino in enumerate(self.tableau):
-                    if i == j:
-                        continue
-                    if origem.pode_mover_bloco_para(qtd, destino):
-                        return False
-        return True
-
-
-# ===== FUNÇÃO DE DICA =====
-def encontrar_primeiro_movimento_valido(jogo: Jogo):
-    for i, origem in enumerate(jogo.tableau):
-        start = origem._indice_inicio_bloco_visivel()
-        visiveis = len(origem.cartas) - start
-        if visiveis <= 0:
-            continue
+from spider_regras import (
+    NAIPE, VALOR_NOME, Carta, Pilha, Baralho, Jogo,
+    encontrar_primeiro_movimento_valido,
+)
+from spider_baralhos import FAIXAS, BaseBaralhos
+from spider_perfil import Perfilador
 
-        for qtd in range(1, visiveis + 1):
-            bloco = origem.cartas[-qtd:]
-            if not bloco or not all(c.virada_para_cima for c in bloco):
-                continue
-            if not origem._sequencia_decrescente_mesmo_naipe(bloco):
-                continue
-
-            for j, destino in enumerate(jogo.tableau):
-                if i == j:
-                    continue
-                if origem.pode_mover_bloco_para(qtd, destino):
-                    return i, qtd, j
-
-    return None
+if TYPE_CHECKING:
+    # Autosave e replay (e o spider_estado que vem com eles, com a tabela
+    # Zobrist) só são importados em main(), depois do primeiro quadro
+    from spider_replay import GravadorReplay, Replay
 
 
 # ============= PYGAME ==============
@@ -213,6 +37,20 @@ TOP_TABLEAU_Y = 160
 OVERLAP_FACEDOWN = 8
 OVERLAP_FACEUP = 28
 
+# A janela é redimensionável: os valores acima são o layout de referência
+# (ESCALA 1) e aplicar_layout() recalcula tudo para o tamanho atual
+LARGURA_BASE, ALTURA_BASE = LARGURA, ALTURA
+ESCALA = 1.0
+# Colunas altas comprimem as cartas viradas para cima até este mínimo (na escala 1)
+OVERLAP_FACEUP_MIN = 12
+# Incrementado a cada aplicar_layout(); caches de geometria comparam com ele
+geracao_layout = 0
+
+
+def px(v: float) -> int:
+    # Medida do layout de referência convertida para a escala atual
+    return round(v * ESCALA)
+
 # CORES INICIAIS (Modo Claro)
 BG = (83, 122, 78)
 CARD_FRONT = (240, 240, 240)
@@ -228,7 +66,7 @@ dark_mode = False
 
 # FUNÇÃO PARA TROCAR O TEMA 
 def trocar_tema():
-    global BG, CARD_FRONT, CARD_BACK, CARD_EDGE, TXT, TXT_INV, ACCENT, DISABLED, dark_mode
+    global BG, CARD_FRONT, CARD_BACK, CARD_EDGE, TXT, TXT_INV, ACCENT, DISABLED, dark_mode, _atlas
     if dark_mode: # Se estiver no escuro, vai para o claro
         BG       = (83, 122, 78)
         CARD_FRONT = (240, 240, 240)
@@ -249,25 +87,81 @@ def trocar_tema():
         DISABLED   = (70, 75, 95)
     
     dark_mode = not dark_mode # Alterna o estado
-
-
-pygame.init()
-screen = pygame.display.set_mode((LARGURA, ALTURA))
-pygame.display.set_caption("Spider (1 Naipe)")
-clock = pygame.time.Clock()
-
-font_big = pygame.font.SysFont("DejaVu Sans", 24)
-font_med = pygame.font.SysFont("DejaVu Sans", 20)
-font_small = pygame.font.SysFont("DejaVu Sans", 18)
-
-# Botões
-stock_rect = pygame.Rect(MARGEM_X, TOPO_AREA_Y, CARTA_L, CARTA_A)
-deal_btn = pygame.Rect(MARGEM_X + CARTA_L + 16, TOPO_AREA_Y + CARTA_A - 34, 120, 28)
-hint_btn = pygame.Rect(MARGEM_X + CARTA_L + 150, TOPO_AREA_Y + CARTA_A - 34, 120, 28)
-restart_btn = pygame.Rect(LARGURA - 180, TOPO_AREA_Y + CARTA_A - 34, 150, 28)
-
-# NOVO BOTÃO DE TEMA 
-theme_btn = pygame.Rect(LARGURA - 180, TOPO_AREA_Y, 150, 28)
+    _atlas = None # Sprites da paleta antiga: remonta no próximo desenho
+
+
+# Janela, relógio e fontes: criados em inicializar_ui(), não na importação
+screen: Optional[pygame.Surface] = None
+clock: Optional[pygame.time.Clock] = None
+
+font_big: Optional[pygame.font.Font] = None
+font_med: Optional[pygame.font.Font] = None
+font_small: Optional[pygame.font.Font] = None
+font_center: Optional[pygame.font.Font] = None
+
+
+FONTE = "DejaVu Sans"
+CACHE_FONTES = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                            "spider_one_naipe", "fontes.json")
+CACHE_DICAS = os.path.join(os.path.dirname(CACHE_FONTES), "posicoes.sppc")
+DIR_AUTOSAVE = os.path.join(os.environ.get("XDG_STATE_HOME") or os.path.join(os.path.expanduser("~"), ".local", "state"),
+                            "spider_one_naipe", "autosave")
+
+
+def caminho_fonte(nome: str = FONTE) -> Optional[str]:
+    # match_font varre as fontes do sistema (lento): o resultado fica em disco.
+    # None = fonte não encontrada, usa a padrão do pygame (como o SysFont faria)
+    try:
+        with open(CACHE_FONTES, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    if nome in cache and (cache[nome] is None or os.path.exists(cache[nome])):
+        return cache[nome]
+    caminho = pygame.font.match_font(nome)
+    cache[nome] = caminho
+    try:
+        os.makedirs(os.path.dirname(CACHE_FONTES), exist_ok=True)
+        with open(CACHE_FONTES, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+    except OSError:
+        pass
+    return caminho
+
+
+def inicializar_ui():
+    global screen, clock, font_big, font_med, font_small, font_center
+    if screen is not None:
+        return
+    # Só vídeo e fontes (pygame.init() sobe áudio, joystick etc. sem necessidade)
+    pygame.display.init()
+    pygame.font.init()
+    pygame.time.wait(0)  # liga o timer do SDL (get_ticks)
+    screen = pygame.display.set_mode((LARGURA, ALTURA), pygame.RESIZABLE)
+    pygame.display.set_caption("Spider (1 Naipe)")
+    clock = pygame.time.Clock()
+    _criar_fontes()
+
+
+def _criar_fontes():
+    global font_big, font_med, font_small, font_center
+    caminho = caminho_fonte()
+    font_big = pygame.font.Font(caminho, px(24))
+    font_med = pygame.font.Font(caminho, px(20))
+    font_small = pygame.font.Font(caminho, px(18))
+    font_center = pygame.font.Font(caminho, px(36))
+
+
+def redimensionar(largura: int, altura: int):
+    global screen
+    # Com RESIZABLE o SDL já costuma ajustar a superfície; senão, recria
+    screen = pygame.display.get_surface()
+    if screen.get_size() != (largura, altura):
+        screen = pygame.display.set_mode((largura, altura), pygame.RESIZABLE)
+    aplicar_layout(largura, altura)
+
+# Naipes pré-renderizados no atlas de sprites
+NAIPES_ATLAS = ('♠', '♥', '♦', '♣')
 
 
 def coluna_x(i: int) -> int:
@@ -275,235 +169,931 @@ def coluna_x(i: int) -> int:
 
 
 def pilha_rect(i: int) -> pygame.Rect:
-    return pygame.Rect(coluna_x(i), TOP_TABLEAU_Y, CARTA_L, ALTURA - TOP_TABLEAU_Y - 20)
-
-
-def desenhar_carta(surf, x, y, carta: Carta, elev=False):
-    r = pygame.Rect(x, y, CARTA_L, CARTA_A)
+    return pygame.Rect(coluna_x(i), TOP_TABLEAU_Y, CARTA_L, ALTURA - TOP_TABLEAU_Y - px(20))
+
+
+def aplicar_layout(largura: int, altura: int):
+    """Recalcula a geometria (cartas, botões, colunas, regiões) para a janela atual.
+
+    Escala o layout de referência pelo lado mais apertado; com a UI já
+    iniciada, refaz as fontes e troca o atlas (os de outros tamanhos ficam no
+    cache LRU de obter_atlas).
+    """
+    global LARGURA, ALTURA, ESCALA, MARGEM_X, TOPO_AREA_Y, CARTA_L, CARTA_A, GAP_X
+    global TOP_TABLEAU_Y, OVERLAP_FACEDOWN, OVERLAP_FACEUP, geracao_layout, _atlas
+    global stock_rect, deal_btn, hint_btn, restart_btn, theme_btn
+    global COLUNAS_X, RECTS_PILHAS, AREA_TELA, AREA_TABLEAU, AREA_RODAPE, AREA_PERFIL
+
+    LARGURA, ALTURA = largura, altura
+    ESCALA = max(0.4, min(largura / LARGURA_BASE, altura / ALTURA_BASE))
+    MARGEM_X = px(24)
+    TOPO_AREA_Y = px(20)
+    CARTA_L, CARTA_A = px(90), px(120)
+    GAP_X = (LARGURA - 2*MARGEM_X - 10*CARTA_L) // 9
+    TOP_TABLEAU_Y = px(160)
+    OVERLAP_FACEDOWN = max(2, px(8))
+    OVERLAP_FACEUP = px(28)
+
+    # Botões
+    stock_rect = pygame.Rect(MARGEM_X, TOPO_AREA_Y, CARTA_L, CARTA_A)
+    deal_btn = pygame.Rect(MARGEM_X + CARTA_L + px(16), TOPO_AREA_Y + CARTA_A - px(34), px(120), px(28))
+    hint_btn = pygame.Rect(MARGEM_X + CARTA_L + px(150), TOPO_AREA_Y + CARTA_A - px(34), px(120), px(28))
+    restart_btn = pygame.Rect(LARGURA - px(180), TOPO_AREA_Y + CARTA_A - px(34), px(150), px(28))
+    # NOVO BOTÃO DE TEMA
+    theme_btn = pygame.Rect(LARGURA - px(180), TOPO_AREA_Y, px(150), px(28))
+
+    # Colunas (x em ordem crescente, para o bisect do clique)
+    COLUNAS_X = [coluna_x(i) for i in range(10)]
+    RECTS_PILHAS = [pilha_rect(i) for i in range(10)]
+
+    # Regiões usadas no redesenho por invalidação
+    AREA_TELA = pygame.Rect(0, 0, LARGURA, ALTURA)
+    AREA_TABLEAU = pygame.Rect(0, TOP_TABLEAU_Y, LARGURA, ALTURA - TOP_TABLEAU_Y)
+    AREA_RODAPE = pygame.Rect(0, ALTURA - px(70), LARGURA, px(70))
+    AREA_PERFIL = pygame.Rect(LARGURA - px(344), TOP_TABLEAU_Y - px(20), px(330), px(220))
+
+    geracao_layout += 1
+    _atlas = None
+    if screen is not None:
+        _criar_fontes()
+
+
+aplicar_layout(LARGURA, ALTURA)
+
+
+def _cor_naipe(naipe: str):
+    # COR DO NAIPE (apenas ♠ no seu modo atual)
+    cor = (0, 0, 0)  # preto padrão
+
+    # Se quiser adicionar ♥ ♦ vermelhos mais tarde, o código já está preparado:
+    if naipe in ["♥", "♦"]:
+        cor = (200, 30, 30)
+
+    # AJUSTE DA COR DO TEXTO PARA LEGIBILIDADE NO MODO ESCURO
+    if dark_mode and cor == (0,0,0):
+        # Mudar o naipe preto para uma cor mais clara no tema escuro
+        cor = (240, 240, 250)
+    elif dark_mode and cor == (200, 30, 30):
+        # Mudar o naipe vermelho para uma cor mais clara/saturada no tema escuro (opcional)
+        cor = (255, 100, 100)
+    return cor
+
+
+def _render_carta(virada_para_cima: bool, valor: int, naipe: str, elev: bool) -> pygame.Surface:
+    surf = pygame.Surface((CARTA_L, CARTA_A), pygame.SRCALPHA)
+    r = pygame.Rect(0, 0, CARTA_L, CARTA_A)
 
     # Fundo
-    if carta.virada_para_cima:
-        pygame.draw.rect(surf, CARD_FRONT, r, border_radius=8)
-        pygame.draw.rect(surf, CARD_EDGE, r, 2, border_radius=8)
-
-        # COR DO NAIPE (apenas ♠ no seu modo atual)
-        cor = (0, 0, 0)  # preto padrão
+    raio = px(8)
+    if virada_para_cima:
+        pygame.draw.rect(surf, CARD_FRONT, r, border_radius=raio)
+        pygame.draw.rect(surf, CARD_EDGE, r, max(1, px(2)), border_radius=raio)
 
-        # Se quiser adicionar ♥ ♦ vermelhos mais tarde, o código já está preparado:
-        if carta.naipe in ["♥", "♦"]:
-            cor = (200, 30, 30)
-        
-        # AJUSTE DA COR DO TEXTO PARA LEGIBILIDADE NO MODO ESCURO
-        if dark_mode and cor == (0,0,0):
-             # Mudar o naipe preto para uma cor mais clara no tema escuro
-            cor = (240, 240, 250) 
-        elif dark_mode and cor == (200, 30, 30):
-             # Mudar o naipe vermelho para uma cor mais clara/saturada no tema escuro (opcional)
-             cor = (255, 100, 100)
-
-
-        valor = VALOR_NOME[carta.valor]
-        naipe = carta.naipe
+        cor = _cor_naipe(naipe)
+        nome = VALOR_NOME[valor]
 
         # TOPO ESQUERDO
-        txt_valor = font_small.render(valor, True, cor)
-        surf.blit(txt_valor, (x + 8, y + 6))
+        txt_valor = font_small.render(nome, True, cor)
+        surf.blit(txt_valor, (px(8), px(6)))
 
         txt_naipe = font_med.render(naipe, True, cor)
-        surf.blit(txt_naipe, (x + 26, y + 6))
+        surf.blit(txt_naipe, (px(26), px(6)))
 
         # RODAPÉ DIREITO (invertido)
-        txt_valor2 = font_small.render(valor, True, cor)
-        surf.blit(txt_valor2, (x + CARTA_L - txt_valor2.get_width() - 8,
-                               y + CARTA_A - txt_valor2.get_height() - 8))
-
-        txt_naipe2 = font_med.render(naipe, True, cor)
-        surf.blit(txt_naipe2, (x + CARTA_L - txt_naipe2.get_width() - 26,
-                               y + CARTA_A - txt_naipe2.get_height() - 6))
+        surf.blit(txt_valor, (CARTA_L - txt_valor.get_width() - px(8),
+                              CARTA_A - txt_valor.get_height() - px(8)))
+        surf.blit(txt_naipe, (CARTA_L - txt_naipe.get_width() - px(26),
+                              CARTA_A - txt_naipe.get_height() - px(6)))
 
         # NAIPE CENTRAL
-        txt_center = pygame.font.SysFont("DejaVu Sans", 36).render(naipe, True, cor)
+        txt_center = font_center.render(naipe, True, cor)
         surf.blit(txt_center,
-                  (x + CARTA_L//2 - txt_center.get_width()//2,
-                   y + CARTA_A//2 - txt_center.get_height()//2))
+                  (CARTA_L//2 - txt_center.get_width()//2,
+                   CARTA_A//2 - txt_center.get_height()//2))
 
     else:
         # CARTA VIRADA PARA BAIXO
-        pygame.draw.rect(surf, CARD_BACK, r, border_radius=8)
-        pygame.draw.rect(surf, CARD_EDGE, r, 2, border_radius=8)
+        pygame.draw.rect(surf, CARD_BACK, r, border_radius=raio)
+        pygame.draw.rect(surf, CARD_EDGE, r, max(1, px(2)), border_radius=raio)
 
         txt = font_small.render("SPIDER", True, TXT_INV)
-        surf.blit(txt, (x + (CARTA_L - txt.get_width()) // 2,
-                        y + (CARTA_A - txt.get_height()) // 2))
+        surf.blit(txt, ((CARTA_L - txt.get_width()) // 2,
+                        (CARTA_A - txt.get_height()) // 2))
 
     # HIGHLIGHT (DICA / ARRASTO)
     if elev:
-        pygame.draw.rect(surf, (255, 255, 0), r, 4, border_radius=8)
+        pygame.draw.rect(surf, (255, 255, 0), r, max(1, px(4)), border_radius=raio)
+
+    return surf.convert_alpha()
+
+
+# Mensagens dinâmicas guardadas por atlas (ver AtlasSprites.rotulo)
+MAX_ROTULOS = 16
+
+
+class AtlasSprites:
+    """Imagens de cartas e textos fixos do HUD, renderizadas uma vez por tema.
+
+    Depois de montado, desenhar uma carta ou um rótulo é só um blit: nenhuma
+    chamada de fonte acontece durante o quadro.
+    """
+
+    def __init__(self):
+        self.cartas = {}
+        self.textos = {}
+        # Mensagens do rodapé (rotulo()): LRU pequeno, fora dos textos fixos
+        self.rotulos: "OrderedDict[tuple, pygame.Surface]" = OrderedDict()
+        # Mantém vivas as fontes usadas (rotulo() usa id(fonte) na chave)
+        self.fontes = (font_big, font_med, font_small, font_center)
+
+        # Verso não depende de valor/naipe: uma imagem por estado de destaque
+        for elev in (False, True):
+            self.cartas[(None, None, False, elev)] = _render_carta(False, 0, "", elev)
+        for naipe in NAIPES_ATLAS:
+            for valor in VALOR_NOME:
+                for elev in (False, True):
+                    self.cartas[(valor, naipe, True, elev)] = _render_carta(True, valor, naipe, elev)
+
+        def texto(chave, fonte, conteudo, cor):
+            self.textos[chave] = fonte.render(conteudo, True, cor).convert_alpha()
+
+        # Rótulos dos botões
+        texto("distribuir", font_small, "Distribuir (E)", TXT_INV)
+        texto("dica", font_small, "Dica (H)", TXT_INV)
+        texto("tema", font_small, "Modo Escuro" if not dark_mode else "Modo Claro", (0,0,0))
+        texto("reiniciar", font_small, "Reiniciar (R)", (0,0,0))
+
+        # Contador do estoque (0..104) nas duas cores possíveis e placar da fundação
+        for n in range(105):
+            texto(("estoque", n), font_small, str(n), TXT_INV if n > 0 else DISABLED)
+        for n in range(9):
+            texto(("fundacao", n), font_big, f"Fundação: {n}/8", TXT)
+
+    def carta(self, carta: Carta, elev: bool = False) -> pygame.Surface:
+        if not carta.virada_para_cima:
+            return self.cartas[(None, None, False, elev)]
+        chave = (carta.valor, carta.naipe, True, elev)
+        img = self.cartas.get(chave)
+        if img is None:
+            # Naipe fora do conjunto pré-montado: renderiza uma vez e guarda
+            img = self.cartas[chave] = _render_carta(True, carta.valor, carta.naipe, elev)
+        return img
+
+    def lado(self, carta: Carta, para_cima: bool) -> pygame.Surface:
+        # Face pedida, independente de como a carta está agora (animação de virar)
+        if not para_cima:
+            return self.cartas[(None, None, False, False)]
+        chave = (carta.valor, carta.naipe, True, False)
+        img = self.cartas.get(chave)
+        if img is None:
+            img = self.cartas[chave] = _render_carta(True, carta.valor, carta.naipe, False)
+        return img
+
+    def texto(self, chave) -> pygame.Surface:
+        return self.textos[chave]
+
+    def rotulo(self, conteudo: str, fonte, cor) -> pygame.Surface:
+        # Mensagens dinâmicas (avisos, fim de jogo): a que está na tela é reaproveitada
+        # quadro a quadro, mas só as MAX_ROTULOS mais recentes ficam guardadas
+        chave = (conteudo, id(fonte), cor)
+        img = self.rotulos.get(chave)
+        if img is not None:
+            self.rotulos.move_to_end(chave)
+            return img
+        img = self.rotulos[chave] = fonte.render(conteudo, True, cor).convert_alpha()
+        while len(self.rotulos) > MAX_ROTULOS:
+            self.rotulos.popitem(last=False)
+        return img
+
+
+_atlas: Optional[AtlasSprites] = None
+# Atlas já montados por (tamanho da carta, escala, tema), do menos ao mais recente
+MAX_ATLAS = 4
+_atlas_cache: "OrderedDict[tuple, AtlasSprites]" = OrderedDict()
+
+
+def obter_atlas() -> AtlasSprites:
+    global _atlas, font_big, font_med, font_small, font_center
+    if _atlas is None:
+        chave = (CARTA_L, CARTA_A, ESCALA, dark_mode)
+        _atlas = _atlas_cache.pop(chave, None)
+        if _atlas is None:
+            _atlas = AtlasSprites()
+        else:
+            # Volta às fontes do atlas, para rotulo() reaproveitar o que já renderizou
+            font_big, font_med, font_small, font_center = _atlas.fontes
+        _atlas_cache[chave] = _atlas
+        while len(_atlas_cache) > MAX_ATLAS:
+            _atlas_cache.popitem(last=False)
+    return _atlas
+
+
+def desenhar_carta(surf, x, y, carta: Carta, elev=False):
+    surf.blit(obter_atlas().carta(carta, elev), (x, y))
 
 
 def desenhar_ui_topo(jogo: Jogo):
+    atlas = obter_atlas()
+
+    def centralizar(img, rect):
+        screen.blit(img, (rect.centerx - img.get_width()//2,
+                          rect.centery - img.get_height()//2))
+
     # Estoque
     pygame.draw.rect(screen,
                      CARD_BACK if jogo.estoque.restante() > 0 else DISABLED,
-                     stock_rect, border_radius=6)
-    pygame.draw.rect(screen, CARD_EDGE, stock_rect, 2, border_radius=6)
-
-    cnt = font_small.render(str(jogo.estoque.restante()),
-                             True,
-                             TXT_INV if jogo.estoque.restante() > 0 else DISABLED)
-    screen.blit(cnt, (stock_rect.centerx - cnt.get_width()//2,
-                      stock_rect.centery - cnt.get_height()//2))
+                     stock_rect, border_radius=px(6))
+    pygame.draw.rect(screen, CARD_EDGE, stock_rect, max(1, px(2)), border_radius=px(6))
+    centralizar(atlas.texto(("estoque", jogo.estoque.restante())), stock_rect)
 
     # Botão distribuir
-    can_deal = jogo.estoque.restante() >= 10 and all(not p.esta_vazia()
-                                                     for p in jogo.tableau)
+    can_deal = jogo.pode_distribuir()
     pygame.draw.rect(screen,
                      ACCENT if can_deal else DISABLED,
-                     deal_btn, border_radius=6)
-    label = font_small.render("Distribuir (E)", True, TXT_INV if not dark_mode else TXT_INV)
-    screen.blit(label, (deal_btn.centerx - label.get_width()//2,
-                        deal_btn.centery - label.get_height()//2))
+                     deal_btn, border_radius=px(6))
+    centralizar(atlas.texto("distribuir"), deal_btn)
 
     # Botão de Dica
     hint_color = ACCENT if not dark_mode else (90, 170, 255) # Ajuste a cor da dica para ser visível
-    pygame.draw.rect(screen, hint_color, hint_btn, border_radius=6)
-    htxt = font_small.render("Dica (H)", True, TXT_INV if not dark_mode else TXT_INV)
-    screen.blit(htxt, (hint_btn.centerx - htxt.get_width()//2,
-                       hint_btn.centery - htxt.get_height()//2))
+    pygame.draw.rect(screen, hint_color, hint_btn, border_radius=px(6))
+    centralizar(atlas.texto("dica"), hint_btn)
 
     # Fundação
-    ftxt = font_big.render(
-        f"Fundação: {len(jogo.fundacao)}/8", True, TXT) # Usar TXT para o texto da fundação
-    screen.blit(ftxt, (LARGURA//2 - ftxt.get_width()//2, TOPO_AREA_Y + 10))
+    ftxt = atlas.texto(("fundacao", len(jogo.fundacao)))
+    screen.blit(ftxt, (LARGURA//2 - ftxt.get_width()//2, TOPO_AREA_Y + px(10)))
 
     # Botão de Tema 
     theme_color = (200, 200, 200) # Cor neutra para o botão
-    pygame.draw.rect(screen, theme_color, theme_btn, border_radius=6)
-    # O texto deve indicar para qual modo o usuário vai
-    theme_text = "Modo Escuro" if not dark_mode else "Modo Claro" 
-    ttxt = font_small.render(theme_text, True, (0,0,0))
-    screen.blit(ttxt, (theme_btn.centerx - ttxt.get_width()//2,
-                        theme_btn.centery - ttxt.get_height()//2))
-
+    pygame.draw.rect(screen, theme_color, theme_btn, border_radius=px(6))
+    # O texto indica para qual modo o usuário vai
+    centralizar(atlas.texto("tema"), theme_btn)
 
     # Reiniciar
-    pygame.draw.rect(screen, (200, 90, 90), restart_btn, border_radius=6)
-    rtxt = font_small.render("Reiniciar (R)", True, (0,0,0))
-    screen.blit(rtxt, (restart_btn.centerx - rtxt.get_width()//2,
-                       restart_btn.centery - rtxt.get_height()//2))
+    pygame.draw.rect(screen, (200, 90, 90), restart_btn, border_radius=px(6))
+    centralizar(atlas.texto("reiniciar"), restart_btn)
 
 
-def desenhar_tableau(jogo: Jogo, drag_info, hint_cards):
-    arrastando = drag_info["arrastando"]
-    origem_idx = drag_info["origem"]
-    drag_cards = drag_info["cartas"]
-    mouse_pos = drag_info["mouse"]
+class LayoutPilhas:
+    """y de cada carta relativo ao topo da coluna, por pilha.
 
-    for i, pilha in enumerate(jogo.tableau):
-        x = coluna_x(i)
-        y = TOP_TABLEAU_Y
+    Recalculado só quando ``pilha.versao`` muda; desenho e cliques leem a
+    mesma lista (não alterar). Indexado pela própria pilha, com referência
+    fraca, para não segurar pilhas de jogos antigos.
+    """
+
+    def __init__(self):
+        self.entradas = weakref.WeakKeyDictionary()
+
+    def offsets(self, pilha: Pilha) -> List[int]:
+        ent = self.entradas.get(pilha)
+        if ent is not None and ent[0] == pilha.versao and ent[1] == geracao_layout:
+            return ent[2]
+        # Coluna que passaria do fim da janela: aperta as cartas viradas para cima
+        acima = OVERLAP_FACEUP
+        abertas = sum(1 for c in pilha.cartas[:-1] if c.virada_para_cima)
+        if abertas:
+            fechadas = len(pilha.cartas) - 1 - abertas
+            livre = ALTURA - px(20) - TOP_TABLEAU_Y - CARTA_A - fechadas * OVERLAP_FACEDOWN
+            if abertas * acima > livre:
+                acima = max(px(OVERLAP_FACEUP_MIN), livre // abertas)
+        offsets = []
+        y = 0
+        for c in pilha.cartas:
+            offsets.append(y)
+            y += acima if c.virada_para_cima else OVERLAP_FACEDOWN
+        self.entradas[pilha] = (pilha.versao, geracao_layout, offsets)
+        return offsets
+
+
+layout_pilhas = LayoutPilhas()
 
-        topo_idx = len(pilha.cartas)
 
-        for idx, carta in enumerate(pilha.cartas):
-            is_dragged = arrastando and i == origem_idx and idx >= topo_idx - len(drag_cards)
+def offsets_pilha(pilha: Pilha) -> List[int]:
+    return layout_pilhas.offsets(pilha)
 
-            y_step = OVERLAP_FACEUP if carta.virada_para_cima else OVERLAP_FACEDOWN
 
-            if not is_dragged:
-                is_hint = (i, idx) in hint_cards
-                desenhar_carta(screen, x, y, carta, elev=is_hint)
+class CachePilhas:
+    """Superfície pré-composta de cada coluna, refeita só quando a pilha muda.
 
-            y += y_step
+    A chave de validade é (pilha, versão, atlas, corte): ``corte`` é quantas
+    cartas do topo ficam de fora (bloco sendo arrastado). Cada coluna guarda no
+    máximo a imagem completa e uma variante recortada, então arrastar não
+    invalida a imagem completa.
+    """
+
+    def __init__(self):
+        self.entradas = {}
+
+    def superficie(self, i: int, pilha: Pilha, corte: int = 0) -> pygame.Surface:
+        atlas = obter_atlas()
+        chave = (corte > 0, i)
+        ent = self.entradas.get(chave)
+        if ent is not None:
+            pilha_ant, versao, atlas_ant, corte_ant, surf = ent
+            if pilha_ant is pilha and versao == pilha.versao and atlas_ant is atlas and corte_ant == corte:
+                return surf
+
+        cartas = pilha.cartas[:len(pilha.cartas) - corte]
+        offsets = offsets_pilha(pilha)
+        altura = (offsets[len(cartas) - 1] if cartas else 0) + CARTA_A
+        surf = pygame.Surface((CARTA_L, altura), pygame.SRCALPHA)
+        for idx, carta in enumerate(cartas):
+            surf.blit(atlas.carta(carta), (0, offsets[idx]))
+        surf = surf.convert_alpha()
+        self.entradas[chave] = (pilha, pilha.versao, atlas, corte, surf)
+        return surf
+
+
+cache_pilhas = CachePilhas()
+
+
+# Bloco arrastado já composto: (chave, superfície)
+_bloco_arrastado = None
+
+
+def superficie_bloco(cartas: List[Carta]) -> pygame.Surface:
+    # Um blit por quadro durante o arrasto, em vez de um por carta
+    global _bloco_arrastado
+    atlas = obter_atlas()
+    chave = (tuple(map(id, cartas)), atlas, OVERLAP_FACEUP)
+    if _bloco_arrastado is None or _bloco_arrastado[0] != chave:
+        surf = pygame.Surface((CARTA_L, CARTA_A + (len(cartas) - 1) * OVERLAP_FACEUP), pygame.SRCALPHA)
+        for k, carta in enumerate(cartas):
+            surf.blit(atlas.carta(carta, elev=True), (0, k * OVERLAP_FACEUP))
+        _bloco_arrastado = (chave, surf.convert_alpha())
+    return _bloco_arrastado[1]
+
+
+# Durações das animações, em ms
+DURACAO_MOVER = 160
+DURACAO_VIRAR = 140
+DURACAO_DISTRIBUIR = 220
+ATRASO_DISTRIBUIR = 30   # entre uma coluna e a seguinte
+DURACAO_FUNDACAO = 300
+ATRASO_FUNDACAO = 20     # entre uma carta da sequência completa e a seguinte
+
+# "Colunas" das cartas fora do tableau em Animacoes.posicoes()
+ESTOQUE, FUNDACAO = -1, -2
+
+# Entrada que espera a animação terminar (o resto é tratado na hora)
+EVENTOS_ENFILEIRADOS = (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION)
+
+
+def _suavizar(t: float) -> float:
+    # Sai rápido e freia no destino
+    return 1 - (1 - t) ** 3
+
+
+class Voo:
+    __slots__ = ("carta", "etapas", "x0", "y0", "cima0", "cima1", "virar", "coluna", "indice",
+                 "ordem", "fim")
+
+    def posicao(self, agora: int) -> Tuple[int, int]:
+        x, y = self.x0, self.y0
+        # etapas: (início, duração, x0, y0, x1, y1) em ordem; entre elas a carta fica parada
+        for inicio, duracao, xa, ya, xb, yb in self.etapas:
+            if agora < inicio:
+                break
+            e = _suavizar(min(1.0, (agora - inicio) / duracao))
+            x, y = xa + (xb - xa) * e, ya + (yb - ya) * e
+        return round(x), round(y)
+
+
+class Animacoes:
+    """Cartas indo do lugar antigo para o novo depois de uma ação do jogador.
+
+    O jogo muda na hora: ``posicoes()`` antes da ação e ``iniciar()`` depois
+    comparam onde cada carta estava e está (estoque e fundação incluídos) e
+    criam um voo para cada uma que mudou de lugar ou de face. Enquanto houver
+    voos, ``desenhar_tableau`` corta a imagem em cache de cada coluna na
+    primeira carta animada e desenha as cartas em voo por cima, com sprites do
+    atlas; ``avancar()`` devolve só as áreas que elas ocuparam no quadro
+    anterior e no atual.
+    """
+
+    def __init__(self):
+        self.voos: List[Voo] = []
+        self.primeira = {}      # coluna -> índice da primeira carta animada
+        self.animadas = set()   # (coluna, índice) das cartas em voo
+        self.agora = 0
+        self._rects: List[pygame.Rect] = []
+
+    @property
+    def ativa(self) -> bool:
+        return bool(self.voos)
+
+    def limpar(self):
+        self.voos = []
+        self.primeira = {}
+        self.animadas = set()
+        self._rects = []
+
+    def posicoes(self, jogo: Jogo) -> dict:
+        """id(carta) -> (carta, x, y, para cima, coluna, índice) de todas as cartas.
+
+        No estoque e na fundação a coluna é ESTOQUE/FUNDACAO; na fundação o
+        índice é o id do K da sequência (para achar onde ela se formou).
+        """
+        pos = {}
+        for carta in jogo.estoque.restantes():
+            pos[id(carta)] = (carta, stock_rect.x, stock_rect.y, False, ESTOQUE, 0)
+        fx = LARGURA // 2 - CARTA_L // 2
+        for seq in jogo.fundacao:
+            for carta in seq:
+                pos[id(carta)] = (carta, fx, TOPO_AREA_Y, True, FUNDACAO, id(seq[0]))
+        for i, pilha in enumerate(jogo.tableau):
+            x = COLUNAS_X[i]
+            for k, (carta, dy) in enumerate(zip(pilha.cartas, offsets_pilha(pilha))):
+                pos[id(carta)] = (carta, x, TOP_TABLEAU_Y + dy, carta.virada_para_cima, i, k)
+        return pos
+
+    def iniciar(self, antes: dict, jogo: Jogo, agora: int):
+        depois = self.posicoes(jogo)
+        voos = []
+        no_lugar = []
+        saida = {}  # coluna -> quando a última carta terminou de sair dela
+        for chave, (carta, x1, y1, cima1, col1, k1) in depois.items():
+            _, x0, y0, cima0, col0, k0 = antes[chave]
+            if (x0, y0, cima0) == (x1, y1, cima1) or (col0 < 0 and col1 < 0):
+                continue
+            v = Voo()
+            v.carta, v.x0, v.y0, v.cima0, v.cima1 = carta, x0, y0, cima0, cima1
+            v.coluna, v.indice = col1, k1
+            v.virar = None
+            v.ordem = (1, k1) if col1 >= 0 else (2, 13 - carta.valor)
+            etapas = []
+            if FUNDACAO in (col0, col1):
+                # Sequência completa passa pelo lugar onde se formou (logo acima do K)
+                ida = col1 == FUNDACAO
+                _, xk, yk = (antes[k1] if ida else depois[k0])[:3]
+                wx, wy = xk, yk + (13 - carta.valor) * OVERLAP_FACEUP
+                if ida:
+                    etapas.append((agora, DURACAO_MOVER, x0, y0, wx, wy))
+                    etapas.append((agora + DURACAO_MOVER + ATRASO_FUNDACAO * (carta.valor - 1),
+                                   DURACAO_FUNDACAO, wx, wy, x1, y1))
+                else:
+                    etapas.append((agora + ATRASO_FUNDACAO * (13 - carta.valor),
+                                   DURACAO_FUNDACAO, x0, y0, wx, wy))
+                    etapas.append((agora + ATRASO_FUNDACAO * 12 + DURACAO_FUNDACAO,
+                                   DURACAO_MOVER, wx, wy, x1, y1))
+                etapas = [e for e in etapas if e[2:4] != e[4:6]]
+            elif ESTOQUE in (col0, col1):
+                # Distribuição (ou desfeita): uma coluna depois da outra, virando no caminho
+                ordem = col1 if col0 == ESTOQUE else 9 - col0
+                etapas.append((agora + ATRASO_DISTRIBUIR * ordem, DURACAO_DISTRIBUIR, x0, y0, x1, y1))
+            elif (x0, y0) != (x1, y1):
+                etapas.append((agora, DURACAO_MOVER, x0, y0, x1, y1))
+            if etapas:
+                if cima0 != cima1:
+                    v.virar = etapas[0][:2]
+                if col0 >= 0:
+                    saida[col0] = max(saida.get(col0, agora), etapas[0][0] + etapas[0][1])
+            else:
+                no_lugar.append(v)
+            v.etapas = etapas
+            voos.append(v)
+
+        # Carta que só vira: revelada depois que o bloco de cima saiu; escondida antes de ser coberta
+        for v in no_lugar:
+            v.virar = (saida.get(v.coluna, agora) if v.cima1 else agora, DURACAO_VIRAR)
+            v.ordem = (0, v.indice)
+        for v in voos:
+            fins = [i + d for i, d, *_ in v.etapas]
+            if v.virar is not None:
+                fins.append(v.virar[0] + v.virar[1])
+            v.fim = max(fins)
+        voos.sort(key=lambda v: v.ordem)
+        self.voos = voos
+        self.agora = agora
+        self._rects = [pygame.Rect(v.x0, v.y0, CARTA_L, CARTA_A) for v in voos]
+        self._indexar()
+
+    def _indexar(self):
+        self.animadas = {(v.coluna, v.indice) for v in self.voos if v.coluna >= 0}
+        self.primeira = {}
+        for i, k in self.animadas:
+            if k < self.primeira.get(i, k + 1):
+                self.primeira[i] = k
+
+    def avancar(self, agora: int) -> List[pygame.Rect]:
+        """Passa o relógio para ``agora`` e devolve as áreas a redesenhar."""
+        self.agora = agora
+        sujos = self._rects
+        restantes = []
+        for v in self.voos:
+            if agora < v.fim:
+                restantes.append(v)
+            elif v.coluna >= 0:
+                # Terminou: volta para a imagem em cache da coluna, na posição final
+                x, y = v.posicao(v.fim)
+                sujos.append(pygame.Rect(x, y, CARTA_L, CARTA_A))
+        if len(restantes) != len(self.voos):
+            self.voos = restantes
+            self._indexar()
+        self._rects = []
+        for v in self.voos:
+            x, y = v.posicao(agora)
+            self._rects.append(pygame.Rect(x, y, CARTA_L, CARTA_A))
+        return sujos + self._rects
+
+    def desenhar(self, surf: pygame.Surface, atlas: "AtlasSprites"):
+        agora = self.agora
+        for v in self.voos:
+            x, y = v.posicao(agora)
+            if v.virar is not None and v.virar[0] <= agora < v.virar[0] + v.virar[1]:
+                # Virando: a carta estreita até sumir e volta com a outra face
+                t = (agora - v.virar[0]) / v.virar[1]
+                img = atlas.lado(v.carta, v.cima0 if t < 0.5 else v.cima1)
+                w = max(1, round(CARTA_L * abs(1 - 2 * t)))
+                surf.blit(pygame.transform.scale(img, (w, CARTA_A)), (x + (CARTA_L - w) // 2, y))
+            else:
+                antes_de_virar = v.virar is not None and agora < v.virar[0]
+                surf.blit(atlas.lado(v.carta, v.cima0 if antes_de_virar else v.cima1), (x, y))
+
+
+def desenhar_tableau(jogo: Jogo, drag_info, hint_cards, animacoes: Optional[Animacoes] = None):
+    arrastando = drag_info["arrastando"]
+    origem_idx = drag_info["origem"]
+    drag_cards = drag_info["cartas"]
+    mouse_pos = drag_info["mouse"]
+    atlas = obter_atlas()
+    # Cartas em voo saem da imagem em cache da coluna (cortada na primeira delas)
+    primeira = animacoes.primeira if animacoes is not None and animacoes.ativa else {}
+
+    for i, pilha in enumerate(jogo.tableau):
+        x = COLUNAS_X[i]
 
         if pilha.esta_vazia():
             vazio = pygame.Rect(x, TOP_TABLEAU_Y, CARTA_L, CARTA_A)
             # Destaque para slot vazio da dica
             if (i, -1) in hint_cards:
-                 pygame.draw.rect(screen, (255, 255, 0), vazio, 4, border_radius=6)
+                 pygame.draw.rect(screen, (255, 255, 0), vazio, max(1, px(4)), border_radius=px(6))
             else:
-                 pygame.draw.rect(screen, CARD_EDGE, vazio, 2, border_radius=6)
+                 pygame.draw.rect(screen, CARD_EDGE, vazio, max(1, px(2)), border_radius=px(6))
+            continue
+
+        n_visiveis = len(pilha.cartas) - (len(drag_cards) if arrastando and i == origem_idx else 0)
+        inicio_voo = min(primeira.get(i, n_visiveis), n_visiveis)
+        if inicio_voo > 0:
+            screen.blit(cache_pilhas.superficie(i, pilha, len(pilha.cartas) - inicio_voo), (x, TOP_TABLEAU_Y))
+        if inicio_voo < n_visiveis:
+            # Acima da primeira carta em voo, as paradas vão direto do atlas
+            offsets = offsets_pilha(pilha)
+            for idx in range(inicio_voo, n_visiveis):
+                if (i, idx) not in animacoes.animadas:
+                    screen.blit(atlas.carta(pilha.cartas[idx]), (x, TOP_TABLEAU_Y + offsets[idx]))
+
+    # Dica por cima do cache: a partir da primeira carta destacada de cada coluna,
+    # redesenha as cartas na ordem original (são poucas, todas do atlas)
+    if hint_cards:
+        primeira_dica = {}
+        for (i, idx) in hint_cards:
+            if idx >= 0 and (i not in primeira_dica or idx < primeira_dica[i]):
+                primeira_dica[i] = idx
+        for i, inicio in primeira_dica.items():
+            pilha = jogo.tableau[i]
+            n_visiveis = len(pilha.cartas) - (len(drag_cards) if arrastando and i == origem_idx else 0)
+            n_visiveis = min(n_visiveis, primeira.get(i, n_visiveis))
+            offsets = offsets_pilha(pilha)
+            x = COLUNAS_X[i]
+            for idx in range(inicio, n_visiveis):
+                screen.blit(atlas.carta(pilha.cartas[idx], elev=(i, idx) in hint_cards),
+                            (x, TOP_TABLEAU_Y + offsets[idx]))
+
+    if animacoes is not None and animacoes.ativa:
+        animacoes.desenhar(screen, atlas)
 
     if arrastando and drag_cards:
         mx, my = mouse_pos
-        x0 = mx - CARTA_L//2
-        y0 = my - 20
-
-        for k, carta in enumerate(drag_cards):
-            desenhar_carta(screen, x0, y0 + k * OVERLAP_FACEUP, carta, elev=True)
+        screen.blit(superficie_bloco(drag_cards), (mx - CARTA_L//2, my - px(20)))
 
 
 def hit_test_pilha(jogo: Jogo, pos: Tuple[int,int]) -> Optional[int]:
-    for i in range(10):
-        if pilha_rect(i).collidepoint(pos):
-            return i
+    # Única coluna candidata: a última que começa à esquerda de x
+    i = bisect_right(COLUNAS_X, pos[0]) - 1
+    if i >= 0 and RECTS_PILHAS[i].collidepoint(pos):
+        return i
     return None
 
 
 def montar_bloco_arrastavel(pilha: Pilha, click_index_from_top: int) -> List[Carta]:
-    n = len(pilha.cartas)
-    if click_index_from_top < 0 or click_index_from_top >= n:
-        return []
-    start_idx = n - 1 - click_index_from_top
-    bloco = pilha.cartas[start_idx:]
-    if not bloco or not all(c.virada_para_cima for c in bloco):
+    # Arrastável só se o bloco clicado couber na sequência do topo
+    if click_index_from_top < 0 or click_index_from_top >= pilha.tamanho_sequencia_topo():
         return []
-    return bloco if pilha._sequencia_decrescente_mesmo_naipe(bloco) else []
+    return pilha.cartas[-(click_index_from_top + 1):]
 
 
 def coordenada_para_indice_carta(pilha: Pilha, x: int, y: int, col_x: int) -> Optional[int]:
-    if len(pilha.cartas) == 0:
+    if len(pilha.cartas) == 0 or not col_x <= x < col_x + CARTA_L:
         return None
 
-    y_cursor = TOP_TABLEAU_Y
-    offsets = []
+    # Carta de cima no ponto = a última que começa acima de y; se ela não
+    # alcança y, as de baixo (que começam antes) também não
+    offsets = offsets_pilha(pilha)
+    rel = y - TOP_TABLEAU_Y
+    idx = bisect_right(offsets, rel) - 1
+    if idx < 0 or rel >= offsets[idx] + CARTA_A:
+        return None
+    return len(pilha.cartas) - 1 - idx
 
-    for c in pilha.cartas:
-        offsets.append(y_cursor)
-        y_cursor += OVERLAP_FACEUP if c.virada_para_cima else OVERLAP_FACEDOWN
 
-    for idx in reversed(range(len(pilha.cartas))):
-        r = pygame.Rect(col_x, offsets[idx], CARTA_L, CARTA_A)
-        if r.collidepoint(x,y):
-            return len(pilha.cartas) - 1 - idx
+def coluna_area(i: int) -> pygame.Rect:
+    return pygame.Rect(coluna_x(i), TOP_TABLEAU_Y, CARTA_L, ALTURA - TOP_TABLEAU_Y)
 
-    return None
+
+def rect_bloco_arrastado(drag_info) -> Optional[pygame.Rect]:
+    if not drag_info["arrastando"] or not drag_info["cartas"]:
+        return None
+    mx, my = drag_info["mouse"]
+    n = len(drag_info["cartas"])
+    return pygame.Rect(mx - CARTA_L//2, my - px(20), CARTA_L, CARTA_A + (n - 1) * OVERLAP_FACEUP)
 
 
-def main():
-    jogo = Jogo()
+def criar_jogo(gravador: Optional["GravadorReplay"] = None, semente: Optional[int] = None) -> Jogo:
+    # Semente explícita para que a partida possa ser gravada e reproduzida
+    if semente is None:
+        semente = random.getrandbits(64)
+    jogo = Jogo(Baralho(semente=semente))
     jogo.iniciar_jogo()
+    if gravador is not None:
+        gravador.iniciar(semente)
+        jogo.gravador = gravador
+    return jogo
+
+
+NOMES_FAIXAS = {"facil": "fácil", "medio": "média", "dificil": "difícil"}
+
+
+def main(redesenho_continuo: bool = False, gravar: Optional[str] = None,
+         replay: Optional["Replay"] = None, baralhos: Optional[BaseBaralhos] = None,
+         dificuldade: str = "medio", medir_inicio: bool = False, animar: bool = True,
+         autosave: Optional[str] = None, cache_dicas: Optional[str] = None,
+         cache_memoria: Optional[int] = None, cache_disco: Optional[int] = None):
+    # redesenho_continuo=True mantém o comportamento antigo: tela inteira + flip a 60 fps
+    # gravar: arquivo de replay onde cada partida é anexada
+    # replay: só assiste a partida gravada (←/→, PgUp/PgDn, Home/End navegam)
+    # baralhos: base pré-resolvida; novos jogos saem da faixa `dificuldade` (teclas 1/2/3 trocam)
+    # medir_inicio: mostra o tempo até o primeiro quadro e encerra
+    # animar: cartas deslizam até o lugar novo (False = mudam na hora)
+    # autosave: diretório onde a partida é salva a cada jogada e retomada ao abrir
+    # cache_dicas: arquivo do cache de dicas por posição (limites em entradas; None = padrão)
+    inicializar_ui()
+
+    # Primeiro quadro antes de montar o atlas e carregar o resto
+    screen.fill(BG)
+    carregando = font_center.render("Carregando…", True, TXT)
+    screen.blit(carregando, carregando.get_rect(center=AREA_TELA.center))
+    pygame.display.flip()
+    t_primeiro = time.perf_counter()
+
+    obter_atlas()
+    from spider_autosave import Autosave, recuperar
+    from spider_dica import TrabalhadorDica
+    from spider_replay import GravadorReplay, aplicar_acao, reproduzir
+    from spider_solver import DISTRIBUIR, INSOLUVEL, RESOLVIDO
+    t_atlas = time.perf_counter()
+
+    gravador = GravadorReplay(gravar) if gravar and replay is None else None
+    salvamento = Autosave(autosave) if autosave and replay is None else None
+
+    # Jogadas animadas; cliques e teclas que chegam no meio esperam na fila
+    animacoes = Animacoes()
+    fila_entrada = []
+
+    def novo_jogo() -> Jogo:
+        animacoes.limpar()
+        reg = baralhos.sortear(dificuldade) if baralhos is not None else None
+        novo = criar_jogo(gravador, reg.semente if reg is not None else None)
+        if salvamento is not None:
+            salvamento.iniciar(novo)
+        return novo
+
+    passo_replay = 0
+    retomado = None
+    if salvamento is not None:
+        retomado = recuperar(autosave)
+        if retomado is not None and retomado.verificar_vitoria():
+            retomado = None
+    if replay is not None:
+        jogo = reproduzir(replay, 0)
+    elif retomado is not None:
+        # A partida retomada não volta para o arquivo de --gravar (faltaria o começo dela)
+        jogo = retomado
+        salvamento.iniciar(jogo)
+    else:
+        jogo = novo_jogo()
 
     drag_info = {"arrastando": False, "origem": None, "cartas": [], "mouse": (0,0)}
 
-    msg = ""
-    msg_timer = 0
+    msg = "Partida anterior retomada." if retomado is not None else ""
+    msg_timer = pygame.time.get_ticks() + 2500 if retomado is not None else 0
 
     hint_cards = set()
     hint_timer = 0  # dica expira sozinha
 
+    # Retângulos a reenviar para a tela no próximo quadro
+    sujos: List[pygame.Rect] = [AREA_TELA]
+    end_text = ""
+
+    # F3 liga/desliga o overlay de tempos; F4 exporta o trace dos últimos segundos
+    perfil = Perfilador()
+
+    # Arrastar a borda da janela gera uma rajada de VIDEORESIZE: o layout só é
+    # refeito (fontes, atlas) quando o tamanho para de mudar por um instante
+    tamanho_pendente = None
+    redimensionar_em = 0
+
+    def com_animacao(acao, arrasto=None) -> bool:
+        # Executa a ação e anima as cartas que ela tirou do lugar. Com um
+        # arrasto, o bloco parte de onde foi solto (e volta se a jogada falhar)
+        antes = animacoes.posicoes(jogo) if animar else None
+        if antes is not None and arrasto is not None and arrasto["arrastando"]:
+            mx, my = arrasto["mouse"]
+            pilha = jogo.tableau[arrasto["origem"]]
+            base = len(pilha.cartas) - len(arrasto["cartas"])
+            for k, carta in enumerate(arrasto["cartas"]):
+                antes[id(carta)] = (carta, mx - CARTA_L//2, my - px(20) + k * OVERLAP_FACEUP,
+                                    True, arrasto["origem"], base + k)
+        ok = acao()
+        if antes is not None:
+            animacoes.iniciar(antes, jogo, pygame.time.get_ticks())
+        return ok
+
+    def invalidar(*rects):
+        sujos.extend(r for r in rects if r is not None)
+
     def set_msg(texto: str, tempo_ms: int = 1800):
         nonlocal msg, msg_timer
         msg = texto
         msg_timer = pygame.time.get_ticks() + tempo_ms
+        invalidar(AREA_RODAPE)
+
+    def ir_para(passo: int):
+        # Avança aplicando as ações; para voltar, reproduz do início (µs por ação)
+        nonlocal jogo, passo_replay
+        passo = max(0, min(passo, len(replay.acoes)))
+        if passo < passo_replay:
+            animacoes.limpar()
+            jogo = reproduzir(replay, passo)
+        elif passo == passo_replay + 1:
+            com_animacao(lambda: aplicar_acao(jogo, replay.acoes[passo_replay]))
+        else:
+            animacoes.limpar()
+            for codigo in replay.acoes[passo_replay:passo]:
+                aplicar_acao(jogo, codigo)
+        passo_replay = passo
+        invalidar(AREA_TELA)
+
+    # Dica calculada fora do laço da interface; cancelada se o jogo mudar
+    cache = None
+    if cache_dicas is not None:
+        from spider_cache import MAX_DISCO, MAX_MEMORIA, CachePosicoes
+        try:
+            cache = CachePosicoes(cache_dicas,
+                                  MAX_MEMORIA if cache_memoria is None else cache_memoria,
+                                  MAX_DISCO if cache_disco is None else cache_disco)
+        except (OSError, ValueError) as e:
+            # Arquivo que não é do cache fica intocado; as dicas só não são lembradas
+            print(f"cache de dicas desativado: {e}", file=sys.stderr)
+    dica = TrabalhadorDica(cache)
+    dica_estado = None
+
+    def estado_dica():
+        return jogo, tuple(p.versao for p in jogo.tableau)
+
+    def pedir_dica():
+        nonlocal dica_estado, hint_timer
+        hint_cards.clear()
+        hint_timer = 0
+        invalidar(AREA_TABLEAU, AREA_RODAPE)
+        dica.pedir(jogo)
+        dica_estado = estado_dica()
+
+    def mostrar_dica(mov):
+        nonlocal hint_timer
+        hint_cards.clear()
+        invalidar(AREA_TABLEAU)
+        if mov is None:
+            return
+        if mov == DISTRIBUIR:
+            set_msg("Dica: distribuir o estoque.")
+            return
+        origem_idx, qtd, destino_idx = mov
+
+        # Destacar o bloco de origem
+        pilha_origem = jogo.tableau[origem_idx]
+        start = len(pilha_origem.cartas) - qtd
+        for i in range(start, len(pilha_origem.cartas)):
+            hint_cards.add((origem_idx, i))
+
+        # Destacar o destino (slot vazio usa o índice especial -1)
+        pilha_dest = jogo.tableau[destino_idx]
+        if pilha_dest.esta_vazia():
+            hint_cards.add((destino_idx, -1))
+        else:
+            hint_cards.add((destino_idx, len(pilha_dest.cartas) - 1))
+
+        hint_timer = pygame.time.get_ticks() + 3000
 
     running = True
     while running:
-        for event in pygame.event.get():
+        eventos = pygame.event.get()
+        if fila_entrada and not animacoes.ativa:
+            eventos = fila_entrada + eventos
+            fila_entrada = []
+        if not eventos and not sujos and not redesenho_continuo and not dica.pensando and not animacoes.ativa:
+            # Cena parada: dorme até o próximo evento ou o próximo timer (mensagem/dica)
+            timers = [t for t in (msg_timer, hint_timer, redimensionar_em) if t]
+            if timers:
+                espera = max(1, min(timers) - pygame.time.get_ticks() + 1)
+                evento = pygame.event.wait(espera)
+            else:
+                evento = pygame.event.wait()
+            if evento.type != pygame.NOEVENT:
+                eventos = [evento] + pygame.event.get()
+
+        # A espera ociosa fica fora do quadro medido
+        perfil.inicio_quadro()
+        for event in eventos:
+
+            if animacoes.ativa and event.type in EVENTOS_ENFILEIRADOS:
+                # Fica para depois da animação, na ordem de chegada (movimentos seguidos viram um)
+                if (event.type == pygame.MOUSEMOTION and fila_entrada
+                        and fila_entrada[-1].type == pygame.MOUSEMOTION):
+                    fila_entrada[-1] = event
+                else:
+                    fila_entrada.append(event)
+                continue
 
             if event.type == pygame.QUIT:
                 running = False
 
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                invalidar(AREA_TELA)
+
+            elif event.type == pygame.VIDEORESIZE:
+                tamanho_pendente = (max(event.w, 1), max(event.h, 1))
+                redimensionar_em = pygame.time.get_ticks() + 120
+
             # Teclas
             elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_r:
-                    jogo = Jogo()
-                    jogo.iniciar_jogo()
+                if event.key == pygame.K_F3:
+                    perfil.alternar()
+                    invalidar(AREA_TELA)
+                    continue
+
+                if event.key == pygame.K_F4:
+                    if perfil.ativo and perfil.eventos:
+                        try:
+                            set_msg(f"Trace salvo em {perfil.exportar_trace()}", 4000)
+                        except OSError as e:
+                            set_msg(f"Falha ao salvar trace: {e}", 4000)
+                    else:
+                        set_msg("Ligue o perfilador (F3) antes de exportar.")
+                    continue
+
+                if replay is not None:
+                    navegar = {pygame.K_LEFT: passo_replay - 1, pygame.K_RIGHT: passo_replay + 1,
+                               pygame.K_PAGEUP: passo_replay - 10, pygame.K_PAGEDOWN: passo_replay + 10,
+                               pygame.K_HOME: 0, pygame.K_END: len(replay.acoes)}
+                    if event.key in navegar:
+                        ir_para(navegar[event.key])
+                    continue
+
+                if event.key in (pygame.K_r, pygame.K_e, pygame.K_u, pygame.K_y, pygame.K_z):
+                    invalidar(AREA_TELA)
+
+                # Desfazer: U ou Ctrl+Z / Refazer: Y, Ctrl+Y ou Ctrl+Shift+Z
+                ctrl = event.mod & pygame.KMOD_CTRL
+                shift = event.mod & pygame.KMOD_SHIFT
+                desfazer = event.key == pygame.K_u or (ctrl and event.key == pygame.K_z and not shift)
+                refazer = event.key == pygame.K_y or (ctrl and event.key == pygame.K_z and shift)
+
+                if desfazer or refazer:
+                    hint_cards.clear()
+                    hint_timer = 0
+                    if desfazer:
+                        set_msg("Jogada desfeita." if com_animacao(jogo.desfazer) else "Nada para desfazer.")
+                    else:
+                        set_msg("Jogada refeita." if com_animacao(jogo.refazer) else "Nada para refazer.")
+
+                elif event.key == pygame.K_r:
+                    jogo = novo_jogo()
                     drag_info = {"arrastando": False, "origem": None, "cartas": [], "mouse": (0,0)}
                     set_msg("Novo jogo iniciado.")
 
+                elif event.key in (pygame.K_1, pygame.K_2, pygame.K_3):
+                    if baralhos is None:
+                        set_msg("Sem base de baralhos (--baralhos).")
+                    else:
+                        dificuldade = FAIXAS[event.key - pygame.K_1]
+                        jogo = novo_jogo()
+                        drag_info = {"arrastando": False, "origem": None, "cartas": [], "mouse": (0,0)}
+                        set_msg(f"Novo jogo, dificuldade {NOMES_FAIXAS[dificuldade]}.")
+                        invalidar(AREA_TELA)
+
                 elif event.key == pygame.K_e:
-                    if jogo.distribuir_estoque():
+                    if com_animacao(jogo.distribuir_estoque):
                         set_msg("Estoque distribuído.")
                     else:
                         if any(p.esta_vazia() for p in jogo.tableau):
@@ -514,32 +1104,7 @@ def main():
                             set_msg("Distribuição não permitida agora.")
 
                 elif event.key == pygame.K_h:
-                    mov = encontrar_primeiro_movimento_valido(jogo)
-                    hint_cards.clear()
-
-                    if mov:
-                        origem_idx, qtd, destino_idx = mov
-                        pilha = jogo.tableau[origem_idx]
-
-                        # DESTACAR BLOCO DE ORIGEM
-                        start = len(pilha.cartas) - qtd
-                        for i in range(start, len(pilha.cartas)):
-                            hint_cards.add((origem_idx, i))
-
-                        # DESTACAR DESTINO
-                        destino = jogo.tableau[destino_idx]
-
-                        if destino.esta_vazia():
-                            # marcar destino vazio usando índice especial (-1)
-                            hint_cards.add((destino_idx, -1))
-                        else:
-                            # marcar carta do topo
-                            topo_idx = len(destino.cartas) - 1
-                            hint_cards.add((destino_idx, topo_idx))
-                        
-                        # --- ALTERADO: DEFININDO TIMER PARA TECLA 'H' ---
-                        hint_timer = pygame.time.get_ticks() + 3000
-
+                    pedir_dica()
 
             # Clique mouse
             elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
@@ -548,11 +1113,17 @@ def main():
                 # Botão de Tema 
                 if theme_btn.collidepoint((mx,my)):
                     trocar_tema()
+                    invalidar(AREA_TELA)
+                    continue
+
+                # Assistindo replay: nada além do tema responde ao mouse
+                if replay is not None:
                     continue
 
                 # Botão distribuir
                 if deal_btn.collidepoint((mx,my)):
-                    if jogo.distribuir_estoque():
+                    invalidar(AREA_TELA)
+                    if com_animacao(jogo.distribuir_estoque):
                         set_msg("Estoque distribuído.")
                     else:
                         if any(p.esta_vazia() for p in jogo.tableau):
@@ -565,43 +1136,17 @@ def main():
 
                 # Botão reiniciar
                 if restart_btn.collidepoint((mx,my)):
-                    jogo = Jogo()
-                    jogo.iniciar_jogo()
+                    invalidar(AREA_TELA)
+                    jogo = novo_jogo()
                     drag_info = {"arrastando": False, "origem": None, "cartas": [], "mouse": (0,0)}
                     set_msg("Novo jogo iniciado.")
                     continue
                 
                 # Botão Dica
                 if hint_btn.collidepoint((mx,my)):
-                    mov = encontrar_primeiro_movimento_valido(jogo)
-                    hint_cards.clear()
-
-                    if mov:
-                        origem_idx, qtd, destino_idx = mov
-
-                        # --- DESTACAR ORIGEM ---
-                        pilha_origem = jogo.tableau[origem_idx]
-                        start = len(pilha_origem.cartas) - qtd
-
-                        for i in range(start, len(pilha_origem.cartas)):
-                            hint_cards.add((origem_idx, i))
-
-                        # --- DESTACAR DESTINO ---
-                        pilha_dest = jogo.tableau[destino_idx]
-
-                        if pilha_dest.esta_vazia():
-                            # marca slot vazio usando índice especial -1
-                            hint_cards.add((destino_idx, -1))
-                        else:
-                            topo_idx = len(pilha_dest.cartas) - 1
-                            hint_cards.add((destino_idx, topo_idx))
-                        
-                        # --- ALTERADO: DEFININDO TIMER PARA CLIQUE DO BOTÃO ---
-                        hint_timer = pygame.time.get_ticks() + 3000
-
+                    pedir_dica()
                     continue
 
-
                 # Começar arrasto
                 col = hit_test_pilha(jogo, (mx,my))
                 if col is not None:
@@ -616,64 +1161,207 @@ def main():
                                 "cartas": bloco.copy(),
                                 "mouse": (mx,my)
                             }
+                            invalidar(coluna_area(col), rect_bloco_arrastado(drag_info))
                         else:
                             set_msg("Só é possível arrastar sequência válida.")
 
             elif event.type == pygame.MOUSEMOTION:
                 if drag_info["arrastando"]:
+                    antes = rect_bloco_arrastado(drag_info)
                     drag_info["mouse"] = event.pos
+                    invalidar(antes, rect_bloco_arrastado(drag_info))
 
             elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
                 if drag_info["arrastando"]:
+                    invalidar(AREA_TELA)
                     mx, my = event.pos
                     origem = drag_info["origem"]
                     bloco = drag_info["cartas"]
                     qtd = len(bloco)
 
                     alvo = hit_test_pilha(jogo, (mx,my))
+                    moveu = com_animacao(lambda: alvo is not None and jogo.mover(origem, qtd, alvo), drag_info)
                     if alvo is not None:
-                        if jogo.mover(origem, qtd, alvo):
-                            set_msg(f"Movidas {qtd} carta(s).")
-                        else:
-                            set_msg("Movimento inválido.")
+                        set_msg(f"Movidas {qtd} carta(s)." if moveu else "Movimento inválido.")
 
                     drag_info = {"arrastando": False, "origem": None, "cartas": [], "mouse": (0,0)}
 
+        if tamanho_pendente and pygame.time.get_ticks() >= redimensionar_em:
+            redimensionar(*tamanho_pendente)
+            tamanho_pendente = None
+            redimensionar_em = 0
+            animacoes.limpar()
+            drag_info = {"arrastando": False, "origem": None, "cartas": [], "mouse": (0,0)}
+            invalidar(AREA_TELA)
+
+        perfil.marcar("eventos")
+
+        # Dica em segundo plano: descarta se o jogo mudou, senão aplica o que chegou
+        if dica.pensando and estado_dica() != dica_estado:
+            dica.cancelar()
+            invalidar(AREA_RODAPE)
+        for resposta in dica.coletar():
+            mostrar_dica(resposta.movimento)
+            if resposta.final:
+                if resposta.movimento is None:
+                    set_msg("Nenhuma jogada encontrada.")
+                elif resposta.status == RESOLVIDO:
+                    if resposta.distancia > 0:
+                        set_msg(f"Dica: vitória em {resposta.distancia} jogadas a partir daqui.")
+                    else:
+                        set_msg("Dica: esta jogada leva à vitória.")
+                elif resposta.status == INSOLUVEL:
+                    # Afirmação forte só quando não resta carta no estoque
+                    if jogo.estoque.restante() == 0:
+                        set_msg("Dica: a partida não tem mais solução.")
+                    else:
+                        set_msg("Dica: o solver não achou caminho para a vitória daqui.")
+                invalidar(AREA_RODAPE)
+        if dica.pensando:
+            invalidar(AREA_RODAPE)
+
         # Vitória / travado
+        end_anterior = end_text
         if jogo.verificar_vitoria():
             end_text = "🎉 Vitória!"
         elif jogo.sem_movimentos_validos() and jogo.estoque.restante() == 0:
             end_text = "🚫 Travado!"
         else:
             end_text = ""
+        if end_text != end_anterior:
+            invalidar(AREA_RODAPE)
 
-        # Expirar dica
-        if hint_timer and pygame.time.get_ticks() > hint_timer:
+        # Expirar dica (não enquanto ela ainda está sendo calculada)
+        if hint_timer and not dica.pensando and pygame.time.get_ticks() > hint_timer:
             hint_cards.clear()
             hint_timer = 0
+            invalidar(AREA_TABLEAU)
 
-        # Desenhar
+        # Expirar mensagem
+        if msg_timer and pygame.time.get_ticks() >= msg_timer:
+            msg_timer = 0
+            invalidar(AREA_RODAPE)
+
+        if animacoes.ativa:
+            invalidar(*animacoes.avancar(pygame.time.get_ticks()))
+
+        perfil.marcar("logica")
+
+        if not redesenho_continuo and not sujos:
+            continue
+        if perfil.ativo:
+            # O overlay acompanha todo quadro desenhado (e só eles)
+            invalidar(AREA_PERFIL)
+
+        # Desenhar (no modo por invalidação, só dentro da união das regiões sujas)
+        if not redesenho_continuo:
+            screen.set_clip(sujos[0].unionall(sujos[1:]))
         screen.fill(BG)
         desenhar_ui_topo(jogo)
-        desenhar_tableau(jogo, drag_info, hint_cards)
+        perfil.marcar("ui_topo")
+        desenhar_tableau(jogo, drag_info, hint_cards, animacoes)
 
         if msg and pygame.time.get_ticks() < msg_timer:
-            mtxt = font_small.render(msg, True, (255,255,255))
-            screen.blit(mtxt, (MARGEM_X, ALTURA - 30))
+            mtxt = obter_atlas().rotulo(msg, font_small, (255,255,255))
+            screen.blit(mtxt, (MARGEM_X, ALTURA - px(30)))
+
+        if replay is not None:
+            rtxt = font_small.render(f"Replay {passo_replay}/{len(replay.acoes)}  "
+                                     "(←/→, PgUp/PgDn, Home/End)", True, (255, 255, 0))
+            screen.blit(rtxt, (LARGURA - rtxt.get_width() - MARGEM_X, ALTURA - px(30)))
+
+        if dica.pensando:
+            pontos = "." * (pygame.time.get_ticks() // 300 % 4)
+            ptxt = obter_atlas().rotulo("Pensando" + pontos, font_small, (255, 255, 0))
+            screen.blit(ptxt, (LARGURA - px(180), ALTURA - px(30)))
 
         if end_text:
-            e = font_big.render(end_text, True, (255,255,255))
+            e = obter_atlas().rotulo(end_text, font_big, (255,255,255))
             # Ajuste a cor de fundo da mensagem final para o tema
             bg_end_color = (0,0,0) if not dark_mode else (30, 30, 45) 
-            pygame.draw.rect(screen, bg_end_color, (0, ALTURA-70, LARGURA, 70))
-            screen.blit(e, (MARGEM_X, ALTURA - 56))
+            pygame.draw.rect(screen, bg_end_color, AREA_RODAPE)
+            screen.blit(e, (MARGEM_X, ALTURA - px(56)))
+        perfil.marcar("tableau")
 
-        pygame.display.flip()
+        if perfil.ativo:
+            perfil.desenhar(screen, font_small, AREA_PERFIL)
+            perfil.marcar("overlay")
+
+        if redesenho_continuo:
+            pygame.display.flip()
+        else:
+            screen.set_clip(None)
+            pygame.display.update(sujos)
+        sujos.clear()
+        perfil.marcar("flip")
+        perfil.fim_quadro()
+
+        if medir_inicio:
+            t_jogo = time.perf_counter()
+            print(f"primeiro quadro: {(t_primeiro - _INICIO) * 1000:.1f} ms | "
+                  f"atlas e módulos: {(t_atlas - _INICIO) * 1000:.1f} ms | "
+                  f"jogo na tela: {(t_jogo - _INICIO) * 1000:.1f} ms (desde a importação)")
+            running = False
         clock.tick(60)
 
+    dica.fechar()
+    if cache is not None:
+        cache.fechar()
+    if salvamento is not None:
+        salvamento.fechar()
+    if gravador is not None:
+        gravador.fechar()
     pygame.quit()
     sys.exit()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Spider (1 Naipe)")
+    parser.add_argument("--sempre-redesenhar", action="store_true",
+                        help="redesenha a tela inteira a 60 fps mesmo sem mudanças")
+    parser.add_argument("--gravar", metavar="ARQUIVO",
+                        help="anexa cada partida jogada a este arquivo de replay")
+    parser.add_argument("--replay", metavar="ARQUIVO", help="assiste uma partida gravada")
+    parser.add_argument("--jogo", type=int, default=0,
+                        help="índice da partida no arquivo de --replay (padrão: 0)")
+    parser.add_argument("--baralhos", metavar="ARQUIVO",
+                        help="base de distribuições resolvidas (python -m spider_baralhos construir)")
+    parser.add_argument("--dificuldade", choices=FAIXAS[:3], default="medio")
+    parser.add_argument("--medir-inicio", action="store_true",
+                        help="mostra o tempo até o primeiro quadro e encerra")
+    parser.add_argument("--sem-animacao", action="store_true",
+                        help="as cartas mudam de lugar na hora, sem deslizar")
+    parser.add_argument("--autosave", metavar="DIR", default=DIR_AUTOSAVE,
+                        help=f"onde a partida em andamento é salva (padrão: {DIR_AUTOSAVE})")
+    parser.add_argument("--sem-autosave", action="store_true",
+                        help="não salva nem retoma a partida")
+    parser.add_argument("--cache-dicas", metavar="ARQUIVO", default=CACHE_DICAS,
+                        help=f"cache de dicas por posição (padrão: {CACHE_DICAS})")
+    parser.add_argument("--cache-memoria", type=int, metavar="N",
+                        help="máximo de posições do cache em memória")
+    parser.add_argument("--cache-disco", type=int, metavar="N",
+                        help="posições que cabem no arquivo do cache (20 bytes cada)")
+    parser.add_argument("--sem-cache-dicas", action="store_true",
+                        help="toda dica é calculada do zero")
+    args = parser.parse_args()
+
+    rep = None
+    if args.replay:
+        from spider_replay import ler_replay
+        try:
+            rep = ler_replay(args.replay, args.jogo)
+        except (OSError, ValueError, IndexError) as e:
+            parser.error(str(e))
+    base = None
+    if args.baralhos:
+        try:
+            base = BaseBaralhos(args.baralhos)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+    main(redesenho_continuo=args.sempre_redesenhar, gravar=args.gravar, replay=rep,
+         baralhos=base, dificuldade=args.dificuldade, medir_inicio=args.medir_inicio,
+         animar=not args.sem_animacao, autosave=None if args.sem_autosave else args.autosave,
+         cache_dicas=None if args.sem_cache_dicas else args.cache_dicas,
+         cache_memoria=args.cache_memoria, cache_disco=args.cache_disco)
\ No newline at end of file
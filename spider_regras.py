@@ -0,0 +1,490 @@
+"""Regras do Spider (1 naipe), sem dependência de pygame.
+
+Pode ser importado em scripts, testes e processos de trabalho sem abrir
+janela nem carregar fontes; a interface fica em ``spider_pygame``.
+"""
+import random
+from typing import List, Optional, Set, Tuple
+
+
+NAIPE = '♠'
+VALOR_NOME = {
+    1: 'A', 2: '2', 3: '3', 4: '4', 5: '5', 6: '6', 7: '7',
+    8: '8', 9: '9', 10: '10', 11: 'J', 12: 'Q', 13: 'K'
+}
+
+
+class Carta:
+    __slots__ = ("valor", "naipe", "virada_para_cima")
+
+    def __init__(self, valor: int, naipe: str = NAIPE, virada_para_cima: bool = False):
+        self.valor = valor
+        self.naipe = naipe
+        self.virada_para_cima = virada_para_cima
+
+    def virar(self):
+        self.virada_para_cima = True
+
+    def desvirar(self):
+        self.virada_para_cima = False
+
+    def __str__(self):
+        return f"{VALOR_NOME[self.valor]}{self.naipe}" if self.virada_para_cima else "##"
+
+
+class Pilha:
+    def __init__(self):
+        self.cartas: List[Carta] = []
+        # Metadados por posição, mantidos em push/pop/virar_topo:
+        # _visiveis[k]: cartas viradas para cima seguidas terminando em k
+        # _seq[k]: tamanho da sequência decrescente do mesmo naipe (visível) terminando em k
+        self._visiveis: List[int] = []
+        self._seq: List[int] = []
+        # Incrementado a cada alteração (push/pop/virar); caches externos comparam com ele
+        self.versao = 0
+
+    def esta_vazia(self) -> bool:
+        return len(self.cartas) == 0
+
+    def topo(self) -> Optional[Carta]:
+        return self.cartas[-1] if self.cartas else None
+
+    def _anexar_metadados(self, c: Carta):
+        if not c.virada_para_cima:
+            self._visiveis.append(0)
+            self._seq.append(0)
+            return
+        if self.cartas and self._visiveis[-1]:
+            b = self.cartas[-1]
+            self._visiveis.append(self._visiveis[-1] + 1)
+            continua = b.valor == c.valor + 1 and b.naipe == c.naipe
+            self._seq.append(self._seq[-1] + 1 if continua else 1)
+        else:
+            self._visiveis.append(1)
+            self._seq.append(1)
+
+    def push(self, cartas: List[Carta]):
+        for c in cartas:
+            self._anexar_metadados(c)
+            self.cartas.append(c)
+        self.versao += 1
+
+    def push_carta(self, carta: Carta):
+        self._anexar_metadados(carta)
+        self.cartas.append(carta)
+        self.versao += 1
+
+    def pop(self, n: int = 1) -> List[Carta]:
+        if n <= 0 or n > len(self.cartas):
+            raise ValueError("Quantidade inválida no pop.")
+        ret = self.cartas[-n:]
+        del self.cartas[-n:]
+        del self._visiveis[-n:]
+        del self._seq[-n:]
+        self.versao += 1
+        return ret
+
+    def virar_topo(self) -> bool:
+        # Vira a carta do topo se ela estiver para baixo
+        if self.cartas and not self.cartas[-1].virada_para_cima:
+            c = self.cartas.pop()
+            self._visiveis.pop()
+            self._seq.pop()
+            c.virar()
+            self._anexar_metadados(c)
+            self.cartas.append(c)
+            self.versao += 1
+            return True
+        return False
+
+    def desvirar_topo(self):
+        # Inverso de virar_topo (usado ao desfazer jogadas)
+        c = self.cartas.pop()
+        self._visiveis.pop()
+        self._seq.pop()
+        c.desvirar()
+        self._anexar_metadados(c)
+        self.cartas.append(c)
+        self.versao += 1
+
+    def tamanho_sequencia_topo(self) -> int:
+        # Quantas cartas do topo formam sequência decrescente do mesmo naipe, todas visíveis
+        return self._seq[-1] if self._seq else 0
+
+    def _indice_inicio_bloco_visivel(self) -> int:
+        return len(self.cartas) - (self._visiveis[-1] if self._visiveis else 0)
+
+    def bloco_visivel(self) -> List[Carta]:
+        i = self._indice_inicio_bloco_visivel()
+        return self.cartas[i:] if i < len(self.cartas) else []
+
+    def _sequencia_decrescente_mesmo_naipe(self, cartas: List[Carta]) -> bool:
+        if not cartas:
+            return False
+        for i in range(len(cartas) - 1):
+            a, b = cartas[i], cartas[i+1]
+            if a.valor != b.valor + 1 or a.naipe != b.naipe:
+                return False
+        return True
+
+    def pode_mover_bloco_para(self, qtd: int, destino: 'Pilha') -> bool:
+        if qtd <= 0 or qtd > self.tamanho_sequencia_topo():
+            return False
+        if destino.esta_vazia():
+            return True
+        topo_dest = destino.cartas[-1]
+        base = self.cartas[-qtd]
+        return topo_dest.virada_para_cima and topo_dest.naipe == base.naipe and topo_dest.valor == base.valor + 1
+
+    def mover_bloco_para(self, qtd: int, destino: 'Pilha') -> bool:
+        if self.pode_mover_bloco_para(qtd, destino):
+            movidas = self.pop(qtd)
+            destino.push(movidas)
+            self.virar_topo()
+            return True
+        return False
+
+    def tem_sequencia_completa(self) -> bool:
+        # K no início de uma sequência de 13 implica A no topo
+        return self.tamanho_sequencia_topo() >= 13 and self.cartas[-13].valor == 13
+
+    def remover_sequencia_completa(self) -> Optional[List[Carta]]:
+        if self.tem_sequencia_completa():
+            seq = self.pop(13)
+            self.virar_topo()
+            return seq
+        return None
+
+
+class Baralho:
+    def __init__(self, cartas: Optional[List[Carta]] = None, semente: Optional[int] = None):
+        # cartas: ordem já definida (ex.: estado restaurado); sem ela, embaralha um baralho novo.
+        # semente: embaralhamento reproduzível, independente do random global
+        self.semente = semente
+        if cartas is not None:
+            self.cartas: List[Carta] = list(cartas)
+        else:
+            self.cartas = [Carta(v, NAIPE, False) for _ in range(8) for v in range(1, 14)]
+            if semente is None:
+                random.shuffle(self.cartas)
+            else:
+                random.Random(semente).shuffle(self.cartas)
+        # cartas guarda a ordem completa de saque; pos é quantas já saíram
+        self.pos = 0
+
+    def sacar(self, n: int) -> List[Carta]:
+        if n > self.restante():
+            raise ValueError("Sem cartas suficientes no baralho.")
+        ret = self.cartas[self.pos:self.pos + n]
+        self.pos += n
+        return ret
+
+    def sacar_uma(self) -> Carta:
+        if self.pos >= len(self.cartas):
+            raise ValueError("Sem cartas suficientes no baralho.")
+        carta = self.cartas[self.pos]
+        self.pos += 1
+        return carta
+
+    def devolver(self, n: int):
+        # Desfaz o saque das últimas n cartas
+        if n > self.pos:
+            raise ValueError("Não há cartas sacadas para devolver.")
+        self.pos -= n
+
+    def restantes(self) -> List[Carta]:
+        return self.cartas[self.pos:]
+
+    def restante(self) -> int:
+        return len(self.cartas) - self.pos
+
+
+class Jogada:
+    """Delta de uma jogada, suficiente para desfazê-la sem copiar o jogo.
+
+    Distribuição do estoque usa ``src == dst == -1`` (e ``qtd == 10``).
+    """
+
+    __slots__ = ("src", "qtd", "dst", "virou_origem", "completou", "virou_destino")
+
+    def __init__(self, src: int, qtd: int, dst: int, virou_origem: bool = False,
+                 completou: bool = False, virou_destino: bool = False):
+        self.src = src
+        self.qtd = qtd
+        self.dst = dst
+        # Carta revelada na origem depois de tirar o bloco
+        self.virou_origem = virou_origem
+        # K→A completado no destino e levado para a fundação
+        self.completou = completou
+        # Carta revelada no destino depois de tirar o K→A
+        self.virou_destino = virou_destino
+
+    @property
+    def eh_distribuicao(self) -> bool:
+        return self.src == -1
+
+    def __repr__(self):
+        if self.eh_distribuicao:
+            return "Jogada(distribuir)"
+        return f"Jogada({self.src}, {self.qtd}, {self.dst})"
+
+
+class Diario:
+    # Jogadas feitas (para desfazer) e desfeitas (para refazer)
+    def __init__(self):
+        self.feitas: List[Jogada] = []
+        self.desfeitas: List[Jogada] = []
+
+    def registrar(self, jogada: Jogada):
+        self.feitas.append(jogada)
+        self.desfeitas.clear()
+
+
+class Jogo:
+    def __init__(self, baralho: Optional[Baralho] = None):
+        self.tableau: List[Pilha] = [Pilha() for _ in range(10)]
+        self.fundacao: List[List[Carta]] = []
+        self.estoque = baralho if baralho is not None else Baralho()
+        self.diario = Diario()
+        # Opcional (ex.: spider_replay.GravadorReplay): avisado de cada ação aceita
+        # do jogador (mover, distribuir, desfazer, refazer)
+        self.gravador = None
+
+        # Índice de movimentos válidos (src, qtd, dst), refeito só para as pilhas
+        # cuja versão mudou desde a última consulta, e as flags que saem dele
+        # (colunas vazias, pode distribuir, travado), refeitas junto
+        self._movimentos: Set[Tuple[int, int, int]] = set()
+        self._versoes_indice: List[int] = [-1] * 10
+        self._restante_indice = -1
+        self._vazias: Set[int] = set()
+        self._pode_distribuir = False
+        self._travado = False
+
+        # Hash Zobrist (o de spider_estado.EstadoCompacto): calculado inteiro na
+        # primeira consulta a hash_zobrist e daí em diante atualizado com XOR por
+        # jogar/jogar_distribuicao/reverter (logo também por mover, distribuir,
+        # desfazer e refazer). Até lá as tabelas nem são carregadas
+        self._hash: Optional[int] = None
+
+    def iniciar_jogo(self):
+        distribuicoes = [6]*4 + [5]*6
+        for i, qtd in enumerate(distribuicoes):
+            cartas = self.estoque.sacar(qtd)
+            self.tableau[i].push(cartas)
+        for pilha in self.tableau:
+            pilha.virar_topo()
+        self._hash = None
+
+    def distribuir_estoque(self) -> bool:
+        jogada = self.jogar_distribuicao()
+        if jogada is None:
+            return False
+        self.diario.registrar(jogada)
+        if self.gravador is not None:
+            self.gravador.distribuir()
+        return True
+
+    def mover(self, src: int, qtd: int, dst: int) -> bool:
+        jogada = self.jogar(src, qtd, dst)
+        if jogada is None:
+            return False
+        self.diario.registrar(jogada)
+        if self.gravador is not None:
+            self.gravador.mover(src, qtd, dst)
+        return True
+
+    # ----- jogadas com delta (sem diário), para busca: jogar/reverter -----
+    def jogar_distribuicao(self) -> Optional[Jogada]:
+        if any(p.esta_vazia() for p in self.tableau):
+            return None
+        if self.estoque.restante() < 10:
+            return None
+        for pilha in self.tableau:
+            carta = self.estoque.sacar_uma()
+            carta.virar()
+            pilha.push_carta(carta)
+        jogada = Jogada(-1, 10, -1)
+        if self._hash is not None:
+            self._hash ^= self._delta_zobrist(jogada)
+        return jogada
+
+    def jogar(self, src: int, qtd: int, dst: int) -> Optional[Jogada]:
+        if not (0 <= src < 10 and 0 <= dst < 10) or src == dst:
+            return None
+        origem = self.tableau[src]
+        destino = self.tableau[dst]
+        if not origem.pode_mover_bloco_para(qtd, destino):
+            return None
+        destino.push(origem.pop(qtd))
+        jogada = Jogada(src, qtd, dst, virou_origem=origem.virar_topo())
+        if destino.tem_sequencia_completa():
+            self.fundacao.append(destino.pop(13))
+            jogada.completou = True
+            jogada.virou_destino = destino.virar_topo()
+        if self._hash is not None:
+            self._hash ^= self._delta_zobrist(jogada)
+        return jogada
+
+    def reverter(self, jogada: Jogada):
+        # Desfaz uma jogada devolvida por jogar()/jogar_distribuicao(); O(cartas movidas)
+        if self._hash is not None:
+            self._hash ^= self._delta_zobrist(jogada)
+        if jogada.eh_distribuicao:
+            for pilha in reversed(self.tableau):
+                carta = pilha.pop(1)[0]
+                carta.desvirar()
+            self.estoque.devolver(10)
+            return
+        origem = self.tableau[jogada.src]
+        destino = self.tableau[jogada.dst]
+        if jogada.completou:
+            if jogada.virou_destino:
+                destino.desvirar_topo()
+            destino.push(self.fundacao.pop())
+        if jogada.virou_origem:
+            origem.desvirar_topo()
+        origem.push(destino.pop(jogada.qtd))
+
+    # ----- hash Zobrist incremental -----
+    @property
+    def hash_zobrist(self) -> int:
+        if self._hash is None:
+            from spider_estado import EstadoCompacto
+            self._hash = EstadoCompacto.de_jogo(self).hash
+        return self._hash
+
+    def _delta_zobrist(self, jogada: Jogada) -> int:
+        # XOR entre os hashes de antes e depois de `jogada`, lido do estado de depois
+        import spider_estado as z
+        z_carta = z.z_carta
+        codificar = z.codificar
+        if jogada.eh_distribuicao:
+            restante = self.estoque.restante()
+            h = z.Z_ESTOQUE[restante] ^ z.Z_ESTOQUE[restante + len(self.tableau)]
+            for i, pilha in enumerate(self.tableau):
+                c = pilha.cartas[-1]
+                h ^= z_carta(i, len(pilha.cartas) - 1, codificar(c.valor, c.naipe), True)
+            return h
+
+        src, qtd, dst = jogada.src, jogada.qtd, jogada.dst
+        origem = self.tableau[src].cartas
+        destino = self.tableau[dst].cartas
+        n_orig = len(origem)
+        n_dest = len(destino)
+        h = 0
+        if jogada.completou:
+            # O bloco saiu com o K→A; as 13 - qtd cartas de baixo dele estavam no destino
+            seq = self.fundacao[-1]
+            bloco = seq[13 - qtd:]
+            for k, c in enumerate(seq[:13 - qtd]):
+                h ^= z_carta(dst, n_dest + k, codificar(c.valor, c.naipe), True)
+            h ^= z.Z_FUNDACAO[(len(self.fundacao) - 1) * len(z.NAIPES) + z.INDICE_NAIPE[seq[0].naipe]]
+            if jogada.virou_destino:
+                h ^= self._delta_virada(dst, n_dest - 1)
+        else:
+            bloco = destino[n_dest - qtd:]
+            for k, c in enumerate(bloco):
+                h ^= z_carta(dst, n_dest - qtd + k, codificar(c.valor, c.naipe), True)
+        for k, c in enumerate(bloco):
+            h ^= z_carta(src, n_orig + k, codificar(c.valor, c.naipe), True)
+        if jogada.virou_origem:
+            h ^= self._delta_virada(src, n_orig - 1)
+        return h
+
+    def _delta_virada(self, i: int, pos: int) -> int:
+        import spider_estado as z
+        c = self.tableau[i].cartas[pos]
+        codigo = z.codificar(c.valor, c.naipe)
+        return z.z_carta(i, pos, codigo, False) ^ z.z_carta(i, pos, codigo, True)
+
+    def reaplicar(self, jogada: Jogada) -> Jogada:
+        if jogada.eh_distribuicao:
+            return self.jogar_distribuicao()
+        return self.jogar(jogada.src, jogada.qtd, jogada.dst)
+
+    # ----- desfazer/refazer (diário do jogador) -----
+    def pode_desfazer(self) -> bool:
+        return bool(self.diario.feitas)
+
+    def pode_refazer(self) -> bool:
+        return bool(self.diario.desfeitas)
+
+    def desfazer(self) -> bool:
+        if not self.diario.feitas:
+            return False
+        jogada = self.diario.feitas.pop()
+        self.reverter(jogada)
+        self.diario.desfeitas.append(jogada)
+        if self.gravador is not None:
+            self.gravador.desfazer()
+        return True
+
+    def refazer(self) -> bool:
+        if not self.diario.desfeitas:
+            return False
+        jogada = self.reaplicar(self.diario.desfeitas.pop())
+        self.diario.feitas.append(jogada)
+        if self.gravador is not None:
+            self.gravador.refazer()
+        return True
+
+    def verificar_vitoria(self) -> bool:
+        return len(self.fundacao) == 8
+
+    def pode_distribuir(self) -> bool:
+        self._atualizar_indice()
+        return self._pode_distribuir
+
+    def movimentos_validos(self) -> Set[Tuple[int, int, int]]:
+        self._atualizar_indice()
+        return self._movimentos
+
+    def sem_movimentos_validos(self) -> bool:
+        self._atualizar_indice()
+        return self._travado
+
+    def _atualizar_indice(self):
+        versoes = [p.versao for p in self.tableau]
+        restante = self.estoque.restante()
+        if versoes == self._versoes_indice and restante == self._restante_indice:
+            return
+        mudaram = {k for k in range(10) if versoes[k] != self._versoes_indice[k]}
+        self._versoes_indice = versoes
+        self._restante_indice = restante
+
+        self._movimentos = {m for m in self._movimentos if m[0] not in mudaram and m[2] not in mudaram}
+
+        # Só os pares (origem, destino) em que pelo menos um lado mudou
+        for i, origem in enumerate(self.tableau):
+            seq = origem.tamanho_sequencia_topo()
+            if seq == 0:
+                continue
+            for j, destino in enumerate(self.tableau):
+                if i == j or (i not in mudaram and j not in mudaram):
+                    continue
+                if destino.esta_vazia():
+                    for qtd in range(1, seq + 1):
+                        self._movimentos.add((i, qtd, j))
+                    continue
+                topo_dest = destino.topo()
+                if not topo_dest.virada_para_cima:
+                    continue
+                # Só um tamanho de bloco pode encaixar: a base precisa valer topo - 1
+                qtd = topo_dest.valor - origem.topo().valor
+                if 1 <= qtd <= seq and origem.cartas[-qtd].naipe == topo_dest.naipe:
+                    self._movimentos.add((i, qtd, j))
+
+        for k in mudaram:
+            if self.tableau[k].esta_vazia():
+                self._vazias.add(k)
+            else:
+                self._vazias.discard(k)
+        self._pode_distribuir = not self._vazias and restante >= 10
+        self._travado = not self._pode_distribuir and not self._movimentos
+
+
+# ===== FUNÇÃO DE DICA =====
+def encontrar_primeiro_movimento_valido(jogo: Jogo):
+    # Mesma ordem da varredura por coluna: menor (origem, qtd, destino)
+    movimentos = jogo.movimentos_validos()
+    return min(movimentos) if movimentos else None
@@ -0,0 +1,247 @@
+"""Renderização em lote de partidas gravadas, sem janela e em paralelo.
+
+Gera um quadro por jogada (o quadro k é o jogo depois de k ações) com as
+mesmas funções de desenho da interface, mas sem o laço de eventos:
+
+    python -m spider_render --replay replays.sprp --jogo 3 --saida quadros/
+    python -m spider_render --semente 42 --movimentos jogadas.txt --formato raw --saida jogo.rgb
+
+``--movimentos`` aceita a saída de ``python -m spider_replay mostrar`` (uma
+ação por linha: ``mover src qtd dst``, ``distribuir``, ``desfazer``,
+``refazer``; o índice no começo da linha é opcional e a linha ``semente N``
+dá a semente). Em ``png`` cada quadro vira ``quadro_00000.png`` no
+diretório de saída; em ``raw`` todos vão para um único arquivo RGB24, um
+quadro após o outro, pronto para ``ffmpeg -f rawvideo``.
+
+As jogadas são divididas em faixas e cada processo do pool reproduz a
+partida até o início da sua faixa e desenha só os quadros dela. No formato
+raw o tamanho de cada quadro é fixo, então cada processo grava direto na sua
+posição do arquivo.
+"""
+import argparse
+import math
+import os
+import sys
+import time
+from array import array
+from multiprocessing import Pool
+from typing import List, Optional, Tuple
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+# Sem isso o SDL troca o SIGTERM por um evento de saída e Pool.terminate() não encerra os processos
+os.environ.setdefault("SDL_NO_SIGNAL_HANDLERS", "1")
+
+from spider_replay import (
+    ACAO_DESFAZER, ACAO_DISTRIBUIR, ACAO_REFAZER, Replay, aplicar_acao,
+    codificar_movimento, decodificar_movimento, ler_replay, reproduzir,
+)
+
+FORMATOS = ("png", "raw")
+NOMES_ACOES = {"distribuir": ACAO_DISTRIBUIR, "desfazer": ACAO_DESFAZER, "refazer": ACAO_REFAZER}
+
+# Estado de cada processo de renderização (preenchido por _iniciar)
+_tarefa = None
+
+
+def ler_movimentos(caminho: str, semente: Optional[int] = None) -> Replay:
+    """Lê uma lista de ações em texto; a semente vem do argumento ou da linha ``semente N``."""
+    acoes = array("H")
+    with open(caminho, encoding="utf-8") as f:
+        for n, linha in enumerate(f, 1):
+            partes = linha.replace(",", " ").split()
+            if not partes or partes[0].startswith("#"):
+                continue
+            if partes[0] == "semente":
+                try:
+                    valor = int(partes[1]) if len(partes) == 2 else -1
+                except ValueError:
+                    valor = -1
+                if not 0 <= valor < 1 << 64:
+                    raise ValueError(f"{caminho}:{n}: semente inválida: {linha.strip()!r}")
+                if semente is None:
+                    semente = valor
+                continue
+            if partes[0].isdigit():
+                partes = partes[1:]
+            if partes and partes[0] == "mover" and len(partes) == 4:
+                try:
+                    src, qtd, dst = map(int, partes[1:])
+                except ValueError:
+                    raise ValueError(f"{caminho}:{n}: mover espera src qtd dst inteiros: "
+                                     f"{linha.strip()!r}") from None
+                # Fora dessas faixas o código da ação nem cabe no replay (u16)
+                if not (0 <= src < 10 and 0 <= dst < 10 and 1 <= qtd <= 13):
+                    raise ValueError(f"{caminho}:{n}: mover fora da faixa (colunas 0-9, "
+                                     f"1-13 cartas): {linha.strip()!r}")
+                acoes.append(codificar_movimento(src, qtd, dst))
+            elif len(partes) == 1 and partes[0] in NOMES_ACOES:
+                acoes.append(NOMES_ACOES[partes[0]])
+            else:
+                raise ValueError(f"{caminho}:{n}: ação não reconhecida: {linha.strip()!r}")
+    if semente is None:
+        raise ValueError(f"{caminho}: sem semente (use --semente ou uma linha 'semente N')")
+    return Replay(semente, acoes, True)
+
+
+def faixas_quadros(inicio: int, fim: int, workers: int, por_worker: int = 4) -> List[Tuple[int, int]]:
+    # Faixas menores que total/workers equilibram o pool quando algumas demoram mais
+    tamanho = max(1, math.ceil((fim - inicio) / (workers * por_worker)))
+    return [(a, min(a + tamanho, fim)) for a in range(inicio, fim, tamanho)]
+
+
+def _iniciar(replay: Replay, largura: int, altura: int, escuro: bool, destacar: bool,
+             formato: str, saida: str, primeiro: int):
+    global _tarefa
+    import spider_pygame as ui
+
+    ui.inicializar_ui()
+    if (largura, altura) != (ui.LARGURA, ui.ALTURA):
+        ui.redimensionar(largura, altura)
+    if escuro != ui.dark_mode:
+        ui.trocar_tema()
+    _tarefa = (ui, replay, destacar, formato, saida, primeiro)
+
+
+def _destaques(jogo, codigo: int) -> set:
+    # Mesmo destaque da dica da interface: bloco de origem e topo do destino
+    if codigo >= ACAO_DISTRIBUIR:
+        return set()
+    src, qtd, dst = decodificar_movimento(codigo)
+    origem = jogo.tableau[src].cartas
+    destino = jogo.tableau[dst].cartas
+    cartas = {(src, i) for i in range(len(origem) - qtd, len(origem))}
+    cartas.add((dst, len(destino) - 1 if destino else -1))
+    return cartas
+
+
+def desenhar_quadro(ui, jogo, passo: int, total: int, destaques: set):
+    screen = ui.screen
+    screen.fill(ui.BG)
+    ui.desenhar_ui_topo(jogo)
+    ui.desenhar_tableau(jogo, {"arrastando": False, "origem": None, "cartas": [], "mouse": (0, 0)},
+                        destaques)
+    rtxt = ui.font_small.render(f"Jogada {passo}/{total}", True, (255, 255, 0))
+    screen.blit(rtxt, (ui.LARGURA - rtxt.get_width() - ui.MARGEM_X, ui.ALTURA - ui.px(30)))
+    if jogo.verificar_vitoria():
+        fim = "🎉 Vitória!"
+    elif jogo.sem_movimentos_validos() and jogo.estoque.restante() == 0:
+        fim = "🚫 Travado!"
+    else:
+        return
+    e = ui.obter_atlas().rotulo(fim, ui.font_big, (255, 255, 255))
+    screen.blit(e, (ui.MARGEM_X, ui.ALTURA - ui.px(56)))
+
+
+def _renderizar_faixa(faixa: Tuple[int, int]) -> int:
+    import pygame
+
+    ui, replay, destacar, formato, saida, primeiro = _tarefa
+    inicio, fim = faixa
+    total = len(replay.acoes)
+    jogo = reproduzir(replay, inicio)
+    raw = None
+    if formato == "raw":
+        raw = open(saida, "r+b")
+        raw.seek((inicio - primeiro) * ui.LARGURA * ui.ALTURA * 3)
+    try:
+        for k in range(inicio, fim):
+            if k > inicio:
+                aplicar_acao(jogo, replay.acoes[k - 1])
+            destaques = _destaques(jogo, replay.acoes[k]) if destacar and k < total else set()
+            desenhar_quadro(ui, jogo, k, total, destaques)
+            if raw is not None:
+                raw.write(pygame.image.tobytes(ui.screen, "RGB"))
+            else:
+                pygame.image.save(ui.screen, os.path.join(saida, f"quadro_{k:05d}.png"))
+    finally:
+        if raw is not None:
+            raw.close()
+    return fim - inicio
+
+
+def renderizar(replay: Replay, saida: str, formato: str = "png", workers: int = 1,
+               largura: int = 1200, altura: int = 800, escuro: bool = False,
+               destacar: bool = False, de: int = 0, ate: Optional[int] = None) -> int:
+    """Desenha os quadros ``de``..``ate`` (inclusive; padrão: até o fim) e devolve quantos gerou."""
+    total = len(replay.acoes)
+    ate = total if ate is None else min(ate, total)
+    if not 0 <= de <= ate:
+        raise ValueError(f"faixa de quadros inválida: {de}..{ate} (a partida tem {total} ações)")
+    # Ação inválida aparece aqui, antes de subir os processos (levanta ReplayInvalido)
+    reproduzir(replay, ate)
+
+    if formato == "raw":
+        with open(saida, "wb") as f:
+            f.truncate((ate - de + 1) * largura * altura * 3)
+    else:
+        os.makedirs(saida, exist_ok=True)
+    args = (replay, largura, altura, escuro, destacar, formato, saida, de)
+    faixas = faixas_quadros(de, ate + 1, workers)
+    if workers <= 1:
+        _iniciar(*args)
+        return sum(map(_renderizar_faixa, faixas))
+    pool = Pool(workers, initializer=_iniciar, initargs=args)
+    try:
+        n = sum(pool.imap_unordered(_renderizar_faixa, faixas))
+    except BaseException:
+        pool.terminate()
+        raise
+    pool.close()
+    pool.join()
+    return n
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m spider_render")
+    origem = parser.add_mutually_exclusive_group()
+    origem.add_argument("--replay", metavar="ARQUIVO", help="arquivo de replay (.sprp)")
+    origem.add_argument("--movimentos", metavar="ARQUIVO",
+                        help="ações em texto (formato de 'spider_replay mostrar')")
+    parser.add_argument("--jogo", type=int, default=0, help="índice da partida em --replay")
+    parser.add_argument("--semente", type=int,
+                        help="semente das --movimentos (sem arquivo: só a distribuição inicial)")
+    parser.add_argument("--saida", required=True,
+                        help="diretório (png) ou arquivo (raw) de destino")
+    parser.add_argument("--formato", choices=FORMATOS, default="png")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--tamanho", default="1200x800", help="LARGURAxALTURA dos quadros")
+    parser.add_argument("--escuro", action="store_true", help="usa o tema escuro")
+    parser.add_argument("--destacar", action="store_true",
+                        help="destaca em cada quadro o bloco que a próxima jogada move")
+    parser.add_argument("--de", type=int, default=0, help="primeiro quadro")
+    parser.add_argument("--ate", type=int, help="último quadro (padrão: o fim da partida)")
+    args = parser.parse_args(argv)
+
+    try:
+        largura, altura = (int(v) for v in args.tamanho.lower().split("x"))
+    except ValueError:
+        parser.error(f"--tamanho inválido: {args.tamanho!r} (use LARGURAxALTURA)")
+    if args.replay is None and args.movimentos is None and args.semente is None:
+        parser.error("informe --replay, --movimentos ou --semente")
+
+    inicio = time.perf_counter()
+    try:
+        if args.replay:
+            try:
+                replay = ler_replay(args.replay, args.jogo)
+            except IndexError as e:
+                parser.error(f"--jogo {args.jogo}: {e}")
+        elif args.movimentos:
+            replay = ler_movimentos(args.movimentos, args.semente)
+        else:
+            replay = Replay(args.semente, array("H"), True)
+        n = renderizar(replay, args.saida, args.formato, args.workers, largura, altura,
+                       args.escuro, args.destacar, args.de, args.ate)
+    except ValueError as e:
+        print(f"erro: {e}", file=sys.stderr)
+        return 1
+    segundos = time.perf_counter() - inicio
+    print(f"{n} quadros em {segundos:.2f}s ({n / max(segundos, 1e-9):.1f} quadros/s) -> {args.saida}")
+    if args.formato == "raw":
+        print(f"ffmpeg -f rawvideo -pix_fmt rgb24 -s {largura}x{altura} -r 2 -i {args.saida} jogo.mp4",
+              file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
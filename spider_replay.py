@@ -0,0 +1,297 @@
+"""Replays binários: semente + ações de cada partida, gravados em sequência.
+
+Formato (inteiros little-endian, tudo alinhado em 2 bytes):
+
+    arquivo : b"SPRP" | versão u16 | reservado u16 | partida*
+    partida : semente u64 | ação u16* | FIM (0xFFFF)
+
+Ação ``(src*10 + dst)*13 + qtd - 1`` é um movimento (a mesma codificação de
+``spider_lote``); 1300 distribui o estoque, 1301 desfaz e 1302 refaz. Uma
+partida sem FIM (programa encerrado no meio) é lida como incompleta.
+
+Uso:
+    python -m spider_replay verificar replays.sprp [--workers 4]
+    python -m spider_replay mostrar replays.sprp --jogo 3
+"""
+import argparse
+import os
+import struct
+import sys
+import time
+from array import array
+from multiprocessing import Pool
+from typing import BinaryIO, Iterator, List, NamedTuple, Optional, Tuple
+
+from spider_regras import Baralho, Jogo
+
+MAGICO = b"SPRP"
+VERSAO = 1
+CABECALHO = struct.Struct("<4sHH")
+SEMENTE = struct.Struct("<Q")
+
+ACAO_DISTRIBUIR = 1300
+ACAO_DESFAZER = 1301
+ACAO_REFAZER = 1302
+FIM = 0xFFFF
+
+TAM_BLOCO = 1 << 20
+
+
+class ReplayInvalido(ValueError):
+    pass
+
+
+def codificar_movimento(src: int, qtd: int, dst: int) -> int:
+    return (src * 10 + dst) * 13 + qtd - 1
+
+
+def decodificar_movimento(acao: int) -> Tuple[int, int, int]:
+    par, q = divmod(acao, 13)
+    src, dst = divmod(par, 10)
+    return src, q + 1, dst
+
+
+def _palavras(dados: bytes) -> array:
+    a = array("H")
+    a.frombytes(dados)
+    if sys.byteorder == "big":
+        a.byteswap()
+    return a
+
+
+# ===== GRAVAÇÃO =====
+
+class GravadorReplay:
+    """Anexa partidas a um arquivo de replay.
+
+    ``Jogo.gravador`` aponta para ele; o motor chama ``mover``,
+    ``distribuir``, ``desfazer`` e ``refazer`` depois de cada ação aceita.
+    """
+
+    def __init__(self, caminho: str):
+        novo = not os.path.exists(caminho) or os.path.getsize(caminho) == 0
+        if not novo:
+            with open(caminho, "rb") as f:
+                _ler_cabecalho(f)
+        self.arquivo: BinaryIO = open(caminho, "ab")
+        if novo:
+            self.arquivo.write(CABECALHO.pack(MAGICO, VERSAO, 0))
+        self.acoes = array("H")
+        self.em_partida = False
+
+    def iniciar(self, semente: int):
+        self.terminar()
+        self.arquivo.write(SEMENTE.pack(semente))
+        self.em_partida = True
+
+    def _acao(self, codigo: int):
+        self.acoes.append(codigo)
+        if len(self.acoes) >= 512:
+            self._esvaziar()
+
+    def _esvaziar(self):
+        if sys.byteorder == "big":
+            self.acoes.byteswap()
+        self.arquivo.write(self.acoes.tobytes())
+        del self.acoes[:]
+
+    def mover(self, src: int, qtd: int, dst: int):
+        self._acao(codificar_movimento(src, qtd, dst))
+
+    def distribuir(self):
+        self._acao(ACAO_DISTRIBUIR)
+
+    def desfazer(self):
+        self._acao(ACAO_DESFAZER)
+
+    def refazer(self):
+        self._acao(ACAO_REFAZER)
+
+    def terminar(self):
+        if not self.em_partida:
+            return
+        self._acao(FIM)
+        self._esvaziar()
+        self.arquivo.flush()
+        self.em_partida = False
+
+    def fechar(self):
+        self.terminar()
+        self.arquivo.close()
+
+
+# ===== LEITURA =====
+
+class Replay(NamedTuple):
+    semente: int
+    acoes: array  # códigos u16, sem o FIM
+    completo: bool
+
+
+def _ler_cabecalho(f: BinaryIO):
+    dados = f.read(CABECALHO.size)
+    if len(dados) < CABECALHO.size:
+        raise ReplayInvalido("arquivo de replay sem cabeçalho")
+    magico, versao, _ = CABECALHO.unpack(dados)
+    if magico != MAGICO:
+        raise ReplayInvalido("não é um arquivo de replay")
+    if versao != VERSAO:
+        raise ReplayInvalido(f"versão de replay {versao} não suportada (esperada {VERSAO})")
+
+
+def ler_replays(caminho: str) -> Iterator[Replay]:
+    """Lê as partidas em sequência, um bloco de 1 MiB por vez."""
+    with open(caminho, "rb") as f:
+        _ler_cabecalho(f)
+        buf = array("H")
+        ini = 0
+        fim_arquivo = False
+        while True:
+            # Semente (4 palavras) + pelo menos o FIM
+            while not fim_arquivo and len(buf) - ini < 5:
+                del buf[:ini]
+                ini = 0
+                bloco = f.read(TAM_BLOCO)
+                fim_arquivo = len(bloco) < TAM_BLOCO
+                buf.extend(_palavras(bloco[:len(bloco) & ~1]))
+            if len(buf) - ini < 4:
+                return
+            semente = buf[ini] | buf[ini + 1] << 16 | buf[ini + 2] << 32 | buf[ini + 3] << 48
+            inicio_acoes = ini + 4
+            while True:
+                try:
+                    k = buf.index(FIM, inicio_acoes)
+                except ValueError:
+                    k = -1
+                if k >= 0 or fim_arquivo:
+                    break
+                # Partida continua no próximo bloco
+                del buf[:ini]
+                inicio_acoes -= ini
+                ini = 0
+                bloco = f.read(TAM_BLOCO)
+                fim_arquivo = len(bloco) < TAM_BLOCO
+                buf.extend(_palavras(bloco[:len(bloco) & ~1]))
+            if k < 0:
+                yield Replay(semente, buf[inicio_acoes:], False)
+                return
+            yield Replay(semente, buf[inicio_acoes:k], True)
+            ini = k + 1
+
+
+def ler_replay(caminho: str, indice: int) -> Replay:
+    for k, rep in enumerate(ler_replays(caminho)):
+        if k == indice:
+            return rep
+    raise IndexError(f"{caminho} não tem a partida {indice}")
+
+
+# ===== REPRODUÇÃO =====
+
+def novo_jogo(semente: int) -> Jogo:
+    jogo = Jogo(Baralho(semente=semente))
+    jogo.iniciar_jogo()
+    return jogo
+
+
+def aplicar_acao(jogo: Jogo, codigo: int) -> bool:
+    if codigo < ACAO_DISTRIBUIR:
+        return jogo.mover(*decodificar_movimento(codigo))
+    if codigo == ACAO_DISTRIBUIR:
+        return jogo.distribuir_estoque()
+    if codigo == ACAO_DESFAZER:
+        return jogo.desfazer()
+    if codigo == ACAO_REFAZER:
+        return jogo.refazer()
+    return False
+
+
+def reproduzir(replay: Replay, ate: Optional[int] = None) -> Jogo:
+    """Jogo após as ``ate`` primeiras ações (todas, se None); ação recusada levanta ReplayInvalido."""
+    jogo = novo_jogo(replay.semente)
+    acoes = replay.acoes if ate is None else replay.acoes[:ate]
+    for k, codigo in enumerate(acoes):
+        if not aplicar_acao(jogo, codigo):
+            raise ReplayInvalido(f"semente {replay.semente}: ação {k} ({codigo}) inválida")
+    return jogo
+
+
+def _verificar_lote(lote: List[Replay]) -> Tuple[int, int, int, List[str]]:
+    acoes = vitorias = 0
+    erros = []
+    for rep in lote:
+        try:
+            jogo = reproduzir(rep)
+        except ReplayInvalido as e:
+            erros.append(str(e))
+            continue
+        acoes += len(rep.acoes)
+        vitorias += jogo.verificar_vitoria()
+    return len(lote), acoes, vitorias, erros
+
+
+def _lotes(caminho: str, tamanho: int = 2000) -> Iterator[List[Replay]]:
+    lote = []
+    for rep in ler_replays(caminho):
+        lote.append(rep)
+        if len(lote) >= tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m spider_replay")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    ver = sub.add_parser("verificar", help="reproduz todas as partidas e confere cada ação")
+    ver.add_argument("arquivo")
+    ver.add_argument("--workers", type=int, default=1)
+    mos = sub.add_parser("mostrar", help="lista as ações de uma partida")
+    mos.add_argument("arquivo")
+    mos.add_argument("--jogo", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.comando == "mostrar":
+        rep = ler_replay(args.arquivo, args.jogo)
+        print(f"semente {rep.semente}, {len(rep.acoes)} ações"
+              + ("" if rep.completo else " (incompleta)"))
+        for k, codigo in enumerate(rep.acoes):
+            if codigo < ACAO_DISTRIBUIR:
+                nome = "mover {} {} {}".format(*decodificar_movimento(codigo))
+            else:
+                nome = {ACAO_DISTRIBUIR: "distribuir", ACAO_DESFAZER: "desfazer",
+                        ACAO_REFAZER: "refazer"}.get(codigo, f"? {codigo}")
+            print(f"{k:5d}  {nome}")
+        return 0
+
+    inicio = time.perf_counter()
+    n = acoes = vitorias = 0
+    erros: List[str] = []
+    if args.workers <= 1:
+        resultados = map(_verificar_lote, _lotes(args.arquivo))
+        pool = None
+    else:
+        pool = Pool(args.workers)
+        resultados = pool.imap(_verificar_lote, _lotes(args.arquivo))
+    try:
+        for n_lote, a, v, e in resultados:
+            n += n_lote
+            acoes += a
+            vitorias += v
+            erros.extend(e)
+    finally:
+        if pool is not None:
+            pool.close()
+    segundos = time.perf_counter() - inicio
+
+    for e in erros[:20]:
+        print("INVÁLIDA:", e)
+    print(f"{n} partidas, {acoes} ações em {segundos:.2f}s "
+          f"({n / max(segundos, 1e-9):.0f} partidas/s, {acoes / max(segundos, 1e-9):.0f} ações/s)")
+    print(f"vitórias: {vitorias}, inválidas: {len(erros)}")
+    return 1 if erros else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
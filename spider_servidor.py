@@ -0,0 +1,436 @@
+"""Servidor de partidas sem interface: asyncio, um pedido JSON por linha.
+
+    python -m spider_servidor servir --porta 7777            (ou --unix /tmp/spider.sock)
+    python -m spider_servidor carga --porta 7777 --conexoes 64 --segundos 10
+
+Cada linha recebida é um pedido ``{"id": ..., "op": ..., ...}``; a resposta
+sai numa linha com o mesmo ``id`` e ``"ok": true`` (ou ``false`` e ``"erro"``):
+
+    novo        {"semente"?}                      -> {"sessao", "semente", "estado"}
+    mover       {"sessao", "src", "qtd", "dst"}   -> {"valido", "diff"}
+    distribuir  {"sessao"}                        -> {"valido", "diff"}
+    dica        {"sessao", "busca"?}              -> {"movimento": [src, qtd, dst] | "distribuir" | null}
+    estado      {"sessao"}                        -> {"estado"}
+    fechar      {"sessao"}                        -> {}
+
+O estado traz cada coluna como ``[viradas para baixo, [códigos das visíveis]]``
+(código ``naipe*13 + valor - 1``, como em ``spider_estado``), as cartas no
+estoque, as sequências na fundação e se a partida foi vencida. O ``diff`` é
+igual, mas só com as colunas que mudaram (``[índice, viradas, visíveis]``).
+
+Uma sessão em memória são os bytes de ``EstadoCompacto.chave()`` (uns 200
+bytes). As ociosas há mais de ``ocioso`` segundos, e as mais antigas quando
+passa de ``max_sessoes``, vão para um arquivo no diretório de sessões e
+voltam no próximo pedido; ao encerrar, todas vão para o disco.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing as mp
+import os
+import random
+import re
+import secrets
+import signal
+import struct
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from spider_dica import melhor_movimento_imediato
+from spider_estado import N_CODIGOS, EstadoCompacto
+from spider_regras import Baralho, Jogo
+from spider_solver import DISTRIBUIR, RESOLVIDO, resolver
+
+OCIOSO = 300.0
+MAX_SESSOES = 100_000
+# Dica com busca ("busca": true): roda o solver num processo à parte, com orçamento curto
+LIMITE_NOS_BUSCA = 50_000
+LIMITE_TEMPO_BUSCA = 2.0
+# Despejo em lotes, devolvendo o laço de eventos entre eles
+LOTE_DESPEJO = 256
+
+ARQUIVO_SESSAO = struct.Struct("<QI")  # semente, jogadas; depois os bytes do estado
+_ID_SESSAO = re.compile(r"[0-9a-f]{16}")
+
+
+class ErroPedido(Exception):
+    pass
+
+
+class Sessao:
+    __slots__ = ("dados", "semente", "jogadas", "uso")
+
+    def __init__(self, dados: bytes, semente: int, jogadas: int = 0):
+        self.dados = dados
+        self.semente = semente
+        self.jogadas = jogadas
+        self.uso = time.monotonic()
+
+
+def _inteiro(valor) -> bool:
+    # bool é subclasse de int, mas true/false no JSON não são números
+    return isinstance(valor, int) and not isinstance(valor, bool)
+
+
+def _ler_sessao(dados: bytes) -> Sessao:
+    # Arquivo cortado ou estragado vira erro do pedido, não exceção na conexão
+    try:
+        semente, jogadas = ARQUIVO_SESSAO.unpack_from(dados)
+        chave = dados[ARQUIVO_SESSAO.size:]
+        estado = EstadoCompacto.de_chave(chave)
+    except (struct.error, IndexError):
+        raise ErroPedido("sessão corrompida") from None
+    cartas = [c for p in estado.pilhas for c in p] + list(estado.estoque)
+    if (estado.chave() != chave or any(c >= N_CODIGOS for c in cartas)
+            or any(oc > len(p) for p, oc in zip(estado.pilhas, estado.ocultas))):
+        raise ErroPedido("sessão corrompida")
+    return Sessao(chave, semente, jogadas)
+
+
+def _coluna(estado: EstadoCompacto, i: int) -> list:
+    oc = estado.ocultas[i]
+    return [oc, list(estado.pilhas[i][oc:])]
+
+
+def estado_json(estado: EstadoCompacto) -> dict:
+    return {"colunas": [_coluna(estado, i) for i in range(len(estado.pilhas))],
+            "estoque": len(estado.restante_estoque()),
+            "fundacao": len(estado.fundacao),
+            "vitoria": estado.verificar_vitoria()}
+
+
+def _movimento_json(mov) -> Optional[object]:
+    if mov is None:
+        return None
+    return "distribuir" if mov == DISTRIBUIR else list(mov)
+
+
+def _dica_com_busca(dados: bytes):
+    # Roda no pool de processos: primeiro movimento da solução, ou o melhor de um passo
+    estado = EstadoCompacto.de_chave(dados)
+    res = resolver(estado, LIMITE_NOS_BUSCA, LIMITE_TEMPO_BUSCA)
+    if res.status == RESOLVIDO and res.movimentos:
+        return res.movimentos[0]
+    return melhor_movimento_imediato(estado)
+
+
+class ServidorSpider:
+    """Sessões em memória (LRU) com despejo para ``diretorio``."""
+
+    def __init__(self, diretorio: str = "sessoes", ocioso: float = OCIOSO,
+                 max_sessoes: int = MAX_SESSOES, workers_dica: int = 1):
+        self.diretorio = diretorio
+        self.ocioso = ocioso
+        self.max_sessoes = max_sessoes
+        self.workers_dica = workers_dica
+        # Da menos para a mais recentemente usada
+        self.sessoes: "OrderedDict[str, Sessao]" = OrderedDict()
+        self.pedidos = 0
+        self.despejadas = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        os.makedirs(diretorio, exist_ok=True)
+        self._ops = {"novo": self._novo, "mover": self._mover, "distribuir": self._distribuir,
+                     "estado": self._estado, "fechar": self._fechar}
+
+    # ----- sessões -----
+    def _arquivo(self, sid: str) -> str:
+        return os.path.join(self.diretorio, sid + ".ses")
+
+    def _sessao(self, pedido: dict) -> Sessao:
+        sid = pedido.get("sessao")
+        if not isinstance(sid, str) or not _ID_SESSAO.fullmatch(sid):
+            raise ErroPedido("sessão inválida")
+        s = self.sessoes.get(sid)
+        if s is not None:
+            self.sessoes.move_to_end(sid)
+        else:
+            s = self._carregar(sid)
+        s.uso = time.monotonic()
+        return s
+
+    def _carregar(self, sid: str) -> Sessao:
+        caminho = self._arquivo(sid)
+        try:
+            with open(caminho, "rb") as f:
+                dados = f.read()
+        except FileNotFoundError:
+            raise ErroPedido("sessão inexistente") from None
+        s = _ler_sessao(dados)
+        self._guardar(sid, s)
+        os.remove(caminho)
+        return s
+
+    def _guardar(self, sid: str, s: Sessao):
+        # Abre espaço antes de entrar: se o despejo falhar, o pedido falha sem deixar sessão órfã
+        while self.sessoes and len(self.sessoes) >= self.max_sessoes:
+            self._despejar_uma()
+        self.sessoes[sid] = s
+
+    def _despejar_uma(self):
+        # Só sai da memória depois de gravada: se o disco falhar, a sessão fica
+        sid, s = next(iter(self.sessoes.items()))
+        temp = self._arquivo(sid) + ".tmp"
+        with open(temp, "wb") as f:
+            f.write(ARQUIVO_SESSAO.pack(s.semente, s.jogadas))
+            f.write(s.dados)
+        os.replace(temp, self._arquivo(sid))
+        del self.sessoes[sid]
+        self.despejadas += 1
+
+    async def despejar_ociosas(self):
+        limite = time.monotonic() - self.ocioso
+        n = 0
+        while self.sessoes and next(iter(self.sessoes.values())).uso < limite:
+            self._despejar_uma()
+            n += 1
+            if n % LOTE_DESPEJO == 0:
+                await asyncio.sleep(0)
+
+    def despejar_todas(self):
+        while self.sessoes:
+            self._despejar_uma()
+
+    async def _laco_despejo(self):
+        while True:
+            await asyncio.sleep(max(1.0, self.ocioso / 4))
+            try:
+                await self.despejar_ociosas()
+            except OSError as e:
+                print(f"despejo falhou: {e}", file=sys.stderr)
+
+    # ----- operações -----
+    def _novo(self, pedido: dict) -> dict:
+        semente = pedido.get("semente")
+        if semente is None:
+            semente = random.getrandbits(64)
+        elif not _inteiro(semente) or not 0 <= semente < 1 << 64:
+            raise ErroPedido("semente deve ser um inteiro de 64 bits")
+        jogo = Jogo(Baralho(semente=semente))
+        jogo.iniciar_jogo()
+        estado = EstadoCompacto.de_jogo(jogo)
+        sid = secrets.token_hex(8)
+        while sid in self.sessoes or os.path.exists(self._arquivo(sid)):
+            sid = secrets.token_hex(8)
+        self._guardar(sid, Sessao(estado.chave(), semente))
+        return {"sessao": sid, "semente": semente, "estado": estado_json(estado)}
+
+    def _jogar(self, s: Sessao, estado: EstadoCompacto, valido: bool, colunas) -> dict:
+        if not valido:
+            return {"valido": False, "diff": {}}
+        s.dados = estado.chave()
+        s.jogadas += 1
+        return {"valido": True, "diff": {
+            "colunas": [[i] + _coluna(estado, i) for i in colunas],
+            "estoque": len(estado.restante_estoque()),
+            "fundacao": len(estado.fundacao),
+            "vitoria": estado.verificar_vitoria()}}
+
+    def _mover(self, pedido: dict) -> dict:
+        s = self._sessao(pedido)
+        src, qtd, dst = (pedido.get(k) for k in ("src", "qtd", "dst"))
+        if not (_inteiro(src) and _inteiro(qtd) and _inteiro(dst)):
+            raise ErroPedido("mover precisa de src, qtd e dst inteiros")
+        estado = EstadoCompacto.de_chave(s.dados)
+        return self._jogar(s, estado, estado.mover(src, qtd, dst), sorted({src, dst}))
+
+    def _distribuir(self, pedido: dict) -> dict:
+        s = self._sessao(pedido)
+        estado = EstadoCompacto.de_chave(s.dados)
+        return self._jogar(s, estado, estado.distribuir_estoque(), range(len(estado.pilhas)))
+
+    def _estado(self, pedido: dict) -> dict:
+        s = self._sessao(pedido)
+        return {"estado": estado_json(EstadoCompacto.de_chave(s.dados)), "jogadas": s.jogadas}
+
+    def _fechar(self, pedido: dict) -> dict:
+        self._sessao(pedido)
+        del self.sessoes[pedido["sessao"]]
+        return {}
+
+    async def _dica(self, pedido: dict) -> dict:
+        s = self._sessao(pedido)
+        if not pedido.get("busca"):
+            return {"movimento": _movimento_json(melhor_movimento_imediato(EstadoCompacto.de_chave(s.dados)))}
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers_dica, mp_context=mp.get_context("spawn"))
+        mov = await asyncio.get_running_loop().run_in_executor(self._pool, _dica_com_busca, s.dados)
+        return {"movimento": _movimento_json(mov)}
+
+    async def responder(self, linha: bytes) -> bytes:
+        self.pedidos += 1
+        ident = None
+        try:
+            try:
+                pedido = json.loads(linha)
+            except ValueError:  # JSONDecodeError e UnicodeDecodeError
+                raise ErroPedido("JSON inválido") from None
+            if not isinstance(pedido, dict):
+                raise ErroPedido("pedido deve ser um objeto JSON")
+            ident = pedido.get("id")
+            op = pedido.get("op")
+            if not isinstance(op, str):
+                raise ErroPedido("op deve ser uma string")
+            if op == "dica":
+                resposta = await self._dica(pedido)
+            elif op in self._ops:
+                resposta = self._ops[op](pedido)
+            else:
+                raise ErroPedido(f"operação desconhecida: {op!r}")
+            resposta["ok"] = True
+        except ErroPedido as e:
+            resposta = {"ok": False, "erro": str(e)}
+        except Exception as e:
+            # Falha inesperada (ex.: disco ao despejar) responde o pedido e mantém a conexão
+            resposta = {"ok": False, "erro": f"erro interno: {type(e).__name__}: {e}"}
+        resposta["id"] = ident
+        return json.dumps(resposta, separators=(",", ":")).encode() + b"\n"
+
+    # ----- rede -----
+    async def _conexao(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    linha = await reader.readline()
+                except ValueError:
+                    # Linha maior que o limite do StreamReader: não dá para ressincronizar
+                    writer.write(b'{"ok":false,"erro":"linha longa demais","id":null}\n')
+                    break
+                if not linha:
+                    break
+                writer.write(await self.responder(linha))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def servir(self, host: str = "127.0.0.1", porta: int = 7777, unix: Optional[str] = None):
+        if unix:
+            servidor = await asyncio.start_unix_server(self._conexao, path=unix)
+        else:
+            servidor = await asyncio.start_server(self._conexao, host, porta)
+        parar = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sinal in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sinal, parar.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows / fora da thread principal: Ctrl+C interrompe o asyncio.run
+        despejo = asyncio.create_task(self._laco_despejo())
+        print(f"servindo em {unix or f'{host}:{porta}'}", file=sys.stderr)
+        try:
+            async with servidor:
+                await parar.wait()
+        finally:
+            despejo.cancel()
+            self.despejar_todas()
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+            if unix and os.path.exists(unix):
+                os.remove(unix)
+
+
+# ===== GERADOR DE CARGA =====
+
+def percentil(valores: List[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+async def _cliente_carga(host: str, porta: int, unix: Optional[str], fim: float,
+                         latencias: List[float], erros: Dict[str, int], semente: int):
+    # Um jogador sem pausa: pede dica, joga o que ela sugere, às vezes consulta o estado
+    if unix:
+        reader, writer = await asyncio.open_unix_connection(unix)
+    else:
+        reader, writer = await asyncio.open_connection(host, porta)
+    rng = random.Random(semente)
+
+    async def pedir(pedido: dict) -> dict:
+        t = time.perf_counter()
+        writer.write(json.dumps(pedido, separators=(",", ":")).encode() + b"\n")
+        await writer.drain()
+        resposta = json.loads(await reader.readline())
+        latencias.append(time.perf_counter() - t)
+        if not resposta.get("ok"):
+            erros[resposta.get("erro", "?")] = erros.get(resposta.get("erro", "?"), 0) + 1
+        return resposta
+
+    try:
+        sid = (await pedir({"op": "novo", "semente": rng.getrandbits(32)}))["sessao"]
+        while time.perf_counter() < fim:
+            mov = (await pedir({"op": "dica", "sessao": sid})).get("movimento")
+            if mov is None:
+                await pedir({"op": "fechar", "sessao": sid})
+                sid = (await pedir({"op": "novo", "semente": rng.getrandbits(32)}))["sessao"]
+            elif mov == "distribuir":
+                await pedir({"op": "distribuir", "sessao": sid})
+            else:
+                await pedir({"op": "mover", "sessao": sid, "src": mov[0], "qtd": mov[1], "dst": mov[2]})
+            if rng.random() < 0.1:
+                await pedir({"op": "estado", "sessao": sid})
+    finally:
+        writer.close()
+
+
+async def carga(host: str = "127.0.0.1", porta: int = 7777, unix: Optional[str] = None,
+                conexoes: int = 64, segundos: float = 10.0) -> dict:
+    """Mede pedidos/s e latências com ``conexoes`` clientes simultâneos, um pedido por vez cada."""
+    latencias: List[float] = []
+    erros: Dict[str, int] = {}
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_cliente_carga(host, porta, unix, inicio + segundos, latencias, erros, k)
+                           for k in range(conexoes)))
+    duracao = time.perf_counter() - inicio
+    return {"pedidos": len(latencias), "pedidos_s": len(latencias) / duracao,
+            "p50_ms": percentil(latencias, 50) * 1000, "p99_ms": percentil(latencias, 99) * 1000,
+            "max_ms": max(latencias, default=0.0) * 1000, "erros": erros}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m spider_servidor")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    for nome, ajuda in (("servir", "atende partidas no socket"),
+                        ("carga", "gera carga contra um servidor local e mede")):
+        p = sub.add_parser(nome, help=ajuda)
+        p.add_argument("--host", default="127.0.0.1")
+        p.add_argument("--porta", type=int, default=7777)
+        p.add_argument("--unix", metavar="CAMINHO", help="socket Unix em vez de TCP")
+    ser = sub.choices["servir"]
+    ser.add_argument("--sessoes", default="sessoes", help="diretório das sessões despejadas")
+    ser.add_argument("--ocioso", type=float, default=OCIOSO,
+                     help="segundos sem pedidos até a sessão ir para o disco")
+    ser.add_argument("--max-sessoes", type=int, default=MAX_SESSOES)
+    ser.add_argument("--workers-dica", type=int, default=1,
+                     help="processos para dicas com busca")
+    car = sub.choices["carga"]
+    car.add_argument("--conexoes", type=int, default=64)
+    car.add_argument("--segundos", type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    if args.comando == "servir":
+        servidor = ServidorSpider(args.sessoes, args.ocioso, args.max_sessoes, args.workers_dica)
+        try:
+            asyncio.run(servidor.servir(args.host, args.porta, args.unix))
+        except KeyboardInterrupt:
+            pass
+        print(f"{servidor.pedidos} pedidos; {servidor.despejadas} despejos para {args.sessoes}",
+              file=sys.stderr)
+        return 0
+
+    r = asyncio.run(carga(args.host, args.porta, args.unix, args.conexoes, args.segundos))
+    print(f"{r['pedidos']} pedidos em {args.segundos:g}s com {args.conexoes} conexões: "
+          f"{r['pedidos_s']:.0f} pedidos/s | p50 {r['p50_ms']:.2f} ms | p99 {r['p99_ms']:.2f} ms | "
+          f"máx {r['max_ms']:.2f} ms")
+    for erro, n in sorted(r["erros"].items()):
+        print(f"erro {erro!r}: {n}")
+    return 1 if r["erros"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,274 @@
+"""Simulação em lote de partidas do Spider, sem interface.
+
+Uso:
+    python -m spider_simulador simular --jogos 10000 --workers 8 --politica gulosa \
+        --saida resultados.jsonl
+
+Cada partida usa a semente ``--semente-inicial + i``, então qualquer resultado
+pode ser reproduzido isoladamente. Os resultados são gravados conforme chegam
+(CSV ou JSONL, pela extensão do arquivo) e ao final são mostrados jogos/s e o
+intervalo de confiança da taxa de vitória.
+"""
+import argparse
+import csv
+import json
+import math
+import sys
+import time
+from multiprocessing import Pool
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from spider_regras import Baralho, Jogo
+
+Movimento = Tuple[int, int, int]
+
+# Teto de jogadas por partida e de jogadas seguidas sem progresso (carta revelada,
+# K→A completado ou distribuição): políticas simples podem ficar só trocando
+# blocos, e depois desse tanto a partida distribui (ou acaba, sem estoque)
+LIMITE_JOGADAS = 2000
+LIMITE_SEM_PROGRESSO = 500
+
+CAMPOS = ("semente", "politica", "vitoria", "jogadas", "distribuicoes", "fundacao", "segundos")
+
+
+def novo_jogo(semente: int) -> Jogo:
+    jogo = Jogo(Baralho(semente=semente))
+    jogo.iniciar_jogo()
+    return jogo
+
+
+# ===== POLÍTICAS =====
+# Recebem o jogo e as posições já visitadas (hash Zobrist); devolvem um
+# movimento ou None (None = distribuir o estoque, ocupando antes as colunas
+# vazias, ou parar se não houver estoque)
+
+def _inutil(jogo: Jogo, mov: Movimento) -> bool:
+    # Coluna inteira para uma coluna vazia: só troca as colunas de lugar
+    src, qtd, dst = mov
+    return qtd == len(jogo.tableau[src].cartas) and jogo.tableau[dst].esta_vazia()
+
+
+def politica_dica(jogo: Jogo, visitadas: set) -> Optional[Movimento]:
+    # A mesma ordem da dica do botão (primeiro movimento por coluna), pulando
+    # os que voltam a uma posição já vista; movimento que só perde (parte
+    # sequência, gasta coluna vazia) fica para quando não der para distribuir
+    reserva = None
+    for mov in sorted(jogo.movimentos_validos()):
+        if _inutil(jogo, mov) or (reserva is not None and pontuar(jogo, mov) < 0):
+            continue
+        if _repete(jogo, mov, visitadas):
+            continue
+        if pontuar(jogo, mov) >= 0:
+            return mov
+        reserva = mov
+    return None if jogo.estoque.restante() else reserva
+
+
+def pontuar(jogo: Jogo, mov: Movimento) -> int:
+    src, qtd, dst = mov
+    origem = jogo.tableau[src]
+    destino = jogo.tableau[dst]
+    visiveis = len(origem.cartas) - origem._indice_inicio_bloco_visivel()
+    sequencia = origem.tamanho_sequencia_topo()
+    pontos = 0
+    if qtd == visiveis and visiveis < len(origem.cartas):
+        pontos += 50  # revela carta
+    if destino.esta_vazia():
+        # Coluna vazia é o recurso mais caro: gastá-la só compensa revelando carta
+        pontos -= 30 if qtd < sequencia else 10
+    else:
+        if qtd == len(origem.cartas):
+            pontos += 40  # esvazia coluna
+        juntas = destino.tamanho_sequencia_topo() + qtd
+        if qtd < sequencia:
+            # Parte uma sequência: só vale se a que se forma no destino for maior
+            pontos += juntas - sequencia if juntas > sequencia else -20
+        else:
+            pontos += 10 + qtd
+        if juntas >= 13:
+            pontos += 100  # completa K→A
+    return pontos
+
+
+def politica_gulosa(jogo: Jogo, visitadas: set) -> Optional[Movimento]:
+    # Do melhor para o pior (empate fica com a ordem das colunas): só os
+    # primeiros costumam precisar da checagem de repetição, que joga e desfaz
+    candidatos = sorted((-pontuar(jogo, mov), mov) for mov in jogo.movimentos_validos()
+                        if not _inutil(jogo, mov))
+    for negativo, mov in candidatos:
+        if _repete(jogo, mov, visitadas):
+            continue
+        # Movimento sem ganho: melhor distribuir, se ainda houver estoque
+        if negativo > 0 and jogo.estoque.restante():
+            return None
+        return mov
+    return None
+
+
+def _repete(jogo: Jogo, mov: Movimento, visitadas: set) -> bool:
+    jogada = jogo.jogar(*mov)
+    h = jogo.hash_zobrist
+    jogo.reverter(jogada)
+    return h in visitadas
+
+
+def _progresso(jogo: Jogo) -> Tuple[int, int, int]:
+    ocultas = sum(p._indice_inicio_bloco_visivel() for p in jogo.tableau)
+    return ocultas, len(jogo.fundacao), jogo.estoque.restante()
+
+
+def _preencher_vazia(jogo: Jogo) -> Optional[Movimento]:
+    # Distribuir exige todas as colunas ocupadas: a carta do topo da coluna
+    # mais alta vai para uma vazia
+    vazias = [i for i, p in enumerate(jogo.tableau) if p.esta_vazia()]
+    origens = [i for i, p in enumerate(jogo.tableau) if len(p.cartas) > 1]
+    if not vazias or not origens:
+        return None
+    return max(origens, key=lambda i: len(jogo.tableau[i].cartas)), 1, vazias[0]
+
+
+def jogar_com_politica(jogo: Jogo, politica: Callable) -> Dict:
+    jogadas = 0
+    distribuicoes = 0
+    sem_progresso = 0
+    progresso = _progresso(jogo)
+    visitadas = {jogo.hash_zobrist}
+    while not jogo.verificar_vitoria() and jogadas < LIMITE_JOGADAS:
+        # Rodando em falso há muito tempo: distribui, se der, em vez de desistir
+        mov = politica(jogo, visitadas) if sem_progresso < LIMITE_SEM_PROGRESSO else None
+        if mov is None and jogo.estoque.restante() and not jogo.pode_distribuir():
+            mov = _preencher_vazia(jogo)
+        if mov is not None:
+            jogo.mover(*mov)
+        elif jogo.distribuir_estoque():
+            distribuicoes += 1
+        else:
+            break
+        jogadas += 1
+        visitadas.add(jogo.hash_zobrist)
+        atual = _progresso(jogo)
+        sem_progresso = sem_progresso + 1 if atual == progresso else 0
+        progresso = atual
+    return {"jogadas": jogadas, "distribuicoes": distribuicoes}
+
+
+def jogar_com_solver(jogo: Jogo) -> Dict:
+    from spider_solver import DISTRIBUIR, resolver
+
+    res = resolver(jogo)
+    if not res.resolvido:
+        return {"jogadas": 0, "distribuicoes": 0}
+    for mov in res.movimentos:
+        if mov == DISTRIBUIR:
+            jogo.distribuir_estoque()
+        else:
+            jogo.mover(*mov)
+    return {"jogadas": len(res.movimentos),
+            "distribuicoes": sum(1 for m in res.movimentos if m == DISTRIBUIR)}
+
+
+POLITICAS = {
+    "dica": politica_dica,
+    "gulosa": politica_gulosa,
+    "solver": None,
+}
+
+
+def simular_partida(args: Tuple[int, str]) -> Dict:
+    semente, politica = args
+    inicio = time.perf_counter()
+    jogo = novo_jogo(semente)
+    if politica == "solver":
+        stats = jogar_com_solver(jogo)
+    else:
+        stats = jogar_com_politica(jogo, POLITICAS[politica])
+    return {
+        "semente": semente,
+        "politica": politica,
+        "vitoria": jogo.verificar_vitoria(),
+        "jogadas": stats["jogadas"],
+        "distribuicoes": stats["distribuicoes"],
+        "fundacao": len(jogo.fundacao),
+        "segundos": round(time.perf_counter() - inicio, 6),
+    }
+
+
+def simular(jogos: int, workers: int = 1, politica: str = "gulosa",
+            semente_inicial: int = 0) -> Iterator[Dict]:
+    """Gera os resultados das partidas conforme terminam (ordem não garantida com workers > 1)."""
+    tarefas = ((semente_inicial + i, politica) for i in range(jogos))
+    if workers <= 1:
+        for t in tarefas:
+            yield simular_partida(t)
+        return
+    with Pool(workers) as pool:
+        yield from pool.imap_unordered(simular_partida, tarefas, chunksize=16)
+
+
+def intervalo_wilson(vitorias: int, n: int, z: float = 1.96) -> Tuple[float, float]:
+    if n == 0:
+        return 0.0, 0.0
+    p = vitorias / n
+    den = 1 + z * z / n
+    centro = (p + z * z / (2 * n)) / den
+    margem = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / den
+    # Sem o corte, 0 ou n vitórias dão "-0.00%" ou 100.00...1% por arredondamento
+    return max(0.0, centro - margem), min(1.0, centro + margem)
+
+
+class GravadorResultados:
+    # Escreve uma linha por partida (CSV ou JSONL, pela extensão)
+    def __init__(self, caminho: Optional[str]):
+        self.arquivo = open(caminho, "w", newline="", encoding="utf-8") if caminho else None
+        self.csv = None
+        if self.arquivo and caminho.endswith(".csv"):
+            self.csv = csv.DictWriter(self.arquivo, fieldnames=CAMPOS)
+            self.csv.writeheader()
+
+    def gravar(self, resultado: Dict):
+        if self.arquivo is None:
+            return
+        if self.csv is not None:
+            self.csv.writerow(resultado)
+        else:
+            self.arquivo.write(json.dumps(resultado) + "\n")
+
+    def fechar(self):
+        if self.arquivo is not None:
+            self.arquivo.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m spider_simulador")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    sim = sub.add_parser("simular", help="joga partidas sem interface e mede a taxa de vitória")
+    sim.add_argument("--jogos", type=int, default=1000)
+    sim.add_argument("--workers", type=int, default=1)
+    sim.add_argument("--politica", choices=sorted(POLITICAS), default="gulosa")
+    sim.add_argument("--semente-inicial", type=int, default=0)
+    sim.add_argument("--saida", help="arquivo .csv ou .jsonl com um resultado por partida")
+    args = parser.parse_args(argv)
+
+    gravador = GravadorResultados(args.saida)
+    inicio = time.perf_counter()
+    n = vitorias = jogadas = 0
+    try:
+        for r in simular(args.jogos, args.workers, args.politica, args.semente_inicial):
+            gravador.gravar(r)
+            n += 1
+            vitorias += r["vitoria"]
+            jogadas += r["jogadas"]
+    finally:
+        gravador.fechar()
+    segundos = time.perf_counter() - inicio
+
+    baixo, alto = intervalo_wilson(vitorias, n)
+    print(f"{n} jogos em {segundos:.2f}s ({n / segundos:.1f} jogos/s)")
+    print(f"vitórias: {vitorias}/{n} = {100 * vitorias / max(n, 1):.2f}% "
+          f"(IC95% {100 * baixo:.2f}%–{100 * alto:.2f}%)")
+    print(f"jogadas por partida: {jogadas / max(n, 1):.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
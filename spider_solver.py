@@ -0,0 +1,233 @@
+"""Solver do Spider: busca em profundidade ordenada com tabela de transposição.
+
+O solver enxerga o estado completo (cartas viradas e ordem do estoque), então
+responde se a distribuição ainda pode ser vencida a partir da posição atual.
+Trabalha sobre ``EstadoCompacto`` e nunca altera o ``Jogo`` recebido.
+"""
+import time
+from typing import Callable, List, Optional, Tuple
+
+from spider_estado import N_PILHAS, EstadoCompacto
+from spider_regras import Jogo
+
+# Movimento de distribuição do estoque na lista de jogadas do solver
+DISTRIBUIR = (-1, 0, -1)
+
+RESOLVIDO = "resolvido"
+INSOLUVEL = "insoluvel"
+DESCONHECIDO = "desconhecido"
+
+Movimento = Tuple[int, int, int]
+
+
+class Resultado:
+    def __init__(self, status: str, movimentos: Optional[List[Movimento]],
+                 nos: int, segundos: float):
+        self.status = status
+        # Sequência vencedora (src, qtd, dst) / DISTRIBUIR, ou None se não resolvido
+        self.movimentos = movimentos
+        self.nos = nos
+        self.segundos = segundos
+
+    @property
+    def resolvido(self) -> bool:
+        return self.status == RESOLVIDO
+
+    def __repr__(self):
+        n = len(self.movimentos) if self.movimentos is not None else "-"
+        return (f"Resultado({self.status}, movimentos={n}, nos={self.nos}, "
+                f"segundos={self.segundos:.3f})")
+
+
+def avaliar(estado: EstadoCompacto) -> int:
+    # Maior é melhor: fundação, cartas reveladas, sequências encaixadas e colunas vazias
+    pontos = 1000 * len(estado.fundacao)
+    for cods, oc in zip(estado.pilhas, estado.ocultas):
+        if not cods:
+            pontos += 40
+            continue
+        pontos -= 25 * oc
+        for k in range(oc + 1, len(cods)):
+            a, b = cods[k - 1], cods[k]
+            if a == b + 1 and a // 13 == b // 13:
+                pontos += 10
+            else:
+                pontos -= 5
+    # Cartas ainda no estoque contam contra, para preferir jogar antes de distribuir
+    pontos -= 2 * (len(estado.estoque) - estado.pos_estoque)
+    return pontos
+
+
+def gerar_movimentos(estado: EstadoCompacto, anterior: Optional[Movimento] = None,
+                     completo: bool = True) -> List[Movimento]:
+    """Movimentos úteis a partir de ``estado``, mais promissores primeiro.
+
+    Sem estoque, colunas vazias são simétricas (só a primeira é usada como
+    destino) e mover uma pilha inteira para uma coluna vazia é descartado; com
+    estoque a posição da coluna conta (a carta k da distribuição vai para a
+    coluna k), então nada disso é podado. Desfazer ``anterior`` também é
+    descartado (passe None se ele revelou carta: aí não é reversão).
+    Com ``completo=False`` ficam de fora os movimentos que partem uma
+    sequência ao meio e as colunas são tratadas como simétricas mesmo com
+    estoque, o que encolhe muito a busca mas pode perder soluções.
+    """
+    pilhas = estado.pilhas
+    ocultas = estado.ocultas
+    simetrica = not completo or estado.pos_estoque == len(estado.estoque)
+    vazias = [j for j in range(N_PILHAS) if not pilhas[j]]
+    if simetrica:
+        vazias = vazias[:1]
+    candidatos = []
+
+    for i in range(N_PILHAS):
+        seq = estado.tamanho_sequencia_topo(i)
+        if seq == 0:
+            continue
+        origem = pilhas[i]
+        n = len(origem)
+        for qtd in range(1 if completo else seq, seq + 1):
+            base = origem[n - qtd]
+            revela = qtd == n - ocultas[i] and ocultas[i] > 0
+            esvazia = qtd == n
+            for j in range(N_PILHAS):
+                if j == i:
+                    continue
+                destino = pilhas[j]
+                if not destino:
+                    continue
+                topo = destino[-1]
+                if topo != base + 1 or topo // 13 != base // 13 or ocultas[j] == len(destino):
+                    continue
+                if anterior == (j, qtd, i):
+                    continue
+                # Continua sequência na origem? Então é movimento lateral (pouco útil)
+                lateral = qtd < seq
+                prioridade = 0
+                if revela:
+                    prioridade += 50
+                if esvazia:
+                    prioridade += 40
+                if not lateral:
+                    prioridade += 10 + qtd
+                else:
+                    prioridade -= 20
+                candidatos.append((prioridade, (i, qtd, j)))
+            if esvazia and simetrica:
+                continue
+            for vazia in vazias:
+                if anterior == (vazia, qtd, i):
+                    continue
+                # Coluna vazia: preferir a sequência inteira, sobretudo se revelar carta
+                if esvazia:
+                    prioridade = -40
+                elif qtd == seq:
+                    prioridade = 30 if revela else -10
+                else:
+                    prioridade = -30
+                candidatos.append((prioridade, (i, qtd, vazia)))
+
+    if not vazias and len(estado.estoque) - estado.pos_estoque >= N_PILHAS:
+        candidatos.append((-50, DISTRIBUIR))
+
+    candidatos.sort(key=lambda c: -c[0])
+    return [m for _, m in candidatos]
+
+
+def aplicar(estado: EstadoCompacto, mov: Movimento) -> bool:
+    if mov == DISTRIBUIR:
+        return estado.distribuir_estoque()
+    return estado.mover(*mov)
+
+
+def _filhos(estado: EstadoCompacto, anterior: Optional[Movimento], completo: bool, vistos):
+    # Gera e avalia os filhos ainda não vistos, do mais promissor para o menos
+    filhos = []
+    for mov in gerar_movimentos(estado, anterior, completo):
+        filho = estado.copia()
+        if not aplicar(filho, mov):
+            continue
+        chave = filho.hash_canonico(not completo)
+        if chave in vistos:
+            continue
+        filhos.append((avaliar(filho), mov, filho, chave))
+    filhos.sort(key=lambda f: -f[0])
+    return iter(filhos)
+
+
+def _buscar(raiz: EstadoCompacto, completo: bool, limite_nos: int, prazo: float,
+            parar: Optional[Callable[[], bool]] = None,
+            ao_melhorar: Optional[Callable[[Movimento, int], None]] = None):
+    """DFS com filhos ordenados por ``avaliar`` e tabela de transposição.
+
+    ``parar`` é consultado a cada 256 nós (True interrompe como ``desconhecido``);
+    ``ao_melhorar(primeiro_movimento, pontos)`` é chamado quando aparece um nó
+    melhor avaliado que todos os anteriores. Retorna (status, movimentos, nós expandidos).
+    """
+    vistos = {raiz.hash_canonico()}
+    pilha = [(raiz, _filhos(raiz, None, completo, vistos))]
+    caminho: List[Movimento] = []
+    nos = 0
+    melhor = avaliar(raiz)
+    while pilha:
+        if nos >= limite_nos or time.perf_counter() > prazo:
+            return DESCONHECIDO, None, nos
+        if parar is not None and nos % 256 == 0 and parar():
+            return DESCONHECIDO, None, nos
+        estado, filhos = pilha[-1]
+        for pontos, mov, filho, chave in filhos:
+            # Pode ter sido alcançado por outro ramo depois que esta lista foi gerada
+            if chave in vistos:
+                continue
+            vistos.add(chave)
+            nos += 1
+            caminho.append(mov)
+            if filho.verificar_vitoria():
+                return RESOLVIDO, caminho, nos
+            if ao_melhorar is not None and pontos > melhor:
+                melhor = pontos
+                ao_melhorar(caminho[0], pontos)
+            # Movimento que revelou carta não tem volta: não há reversão a podar
+            revelou = mov != DISTRIBUIR and filho.ocultas[mov[0]] < estado.ocultas[mov[0]]
+            pilha.append((filho, _filhos(filho, None if revelou else mov, completo, vistos)))
+            break
+        else:
+            pilha.pop()
+            if caminho:
+                caminho.pop()
+    return INSOLUVEL, None, nos
+
+
+def resolver(jogo, limite_nos: int = 200_000, limite_tempo: float = 10.0,
+             parar: Optional[Callable[[], bool]] = None,
+             ao_melhorar: Optional[Callable[[Movimento, int], None]] = None) -> Resultado:
+    """Procura uma sequência vencedora a partir de ``jogo`` (``Jogo`` ou ``EstadoCompacto``).
+
+    Primeiro tenta só movimentos que não partem sequências (metade do
+    orçamento); se não achar, repete com todos os movimentos. Retorna
+    ``Resultado`` com status ``resolvido`` (e os movimentos), ``insoluvel``
+    (busca completa esgotada) ou ``desconhecido`` (limite de nós/tempo ou
+    ``parar()``). ``parar`` e ``ao_melhorar`` são repassados à busca.
+    """
+    inicio = time.perf_counter()
+    prazo = inicio + limite_tempo
+    raiz = jogo.copia() if isinstance(jogo, EstadoCompacto) else EstadoCompacto.de_jogo(jogo)
+    if raiz.verificar_vitoria():
+        return Resultado(RESOLVIDO, [], 0, 0.0)
+
+    status, movs, nos = _buscar(raiz, False, limite_nos // 2, inicio + limite_tempo / 2,
+                                parar, ao_melhorar)
+    if status != RESOLVIDO:
+        if parar is not None and parar():
+            # Só a busca completa prova "insoluvel"; cancelada antes dela, não se sabe
+            return Resultado(DESCONHECIDO, [], nos, time.perf_counter() - inicio)
+        status, movs, nos_completo = _buscar(raiz, True, limite_nos - nos, prazo,
+                                             parar, ao_melhorar)
+        nos += nos_completo
+    return Resultado(status, movs, nos, time.perf_counter() - inicio)
+
+
+def aplicar_no_jogo(jogo: Jogo, mov: Movimento) -> bool:
+    # Executa um movimento do solver no motor de objetos (ex.: para a interface)
+    if mov == DISTRIBUIR:
+        return jogo.distribuir_estoque()
+    return jogo.mover(*mov)
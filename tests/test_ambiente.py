@@ -0,0 +1,27 @@
+import numpy as np
+
+from spider_ambiente import AmbienteSpider, AmbientesParalelos
+
+
+def test_observacao_final_sobrevive_ao_reinicio_automatico():
+    sementes = [11, 12, 13]
+    referencia = [AmbienteSpider(limite_passos=3) for _ in sementes]
+    for amb, s in zip(referencia, sementes):
+        amb.reset(s)
+    with AmbientesParalelos(len(sementes), processos=2, limite_passos=3) as vec:
+        vec.reset(sementes)
+        for passo in range(3):
+            acoes = [int(np.flatnonzero(m)[0]) for m in vec.legal_action_mask()]
+            esperadas = [amb.step(a) for amb, a in zip(referencia, acoes)]
+            _, _, terminou, truncou, info = vec.step(acoes)
+            if passo < 2:
+                assert not info["_final_observation"].any()
+                assert all(o is None for o in info["final_observation"])
+        assert (terminou | truncou).all()
+        assert info["_final_observation"].all()
+        assert sorted(info["sementes_finalizadas"].items()) == list(enumerate(sementes))
+        for i, (obs, *_) in enumerate(esperadas):
+            assert np.array_equal(info["final_observation"][i], obs)
+            # vec.obs já é da partida nova
+            assert not np.array_equal(vec.obs[i], obs)
+            assert vec.obs[i, 10, 0] == 50
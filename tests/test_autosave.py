@@ -0,0 +1,116 @@
+import os
+import random
+import signal
+import subprocess
+import sys
+
+import spider_autosave
+from spider_autosave import ARQUIVO_INSTANTANEO, ARQUIVO_REGISTRO, Autosave, recuperar
+from spider_estado import EstadoCompacto
+from spider_regras import Baralho, Jogo
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def jogar(jogo, rng, n, depois=lambda: None):
+    # Joga até ``n`` ações aceitas, avisando ``depois`` a cada uma
+    feitas = 0
+    while feitas < n:
+        movs = sorted(jogo.movimentos_validos())
+        sorteio = rng.random()
+        if sorteio < 0.1:
+            ok = jogo.desfazer()
+        elif sorteio < 0.15:
+            ok = jogo.refazer()
+        elif movs and sorteio < 0.95:
+            ok = jogo.mover(*rng.choice(movs))
+        else:
+            ok = jogo.distribuir_estoque()
+        if ok:
+            feitas += 1
+            depois()
+
+
+def _chave(jogo):
+    return EstadoCompacto.de_jogo(jogo).chave().hex()
+
+
+def test_recupera_depois_de_matar_o_processo_no_meio_do_registro(tmp_path):
+    # O filho grava 250 ações (instantâneos em 100 e 200), espera a thread, anota
+    # as posições seguintes enquanto joga mais e morre com SIGKILL sem esvaziar
+    roteiro = f"""
+import os, random, signal, sys
+sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r})
+from test_autosave import jogar
+from spider_autosave import Autosave
+from spider_estado import EstadoCompacto
+from spider_regras import Baralho, Jogo
+
+salvamento = Autosave({str(tmp_path)!r}, intervalo=0.001)
+jogo = Jogo(Baralho(semente=3))
+jogo.iniciar_jogo()
+salvamento.iniciar(jogo)
+rng = random.Random(3)
+jogar(jogo, rng, 250)
+salvamento.esvaziar()
+anotar = lambda: print(EstadoCompacto.de_jogo(jogo).chave().hex(), flush=True)
+anotar()
+jogar(jogo, rng, 40, anotar)
+os.kill(os.getpid(), signal.SIGKILL)
+"""
+    proc = subprocess.run([sys.executable, "-c", roteiro], cwd=RAIZ, capture_output=True, text=True)
+    assert proc.returncode == -signal.SIGKILL, proc.stderr
+    posicoes = proc.stdout.split()
+    assert len(posicoes) == 41
+    # Meia ação no fim do registro, como numa escrita interrompida
+    with open(os.path.join(str(tmp_path), ARQUIVO_REGISTRO), "ab") as f:
+        f.write(b"\x07")
+    jogo = recuperar(str(tmp_path))
+    assert jogo is not None
+    # Tudo o que foi esvaziado está lá; o que veio depois, só se a thread chegou a gravar
+    assert _chave(jogo) in posicoes
+
+
+def test_instantaneo_que_falha_nao_deixa_buraco_no_registro(tmp_path, monkeypatch):
+    original = spider_autosave._gravar_atomico
+    chamadas = []
+
+    def gravar(caminho, dados):
+        chamadas.append(caminho)
+        if len(chamadas) == 2:
+            raise OSError("disco cheio")
+        original(caminho, dados)
+
+    monkeypatch.setattr(spider_autosave, "_gravar_atomico", gravar)
+    salvamento = Autosave(str(tmp_path), instantaneo_a_cada=20, intervalo=0.001)
+    jogo = Jogo(Baralho(semente=8))
+    jogo.iniciar_jogo()
+    salvamento.iniciar(jogo)
+    rng = random.Random(8)
+    posicoes = []
+    jogar(jogo, rng, 30, lambda: (posicoes.append(_chave(jogo)), salvamento.esvaziar()))
+    assert salvamento.erro is not None
+    # O instantâneo da ação 20 falhou: vale o inicial mais as 19 ações do registro,
+    # e as seguintes não são anexadas ao registro antigo
+    registro = os.path.join(str(tmp_path), ARQUIVO_REGISTRO)
+    assert os.path.getsize(registro) == spider_autosave.CABECALHO_REGISTRO.size + 2 * 19
+    assert _chave(recuperar(str(tmp_path))) == posicoes[18]
+    jogar(jogo, rng, 15, lambda: posicoes.append(_chave(jogo)))
+    salvamento.fechar()
+    assert _chave(recuperar(str(tmp_path))) == posicoes[-1]
+
+
+def test_instantaneo_cortado_nao_tem_o_que_recuperar(tmp_path):
+    salvamento = Autosave(str(tmp_path))
+    jogo = Jogo(Baralho(semente=1))
+    jogo.iniciar_jogo()
+    salvamento.iniciar(jogo)
+    salvamento.fechar()
+    caminho = os.path.join(str(tmp_path), ARQUIVO_INSTANTANEO)
+    with open(caminho, "rb") as f:
+        dados = f.read()
+    assert _chave(recuperar(str(tmp_path))) == _chave(jogo)
+    for corte in (20, 60, len(dados) - 1):
+        with open(caminho, "wb") as f:
+            f.write(dados[:corte])
+        assert recuperar(str(tmp_path)) is None
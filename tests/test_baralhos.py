@@ -0,0 +1,34 @@
+import pytest
+
+from spider_baralhos import (
+    CABECALHO, DESCONHECIDO, FAIXAS, INSOLUVEL, RESOLVIDO, BaseBaralhos, gravar_base, montar_registros,
+)
+
+
+def test_insoluvel_e_desconhecido_em_faixas_separadas(tmp_path):
+    resultados = [(s, RESOLVIDO, 100 + s, 10 ** (s % 4)) for s in range(9)]
+    resultados += [(20, INSOLUVEL, 0, 5000), (21, DESCONHECIDO, 0, 200000),
+                   (22, INSOLUVEL, 0, 70), (23, DESCONHECIDO, 0, 200000)]
+    caminho = str(tmp_path / "baralhos.spdb")
+    gravar_base(caminho, montar_registros(resultados))
+    base = BaseBaralhos(caminho)
+    try:
+        assert [base.quantidade(f) for f in FAIXAS] == [3, 3, 3, 2, 2]
+        inicio, qtd = base.faixas["sem_solucao"]
+        assert {base.registro(i).semente for i in range(inicio, inicio + qtd)} == {20, 22}
+        assert all(base.registro(i).status == INSOLUVEL for i in range(inicio, inicio + qtd))
+        reg = base.sortear("desconhecido")
+        assert reg.semente in (21, 23) and reg.status == DESCONHECIDO
+        assert base.sortear("facil").resolvivel
+    finally:
+        base.fechar()
+
+
+def test_arquivo_cortado_da_value_error(tmp_path):
+    caminho = tmp_path / "baralhos.spdb"
+    gravar_base(str(caminho), montar_registros([(s, RESOLVIDO, 50, 100) for s in range(6)]))
+    dados = caminho.read_bytes()
+    for corte in (0, 3, CABECALHO.size - 1, len(dados) - 1):
+        caminho.write_bytes(dados[:corte])
+        with pytest.raises(ValueError):
+            BaseBaralhos(str(caminho))
@@ -0,0 +1,104 @@
+import queue
+import types
+
+import pytest
+
+from spider_cache import CachePosicoes, posicao_canonica
+from spider_dica import RespostaDica, TrabalhadorDica
+from spider_estado import EstadoCompacto
+from spider_solver import DESCONHECIDO, INSOLUVEL, RESOLVIDO
+
+# Duas sequências em jogo, com estoque; coluna 9 vazia
+PILHAS = [[7, 18], [3, 17, 14], [11], [9], [21], [19], [24, 16, 5], [12, 1], [25, 23], []]
+OCULTAS = [0, 1, 0, 0, 0, 0, 1, 1, 1, 0]
+ESTOQUE = [15, 8, 0, 10, 22, 13, 20, 4, 2, 6]
+ORDEM = [9, 0, 1, 2, 3, 4, 5, 6, 7, 8]
+
+
+def _estado(ordem=range(10), pos_estoque=0):
+    return EstadoCompacto([bytearray(PILHAS[i]) for i in ordem], [OCULTAS[i] for i in ordem],
+                          bytes(ESTOQUE), pos_estoque, bytearray([2, 2, 3, 3, 0, 0]))
+
+
+def test_colunas_permutadas_so_coincidem_sem_estoque():
+    assert posicao_canonica(_estado())[:2] != posicao_canonica(_estado(ORDEM))[:2]
+    assert posicao_canonica(_estado(pos_estoque=10))[:2] == \
+        posicao_canonica(_estado(ORDEM, pos_estoque=10))[:2]
+
+
+def test_movimento_traduzido_para_as_colunas_reais():
+    cache = CachePosicoes()
+    cache.guardar(_estado(pos_estoque=10), (0, 1, 5), RESOLVIDO, 7)
+    e = cache.buscar(_estado(ORDEM, pos_estoque=10))
+    assert e == ((1, 1, 6), RESOLVIDO, 7)
+    assert cache.buscar(_estado(ORDEM)) is None
+
+
+def test_verificador_barra_colisao_de_chave():
+    cache = CachePosicoes()
+    estado = _estado()
+    cache.guardar(estado, None, INSOLUVEL)
+    chave, verificador, _ = posicao_canonica(estado)
+    assert cache.buscar(estado).status == INSOLUVEL
+    _, canonico, status, distancia = cache._memoria[chave]
+    cache._memoria[chave] = (verificador ^ 1, canonico, status, distancia)
+    assert cache.buscar(estado) is None
+
+
+def test_disco_guarda_so_respostas_definitivas(tmp_path):
+    caminho = str(tmp_path / "dicas.sppc")
+    cache = CachePosicoes(caminho, max_disco=64)
+    cache.guardar(_estado(), (1, 1, 9), DESCONHECIDO)
+    cache.guardar(_estado(pos_estoque=10), None, INSOLUVEL)
+    assert cache.buscar(_estado()).status == DESCONHECIDO
+    cache.fechar()
+
+    cache = CachePosicoes(caminho, max_disco=64)
+    assert cache.buscar(_estado()) is None
+    assert cache.buscar(_estado(ORDEM, pos_estoque=10)) == (None, INSOLUVEL, -1)
+    assert cache.acertos_disco == 1
+    cache.fechar()
+
+
+def test_arquivo_que_nao_e_cache_nao_e_apagado(tmp_path):
+    caminho = tmp_path / "notas.txt"
+    caminho.write_bytes(b"lista de compras\n" * 4)
+    with pytest.raises(ValueError, match="não é um cache"):
+        CachePosicoes(str(caminho))
+    assert caminho.read_bytes() == b"lista de compras\n" * 4
+    # Arquivo vazio (ou de versão antiga) é recriado
+    vazio = tmp_path / "vazio.sppc"
+    vazio.write_bytes(b"")
+    CachePosicoes(str(vazio), max_disco=8).fechar()
+    assert vazio.read_bytes()[:4] == b"SPPC"
+
+
+class _Processo:
+    def is_alive(self):
+        return True
+
+
+def test_dica_desconhecida_no_cache_ainda_vai_ao_trabalhador(monkeypatch):
+    def iniciar(self):
+        self._pedidos = queue.Queue()
+        self._respostas = queue.Queue()
+        self._geracao = types.SimpleNamespace(value=0)
+        self._processo = _Processo()
+
+    monkeypatch.setattr(TrabalhadorDica, "_iniciar", iniciar)
+    estado = _estado(pos_estoque=10)
+    jogo = estado.para_jogo()
+    cache = CachePosicoes()
+    cache.guardar(estado, (0, 1, 5), DESCONHECIDO)
+    dica = TrabalhadorDica(cache)
+    dica.pedir(jogo)
+    assert dica.pensando
+    assert dica.coletar() == [RespostaDica(dica.geracao, (0, 1, 5), False, "parcial")]
+    geracao, pedido = dica._pedidos.get_nowait()
+    assert geracao == dica.geracao and pedido.chave() == EstadoCompacto.de_jogo(jogo).chave()
+
+    # Resposta definitiva no cache dispensa o trabalhador
+    cache.guardar(estado, (0, 1, 5), RESOLVIDO, 3)
+    dica.pedir(jogo)
+    assert not dica.pensando and dica._pedidos.empty()
+    assert dica.coletar() == [RespostaDica(dica.geracao, (0, 1, 5), True, RESOLVIDO, 3)]
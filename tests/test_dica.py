@@ -0,0 +1,57 @@
+import time
+
+from spider_dica import LIMITE_TEMPO, TrabalhadorDica
+from spider_regras import Baralho, Carta, Jogo
+from spider_solver import RESOLVIDO
+
+
+def _quase_ganho():
+    # Sete sequências na fundação; falta pôr o A na coluna do K..2
+    jogo = Jogo(Baralho([]))
+    jogo.fundacao.extend([[Carta(v, virada_para_cima=True) for v in range(13, 0, -1)]] * 7)
+    jogo.tableau[0].push([Carta(v, virada_para_cima=True) for v in range(13, 1, -1)])
+    jogo.tableau[1].push([Carta(1, virada_para_cima=True)])
+    return jogo
+
+
+def _esperar(dica, ate, prazo):
+    respostas = []
+    fim = time.monotonic() + prazo
+    while time.monotonic() < fim:
+        respostas += dica.coletar()
+        if ate(respostas):
+            break
+        time.sleep(0.01)
+    return respostas
+
+
+def test_dica_cancelada_quando_as_colunas_mudam():
+    # Semente 10 não tem solução: sem cancelamento a busca iria até LIMITE_TEMPO
+    jogo = Jogo(Baralho(semente=10))
+    jogo.iniciar_jogo()
+    dica = TrabalhadorDica()
+    try:
+        dica.pedir(jogo)
+        versoes = tuple(p.versao for p in jogo.tableau)
+        geracao = dica.geracao
+        # Primeira resposta parcial: o trabalhador já está buscando
+        assert _esperar(dica, bool, 30.0)
+        assert dica.pensando
+
+        # Como no laço da interface: a jogada muda as versões e a dica é descartada
+        assert jogo.distribuir_estoque()
+        assert tuple(p.versao for p in jogo.tableau) != versoes
+        dica.cancelar()
+        assert not dica.pensando and dica.geracao != geracao
+
+        inicio = time.monotonic()
+        dica.pedir(_quase_ganho())
+        respostas = _esperar(dica, lambda rs: any(r.final for r in rs), LIMITE_TEMPO + 5)
+        # A busca antiga parou: a nova termina bem antes do limite de tempo dela
+        assert time.monotonic() - inicio < LIMITE_TEMPO / 2
+        assert respostas and all(r.geracao == dica.geracao for r in respostas)
+        final = respostas[-1]
+        assert final.final and final.status == RESOLVIDO and final.movimento == (1, 1, 0)
+        assert not dica.pensando
+    finally:
+        dica.fechar()
@@ -0,0 +1,46 @@
+import random
+
+from spider_estado import EstadoCompacto, hash_jogo
+from spider_regras import Baralho, Jogo
+from spider_solver import aplicar_no_jogo, resolver
+
+
+def _confere(jogo):
+    assert hash_jogo(jogo) == EstadoCompacto.de_jogo(jogo).hash
+
+
+def test_hash_incremental_do_jogo_acompanha_jogadas_desfazer_e_refazer():
+    jogo = Jogo(Baralho(semente=0))
+    jogo.iniciar_jogo()
+    res = resolver(jogo, 200_000, 30.0)
+    assert res.resolvido
+    _confere(jogo)
+    # A solução passa por distribuições e por K→A completados (com carta revelada)
+    for mov in res.movimentos:
+        assert aplicar_no_jogo(jogo, mov)
+        _confere(jogo)
+    assert jogo.verificar_vitoria()
+    while jogo.desfazer():
+        _confere(jogo)
+    while jogo.refazer():
+        _confere(jogo)
+    assert jogo.verificar_vitoria()
+
+
+def test_hash_incremental_em_partida_aleatoria():
+    rng = random.Random(7)
+    jogo = Jogo(Baralho(semente=3))
+    jogo.iniciar_jogo()
+    _confere(jogo)
+    for _ in range(400):
+        movimentos = sorted(jogo.movimentos_validos())
+        sorteio = rng.random()
+        if sorteio < 0.15:
+            jogo.desfazer()
+        elif sorteio < 0.25:
+            jogo.refazer()
+        elif movimentos and sorteio < 0.95:
+            jogo.mover(*rng.choice(movimentos))
+        else:
+            jogo.distribuir_estoque()
+        _confere(jogo)
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from spider_estado import EstadoCompacto
+from spider_lote import ACAO_DISTRIBUIR, LoteJogos, checar_contra_objetos, codificar_acao
+from spider_regras import Baralho, Jogo
+from spider_solver import DISTRIBUIR, aplicar_no_jogo, resolver
+
+
+@pytest.mark.parametrize("semente", [0, 1, 2])
+def test_lote_igual_ao_motor_de_objetos(semente):
+    # Ações aleatórias válidas: máscara, aceitação e estado iguais a cada passo
+    assert checar_contra_objetos(16, 300, semente) > 0
+
+
+def test_lote_igual_ao_motor_de_objetos_ate_a_vitoria():
+    # Jogada aleatória quase nunca completa K→A; a solução do solver completa todos
+    jogo = Jogo(Baralho(semente=0))
+    jogo.iniciar_jogo()
+    res = resolver(jogo, 200_000, 30.0)
+    assert res.resolvido
+    lote = LoteJogos.novos([0])
+    for mov in res.movimentos:
+        acao = ACAO_DISTRIBUIR if mov == DISTRIBUIR else codificar_acao(*mov)
+        assert lote.mascara_acoes()[0, acao]
+        assert lote.aplicar(np.array([acao]))[0]
+        assert aplicar_no_jogo(jogo, mov)
+        assert lote.estado(0).chave() == EstadoCompacto.de_jogo(jogo).chave()
+    assert lote.vitorias()[0] and jogo.verificar_vitoria()
+
+
+def test_acao_invalida_nao_muda_o_estado():
+    lote = LoteJogos.novos([7])
+    jogo = Jogo(Baralho(semente=7))
+    jogo.iniciar_jogo()
+    antes = lote.estado(0).chave()
+    # Bloco que não existe: mais cartas do que a sequência do topo
+    invalida = codificar_acao(0, 13, 1)
+    assert not lote.mascara_acoes()[0, invalida]
+    assert not lote.aplicar(np.array([invalida]))[0]
+    assert lote.estado(0).chave() == antes
+    assert lote.mascara_acoes()[0, ACAO_DISTRIBUIR] == jogo.pode_distribuir()
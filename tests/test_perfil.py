@@ -0,0 +1,64 @@
+import json
+
+import pygame
+
+import spider_perfil
+from spider_perfil import Perfilador, percentil
+
+
+class _Relogio:
+    def __init__(self):
+        self.t = 100.0
+
+    def __call__(self):
+        return self.t
+
+
+def _quadro(perfil, relogio, ms_por_etapa):
+    perfil.inicio_quadro()
+    for etapa, ms in ms_por_etapa:
+        relogio.t += ms / 1000
+        perfil.marcar(etapa)
+    perfil.fim_quadro()
+
+
+def test_desligado_nao_guarda_nada(monkeypatch):
+    relogio = _Relogio()
+    monkeypatch.setattr(spider_perfil.time, "perf_counter", relogio)
+    perfil = Perfilador()
+    _quadro(perfil, relogio, [("eventos", 1), ("flip", 2)])
+    assert not perfil.quadros and not perfil.eventos
+
+
+def test_tempos_por_etapa_e_trace_dos_ultimos_segundos(monkeypatch, tmp_path):
+    relogio = _Relogio()
+    monkeypatch.setattr(spider_perfil.time, "perf_counter", relogio)
+    perfil = Perfilador(quadros_grafico=3, segundos_trace=1.0)
+    perfil.alternar()
+    for _ in range(5):
+        _quadro(perfil, relogio, [("eventos", 1), ("logica", 2), ("logica", 1), ("flip", 4)])
+    assert len(perfil.quadros) == 3
+    etapas, total = perfil.quadros[-1]
+    assert round(etapas["logica"], 6) == 3 and round(total, 6) == 8
+    assert percentil([t for _, t in perfil.quadros], 99) == total
+
+    # Um quadro muito depois empurra os antigos para fora da janela do trace
+    relogio.t += 5
+    _quadro(perfil, relogio, [("eventos", 1)])
+    caminho = perfil.exportar_trace(str(tmp_path / "trace.json"))
+    with open(caminho, encoding="utf-8") as f:
+        trace = json.load(f)
+    eventos = trace["traceEvents"]
+    assert [e["name"] for e in eventos] == ["eventos", "quadro"]
+    assert all(e["ph"] == "X" for e in eventos)
+    assert eventos[0]["dur"] == 1000.0 and eventos[1]["dur"] == 1000.0
+    assert eventos[0]["ts"] == eventos[1]["ts"] == round((relogio.t - 0.001) * 1e6, 1)
+
+    # O overlay desenha com o que estiver guardado
+    pygame.font.init()
+    surf = pygame.Surface((330, 220))
+    perfil.desenhar(surf, pygame.font.Font(None, 18), surf.get_rect())
+    assert surf.get_at((0, 0))[:3] == (90, 90, 110)
+
+    perfil.alternar()
+    assert not perfil.ativo and not perfil.eventos and not perfil.quadros
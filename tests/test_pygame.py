@@ -0,0 +1,285 @@
+import os
+import random
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pytest
+
+import spider_pygame as ui
+from spider_regras import Baralho, Carta, Jogo, Pilha
+
+
+@pytest.fixture(scope="module", autouse=True)
+def janela():
+    ui.inicializar_ui()
+
+
+def test_mensagens_dinamicas_num_lru_limitado():
+    atlas = ui.obter_atlas()
+    fixos = len(atlas.textos)
+    primeira = atlas.rotulo("Trace salvo em /tmp/0.json", ui.font_small, (255, 255, 255))
+    assert atlas.rotulo("Trace salvo em /tmp/0.json", ui.font_small, (255, 255, 255)) is primeira
+    for n in range(1, 3 * ui.MAX_ROTULOS):
+        atlas.rotulo(f"Movidas {n} carta(s)", ui.font_small, (255, 255, 255))
+        # A mensagem em uso continua sendo reaproveitada
+        assert atlas.rotulo("Trace salvo em /tmp/0.json", ui.font_small, (255, 255, 255)) is primeira
+    assert len(atlas.rotulos) == ui.MAX_ROTULOS
+    assert len(atlas.textos) == fixos
+    assert ("Movidas 1 carta(s)", id(ui.font_small), (255, 255, 255)) not in atlas.rotulos
+
+
+def _pilha(fechadas, abertas):
+    pilha = Pilha()
+    pilha.push([Carta(13 - k % 13, virada_para_cima=k >= fechadas) for k in range(fechadas + abertas)])
+    return pilha
+
+
+def _restaurar_layout():
+    ui.aplicar_layout(ui.LARGURA_BASE, ui.ALTURA_BASE)
+
+
+def test_layout_comprime_colunas_altas_e_reaproveita_offsets():
+    try:
+        layout = ui.LayoutPilhas()
+        curta = _pilha(3, 4)
+        offsets = layout.offsets(curta)
+        assert offsets == [0, 8, 16, 24, 52, 80, 108]
+        assert layout.offsets(curta) is offsets
+
+        alta = _pilha(5, 30)
+        offsets = layout.offsets(alta)
+        passo = offsets[-1] - offsets[-2]
+        assert ui.px(ui.OVERLAP_FACEUP_MIN) <= passo < ui.OVERLAP_FACEUP
+        assert ui.TOP_TABLEAU_Y + offsets[-1] + ui.CARTA_A <= ui.ALTURA - ui.px(20)
+        # Muito alta: para no mínimo e passa do fim da janela
+        muito_alta = _pilha(5, 80)
+        offsets = layout.offsets(muito_alta)
+        assert offsets[-1] - offsets[-2] == ui.px(ui.OVERLAP_FACEUP_MIN)
+
+        # Nova versão da pilha ou novo layout refazem a lista
+        antes = layout.offsets(curta)
+        curta.push_carta(Carta(6, virada_para_cima=True))
+        assert layout.offsets(curta) is not antes and len(layout.offsets(curta)) == 8
+        antes = layout.offsets(curta)
+        ui.aplicar_layout(600, 400)
+        assert layout.offsets(curta)[-1] == 3 * ui.OVERLAP_FACEDOWN + 4 * ui.OVERLAP_FACEUP
+        assert layout.offsets(curta) is not antes
+    finally:
+        _restaurar_layout()
+
+
+def test_hit_test_com_bisect_bate_com_varredura():
+    jogo = Jogo(Baralho(semente=2))
+    jogo.iniciar_jogo()
+    for k in range(12):
+        jogo.tableau[0].push_carta(Carta(13 - k, virada_para_cima=True))
+    rng = random.Random(4)
+    for _ in range(3000):
+        pos = (rng.randrange(-10, ui.LARGURA + 10), rng.randrange(-10, ui.ALTURA + 10))
+        esperado = next((i for i in range(10) if ui.RECTS_PILHAS[i].collidepoint(pos)), None)
+        assert ui.hit_test_pilha(jogo, pos) == esperado
+        if esperado is None:
+            continue
+        pilha = jogo.tableau[esperado]
+        offsets = ui.offsets_pilha(pilha)
+        x0 = ui.COLUNAS_X[esperado]
+        # Carta de cima no ponto: a última cujo retângulo contém o clique
+        cobertas = [k for k, y in enumerate(offsets)
+                    if x0 <= pos[0] < x0 + ui.CARTA_L
+                    and y <= pos[1] - ui.TOP_TABLEAU_Y < y + ui.CARTA_A]
+        indice = len(pilha.cartas) - 1 - cobertas[-1] if cobertas else None
+        assert ui.coordenada_para_indice_carta(pilha, pos[0], pos[1], x0) == indice
+
+
+def test_cache_de_pilhas_invalida_pela_versao():
+    cache = ui.CachePilhas()
+    pilha = _pilha(2, 3)
+    surf = cache.superficie(0, pilha)
+    assert cache.superficie(0, pilha) is surf
+    # Variante recortada (arrasto) não derruba a imagem completa
+    recorte = cache.superficie(0, pilha, 2)
+    assert recorte.get_height() < surf.get_height()
+    assert cache.superficie(0, pilha) is surf and cache.superficie(0, pilha, 2) is recorte
+    pilha.push_carta(Carta(10, virada_para_cima=True))
+    nova = cache.superficie(0, pilha)
+    assert nova is not surf and nova.get_height() > surf.get_height()
+    # Outra pilha na mesma coluna (jogo novo) também invalida, mesmo com a mesma versão
+    outra = _pilha(2, 3)
+    outra.versao = pilha.versao
+    assert cache.superficie(0, outra) is not nova
+    # Assim como trocar o atlas (tema)
+    surf = cache.superficie(0, outra)
+    ui.trocar_tema()
+    try:
+        assert cache.superficie(0, outra) is not surf
+    finally:
+        ui.trocar_tema()
+
+
+def test_main_redesenha_so_o_que_mudou_e_dorme_parado(monkeypatch):
+    jogos = []
+    criar_jogo = ui.criar_jogo
+    monkeypatch.setattr(ui, "criar_jogo", lambda *a, **k: jogos.append(criar_jogo(*a, **k)) or jogos[-1])
+    quadros = []
+
+    def update(rects):
+        quadros.append([ui.pygame.Rect(r) for r in rects])
+        if len(quadros) == 1:
+            # Começa a arrastar a carta do topo da coluna 0 e move um pouco
+            pilha = jogos[0].tableau[0]
+            x = ui.COLUNAS_X[0] + 10
+            y = ui.TOP_TABLEAU_Y + ui.offsets_pilha(pilha)[-1] + 10
+            ui.pygame.event.post(ui.pygame.event.Event(ui.pygame.MOUSEBUTTONDOWN, pos=(x, y), button=1))
+            ui.pygame.event.post(ui.pygame.event.Event(ui.pygame.MOUSEMOTION, pos=(x + 40, y + 30),
+                                                       rel=(40, 30), buttons=(1, 0, 0)))
+
+    esperas = []
+
+    def wait(*args):
+        esperas.append(args)
+        return ui.pygame.event.Event(ui.pygame.QUIT)
+
+    monkeypatch.setattr(ui.pygame.display, "update", update)
+    monkeypatch.setattr(ui.pygame.display, "flip", lambda: None)
+    monkeypatch.setattr(ui.pygame.event, "wait", wait)
+    monkeypatch.setattr(ui.pygame, "quit", lambda: None)
+    ui.pygame.event.clear()
+    with pytest.raises(SystemExit):
+        ui.main(animar=False)
+
+    assert quadros[0] == [ui.AREA_TELA]
+    # O arrasto só suja a coluna de origem e o bloco (antes e depois de mover)
+    assert len(quadros) == 2 and ui.AREA_TELA not in quadros[1]
+    assert all(ui.AREA_TABLEAU.contains(r.clip(ui.AREA_TELA)) for r in quadros[1])
+    assert ui.coluna_area(0) in quadros[1]
+    # Sem nada mudando, o laço espera o próximo evento (sem prazo: não há mensagem nem dica)
+    assert esperas == [()]
+
+
+def test_caminho_da_fonte_fica_em_cache_no_disco(monkeypatch, tmp_path):
+    arquivo = tmp_path / "cache" / "fontes.json"
+    fonte = tmp_path / "DejaVuSans.ttf"
+    fonte.write_bytes(b"")
+    buscas = []
+
+    def match_font(nome):
+        buscas.append(nome)
+        return str(fonte) if nome == "DejaVu Sans" and fonte.exists() else None
+
+    monkeypatch.setattr(ui, "CACHE_FONTES", str(arquivo))
+    monkeypatch.setattr(ui.pygame.font, "match_font", match_font)
+    assert ui.caminho_fonte() == str(fonte) and arquivo.exists()
+    assert ui.caminho_fonte("Inexistente") is None
+    # Encontrada ou não, a resposta vem do arquivo nas próximas vezes
+    assert ui.caminho_fonte() == str(fonte) and ui.caminho_fonte("Inexistente") is None
+    assert buscas == ["DejaVu Sans", "Inexistente"]
+
+    # Fonte removida do sistema ou cache ilegível: procura de novo
+    fonte.unlink()
+    assert ui.caminho_fonte() is None
+    arquivo.write_text("{corrompido", encoding="utf-8")
+    assert ui.caminho_fonte("Inexistente") is None
+    assert buscas == ["DejaVu Sans", "Inexistente", "DejaVu Sans", "Inexistente"]
+
+
+def test_layout_escalado_e_atlas_por_tamanho(monkeypatch):
+    monkeypatch.setattr(ui, "_atlas_cache", type(ui._atlas_cache)())
+    try:
+        ui.aplicar_layout(600, 500)
+        assert ui.ESCALA == 0.5 and (ui.CARTA_L, ui.CARTA_A) == (45, 60)
+        assert ui.RECTS_PILHAS[9].right <= ui.LARGURA - ui.MARGEM_X
+        assert ui.AREA_RODAPE.bottom == ui.ALTURA and ui.theme_btn.right < ui.LARGURA
+        ui.aplicar_layout(100, 100)
+        assert ui.ESCALA == 0.4
+
+        atlas = {}
+        for largura in (1200, 600, 720, 840):
+            ui.aplicar_layout(largura, largura * 2 // 3)
+            atlas[largura] = ui.obter_atlas()
+            assert ui.obter_atlas().carta(Carta(1)).get_width() == ui.CARTA_L
+        # Voltar a um tamanho recente reaproveita o atlas e as fontes dele
+        ui.aplicar_layout(600, 400)
+        assert ui.obter_atlas() is atlas[600] and ui.font_small is atlas[600].fontes[2]
+        assert len(ui._atlas_cache) == ui.MAX_ATLAS
+        # Um quinto tamanho derruba o usado há mais tempo
+        ui.aplicar_layout(960, 640)
+        ui.obter_atlas()
+        assert len(ui._atlas_cache) == ui.MAX_ATLAS
+        ui.aplicar_layout(1200, 800)
+        assert ui.obter_atlas() is not atlas[1200]
+    finally:
+        _restaurar_layout()
+
+
+def _animar(jogo, acao, agora=1000):
+    anim = ui.Animacoes()
+    antes = anim.posicoes(jogo)
+    assert acao()
+    anim.iniciar(antes, jogo, agora)
+    return anim
+
+
+def test_animacoes_de_mover_virar_distribuir_e_completar():
+    jogo = Jogo(Baralho([Carta(v) for v in (3, 4, 5, 6, 7, 8, 9, 10, 11, 12)]))
+    jogo.tableau[0].push([Carta(5)] + [Carta(v, virada_para_cima=True) for v in range(13, 1, -1)])
+    jogo.tableau[1].push([Carta(9), Carta(3, virada_para_cima=True)])
+    jogo.tableau[2].push([Carta(4, virada_para_cima=True)])
+    jogo.tableau[3].push([Carta(1, virada_para_cima=True)])
+    for i in range(4, 10):
+        jogo.tableau[i].push([Carta(i + 2, virada_para_cima=True)])
+
+    # 3 sobre o 4: uma carta voa, a de baixo vira depois que ela sai
+    anim = _animar(jogo, lambda: jogo.mover(1, 1, 2))
+    assert anim.ativa and anim.animadas == {(1, 0), (2, 1)} and anim.primeira == {1: 0, 2: 1}
+    voo, virada = sorted(anim.voos, key=lambda v: v.coluna, reverse=True)
+    assert voo.fim == 1000 + ui.DURACAO_MOVER and virada.etapas == []
+    assert virada.virar == (voo.fim, ui.DURACAO_VIRAR)
+    # No meio do caminho a carta está entre a origem e o destino
+    x, _ = voo.posicao(1000 + ui.DURACAO_MOVER // 2)
+    assert ui.COLUNAS_X[1] < x < ui.COLUNAS_X[2]
+    sujos = anim.avancar(1000 + ui.DURACAO_MOVER // 2)
+    assert len(sujos) == 4 and anim.ativa
+    # Ao terminar, devolve a posição final e a animação acaba
+    sujos = anim.avancar(virada.virar[0] + ui.DURACAO_VIRAR)
+    final = ui.pygame.Rect(ui.COLUNAS_X[2], ui.TOP_TABLEAU_Y + ui.offsets_pilha(jogo.tableau[2])[1],
+                           ui.CARTA_L, ui.CARTA_A)
+    assert final in sujos and not anim.ativa and not anim.animadas
+    assert anim.avancar(5000) == []
+
+    # Distribuição: uma coluna depois da outra, virando no caminho
+    anim = _animar(jogo, jogo.distribuir_estoque, agora=0)
+    assert len(anim.voos) == 10
+    voos = sorted(anim.voos, key=lambda v: v.coluna)
+    assert [v.coluna for v in voos] == list(range(10))
+    assert [v.etapas[0][0] for v in voos] == [ui.ATRASO_DISTRIBUIR * i for i in range(10)]
+    assert all(not v.cima0 and v.cima1 and v.virar is not None for v in anim.voos)
+    anim.avancar(9 * ui.ATRASO_DISTRIBUIR + ui.DURACAO_DISTRIBUIR)
+    assert not anim.ativa
+    assert jogo.desfazer()
+
+    # A sequência completa passa pelo lugar onde se formou e vai para a fundação
+    anim = _animar(jogo, lambda: jogo.mover(3, 1, 0), agora=0)
+    fundacao = [v for v in anim.voos if v.coluna == ui.FUNDACAO]
+    assert len(fundacao) == 13
+    ultimo = max(v.fim for v in fundacao)
+    assert ultimo == ui.DURACAO_MOVER + 12 * ui.ATRASO_FUNDACAO + ui.DURACAO_FUNDACAO
+    # A carta escondida debaixo do K só vira depois que a sequência saiu
+    revelada, = [v for v in anim.voos if v.coluna == 0]
+    assert revelada.etapas == [] and revelada.virar == (ultimo, ui.DURACAO_VIRAR)
+    anim.avancar(ultimo)
+    assert anim.ativa and anim.animadas == {(0, 0)}
+    anim.avancar(ultimo + ui.DURACAO_VIRAR)
+    assert not anim.ativa
+
+
+def test_animacoes_limpar_e_desenhar():
+    jogo = Jogo(Baralho(semente=3))
+    jogo.iniciar_jogo()
+    anim = _animar(jogo, jogo.distribuir_estoque, agora=0)
+    surf = ui.pygame.Surface((ui.LARGURA, ui.ALTURA))
+    anim.avancar(ui.DURACAO_DISTRIBUIR // 2)
+    anim.desenhar(surf, ui.obter_atlas())
+    ui.desenhar_tableau(jogo, {"arrastando": False, "origem": None, "cartas": [], "mouse": (0, 0)},
+                        set(), anim)
+    anim.limpar()
+    assert not anim.ativa and anim.avancar(0) == []
@@ -0,0 +1,138 @@
+import random
+
+from spider_regras import Baralho, Carta, Jogo, Pilha
+
+
+def _varredura(jogo):
+    # Versão direta (sem índice) das consultas de Jogo
+    movimentos = {(i, qtd, j)
+                  for i, origem in enumerate(jogo.tableau)
+                  for qtd in range(1, len(origem.cartas) + 1)
+                  for j, destino in enumerate(jogo.tableau)
+                  if i != j and origem.pode_mover_bloco_para(qtd, destino)}
+    pode_distribuir = (jogo.estoque.restante() >= 10
+                       and all(not p.esta_vazia() for p in jogo.tableau))
+    return movimentos, pode_distribuir, not movimentos and not pode_distribuir
+
+
+def test_indice_e_flags_acompanham_a_partida():
+    rng = random.Random(5)
+    for semente in range(3):
+        jogo = Jogo(Baralho(semente=semente))
+        jogo.iniciar_jogo()
+        for _ in range(300):
+            movimentos, pode_distribuir, travado = _varredura(jogo)
+            assert jogo.movimentos_validos() == movimentos
+            assert jogo.pode_distribuir() == pode_distribuir
+            assert jogo.sem_movimentos_validos() == travado
+            sorteio = rng.random()
+            if sorteio < 0.1:
+                jogo.desfazer()
+            elif sorteio < 0.15:
+                jogo.refazer()
+            elif movimentos and sorteio < 0.9:
+                jogo.mover(*rng.choice(sorted(movimentos)))
+            elif not jogo.distribuir_estoque() and travado:
+                break
+
+
+def _metadados(pilha):
+    # _visiveis e _seq recalculados do zero, carta a carta
+    visiveis, seq = [], []
+    for k, c in enumerate(pilha.cartas):
+        if not c.virada_para_cima:
+            visiveis.append(0)
+            seq.append(0)
+            continue
+        visiveis.append(visiveis[-1] + 1 if k and visiveis[-1] else 1)
+        b = pilha.cartas[k - 1] if k else None
+        continua = (b is not None and b.virada_para_cima
+                    and b.valor == c.valor + 1 and b.naipe == c.naipe)
+        seq.append(seq[-1] + 1 if continua else 1)
+    return visiveis, seq
+
+
+def _confere(pilha):
+    visiveis, seq = _metadados(pilha)
+    assert pilha._visiveis == visiveis and pilha._seq == seq
+    assert pilha._indice_inicio_bloco_visivel() == len(pilha.cartas) - (visiveis[-1] if visiveis else 0)
+    assert pilha.tamanho_sequencia_topo() == (seq[-1] if seq else 0)
+
+
+def test_metadados_da_pilha_em_push_pop_virar_e_desvirar():
+    pilha = Pilha()
+    _confere(pilha)
+    # K♠ Q♠ viradas para baixo, depois J♠ 10♠ 9♥ 8♥ para cima
+    pilha.push([Carta(13), Carta(12)])
+    pilha.push([Carta(11, virada_para_cima=True), Carta(10, virada_para_cima=True)])
+    pilha.push_carta(Carta(9, "♥", True))
+    pilha.push_carta(Carta(8, "♥", True))
+    _confere(pilha)
+    assert pilha._seq == [0, 0, 1, 2, 1, 2] and pilha._visiveis == [0, 0, 1, 2, 3, 4]
+    pilha.pop(4)
+    assert pilha.virar_topo() and pilha._seq == [0, 1] and pilha._visiveis == [0, 1]
+    # J♠ sobre a Q♠ recém-virada continua a sequência
+    pilha.push_carta(Carta(11, virada_para_cima=True))
+    assert pilha.tamanho_sequencia_topo() == 2
+    pilha.pop(1)
+    pilha.desvirar_topo()
+    assert pilha._seq == [0, 0] and pilha.bloco_visivel() == []
+    assert pilha.virar_topo() and pilha.tamanho_sequencia_topo() == 1
+
+    rng = random.Random(8)
+    for _ in range(3000):
+        sorteio = rng.random()
+        if sorteio < 0.4 or not pilha.cartas:
+            pilha.push([Carta(rng.randint(1, 13), rng.choice("♠♥"), rng.random() < 0.7)
+                        for _ in range(rng.randint(1, 4))])
+        elif sorteio < 0.7:
+            pilha.pop(rng.randint(1, len(pilha.cartas)))
+        elif sorteio < 0.85:
+            pilha.virar_topo()
+        else:
+            pilha.desvirar_topo()
+        _confere(pilha)
+
+
+def _foto(jogo):
+    return ([[(c.valor, c.naipe, c.virada_para_cima) for c in p.cartas] for p in jogo.tableau],
+            [[(c.valor, c.virada_para_cima) for c in seq] for seq in jogo.fundacao],
+            jogo.estoque.pos, [p._seq[:] for p in jogo.tableau])
+
+
+def test_desfazer_e_refazer_atravessam_sequencia_completa_e_distribuicao():
+    from spider_estado import EstadoCompacto
+
+    jogo = Jogo(Baralho([Carta(v) for v in (3, 4, 5, 6, 7, 8, 9, 10, 11, 12)]))
+    # Coluna 0: carta escondida + K..2; coluna 1: carta escondida + A
+    jogo.tableau[0].push([Carta(5)] + [Carta(v, virada_para_cima=True) for v in range(13, 1, -1)])
+    jogo.tableau[1].push([Carta(9), Carta(1, virada_para_cima=True)])
+    for i in range(2, 10):
+        jogo.tableau[i].push([Carta(i, virada_para_cima=True)])
+    fotos = [_foto(jogo)]
+    hashes = [jogo.hash_zobrist]
+
+    assert jogo.mover(1, 1, 0)
+    jogada = jogo.diario.feitas[-1]
+    assert jogada.completou and jogada.virou_destino and jogada.virou_origem
+    assert len(jogo.fundacao) == 1 and jogo.tableau[0].cartas[-1].virada_para_cima
+    fotos.append(_foto(jogo))
+    hashes.append(jogo.hash_zobrist)
+    assert jogo.distribuir_estoque()
+    fotos.append(_foto(jogo))
+    hashes.append(jogo.hash_zobrist)
+
+    for k in (1, 0):
+        assert jogo.desfazer()
+        assert _foto(jogo) == fotos[k] and jogo.hash_zobrist == hashes[k]
+    assert not jogo.desfazer()
+    for k in (1, 2):
+        assert jogo.refazer()
+        assert _foto(jogo) == fotos[k] and jogo.hash_zobrist == hashes[k]
+    assert not jogo.refazer()
+    assert jogo.hash_zobrist == EstadoCompacto.de_jogo(jogo).hash
+    # Jogada nova depois de desfazer descarta o que havia para refazer
+    jogo.desfazer()
+    jogo.desfazer()
+    assert jogo.pode_refazer()
+    assert jogo.mover(2, 1, 3) and not jogo.pode_refazer()
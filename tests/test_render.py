@@ -0,0 +1,41 @@
+import re
+
+import pytest
+
+from spider_render import ler_movimentos, main
+from spider_replay import ACAO_DISTRIBUIR, GravadorReplay, codificar_movimento
+
+
+def _arquivo(tmp_path, texto):
+    caminho = tmp_path / "jogo.txt"
+    caminho.write_text(texto, encoding="utf-8")
+    return str(caminho)
+
+
+def test_le_movimentos_e_semente(tmp_path):
+    caminho = _arquivo(tmp_path, "semente 42\n# comentário\n1 mover 3 1 7\ndistribuir\n")
+    rep = ler_movimentos(caminho)
+    assert rep.semente == 42
+    assert list(rep.acoes) == [codificar_movimento(3, 1, 7), ACAO_DISTRIBUIR]
+
+
+@pytest.mark.parametrize("linha", [
+    "mover -1 1 2", "mover 0 1 10", "mover 0 0 2", "mover 0 14 2", "mover 0 x 2",
+    "semente -5", "semente", "semente 18446744073709551616",
+])
+def test_linha_invalida_aponta_arquivo_e_linha(tmp_path, linha):
+    caminho = _arquivo(tmp_path, "semente 1\nmover 0 1 2\n" + linha + "\n")
+    with pytest.raises(ValueError, match="^" + re.escape(caminho) + ":3: "):
+        ler_movimentos(caminho)
+
+
+def test_jogo_alem_do_fim_do_replay_e_erro_de_uso(tmp_path, capsys):
+    caminho = str(tmp_path / "um.sprp")
+    gravador = GravadorReplay(caminho)
+    gravador.iniciar(3)
+    gravador.fechar()
+    with pytest.raises(SystemExit) as saida:
+        main(["--replay", caminho, "--jogo", "1", "--saida", str(tmp_path / "quadros")])
+    assert saida.value.code == 2
+    erro = capsys.readouterr().err
+    assert erro.startswith("usage:") and "--jogo 1:" in erro and "não tem a partida 1" in erro
@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+import spider_replay
+from spider_estado import EstadoCompacto
+from spider_regras import Baralho, Jogo
+from spider_replay import GravadorReplay, ReplayInvalido, ler_replays, reproduzir
+
+
+def _partida(gravador, semente, rng, passos):
+    jogo = Jogo(Baralho(semente=semente))
+    jogo.iniciar_jogo()
+    gravador.iniciar(semente)
+    jogo.gravador = gravador
+    for _ in range(passos):
+        movimentos = sorted(jogo.movimentos_validos())
+        sorteio = rng.random()
+        if sorteio < 0.1:
+            jogo.desfazer()
+        elif sorteio < 0.15:
+            jogo.refazer()
+        elif movimentos and sorteio < 0.95:
+            jogo.mover(*rng.choice(movimentos))
+        else:
+            jogo.distribuir_estoque()
+    return jogo
+
+
+@pytest.mark.parametrize("bloco", [spider_replay.TAM_BLOCO, 64])
+def test_gravar_e_reproduzir_varias_partidas(tmp_path, monkeypatch, bloco):
+    # Bloco pequeno força partidas e sementes cortadas entre leituras
+    monkeypatch.setattr(spider_replay, "TAM_BLOCO", bloco)
+    caminho = str(tmp_path / "jogos.sprp")
+    rng = random.Random(3)
+    gravador = GravadorReplay(caminho)
+    finais = [_partida(gravador, s, rng, passos) for s, passos in ((1, 40), (2 ** 64 - 1, 1500), (5, 0))]
+    gravador.fechar()
+    # Reabrir anexa ao mesmo arquivo; a última partida fica sem FIM (processo caiu)
+    gravador = GravadorReplay(caminho)
+    finais.append(_partida(gravador, 9, rng, 30))
+    gravador._esvaziar()
+    gravador.arquivo.close()
+
+    replays = list(ler_replays(caminho))
+    assert [r.semente for r in replays] == [1, 2 ** 64 - 1, 5, 9]
+    assert [r.completo for r in replays] == [True, True, True, False]
+    for rep, jogo in zip(replays, finais):
+        assert EstadoCompacto.de_jogo(reproduzir(rep)).chave() == EstadoCompacto.de_jogo(jogo).chave()
+
+
+def test_acao_recusada_no_replay(tmp_path):
+    caminho = str(tmp_path / "jogo.sprp")
+    gravador = GravadorReplay(caminho)
+    gravador.iniciar(4)
+    gravador.desfazer()  # nada para desfazer no começo
+    gravador.fechar()
+    rep = next(ler_replays(caminho))
+    with pytest.raises(ReplayInvalido):
+        reproduzir(rep)
@@ -0,0 +1,81 @@
+import asyncio
+import json
+import os
+
+from spider_servidor import ServidorSpider
+
+
+def _pedir(servidor, pedido):
+    linha = pedido if isinstance(pedido, bytes) else json.dumps(pedido).encode()
+    return json.loads(asyncio.run(servidor.responder(linha)))
+
+
+def test_semente_booleana_e_rejeitada(tmp_path):
+    servidor = ServidorSpider(str(tmp_path))
+    r = _pedir(servidor, {"id": 1, "op": "novo", "semente": True})
+    assert not r["ok"] and "semente" in r["erro"]
+    assert _pedir(servidor, {"op": "novo", "semente": 5})["semente"] == 5
+
+
+def test_erro_de_validacao_nao_vira_json_invalido(tmp_path):
+    servidor = ServidorSpider(str(tmp_path))
+    assert _pedir(servidor, b"{nao e json")["erro"] == "JSON inválido"
+    assert _pedir(servidor, b"\xff\xfe\n")["erro"] == "JSON inválido"
+    sid = _pedir(servidor, {"op": "novo", "semente": 1})["sessao"]
+    r = _pedir(servidor, {"op": "mover", "sessao": sid, "src": "0", "qtd": 1, "dst": 1})
+    assert not r["ok"] and r["erro"] == "mover precisa de src, qtd e dst inteiros"
+
+
+def test_sessao_corrompida_no_disco(tmp_path):
+    servidor = ServidorSpider(str(tmp_path))
+    sids = [_pedir(servidor, {"op": "novo", "semente": s})["sessao"] for s in range(3)]
+    servidor.despejar_todas()
+    for sid, cortar in zip(sids, (5, 40)):
+        caminho = os.path.join(str(tmp_path), sid + ".ses")
+        with open(caminho, "rb") as f:
+            dados = f.read()
+        with open(caminho, "wb") as f:
+            f.write(dados[:cortar])
+        r = _pedir(servidor, {"id": 7, "op": "estado", "sessao": sid})
+        assert r == {"ok": False, "erro": "sessão corrompida", "id": 7}
+    r = _pedir(servidor, {"op": "estado", "sessao": sids[2]})
+    assert r["ok"] and r["jogadas"] == 0
+
+
+def test_op_que_nao_e_string(tmp_path):
+    servidor = ServidorSpider(str(tmp_path))
+    for op in ([], {}, 3, None):
+        r = _pedir(servidor, {"id": 2, "op": op})
+        assert r == {"ok": False, "erro": "op deve ser uma string", "id": 2}
+
+
+def test_falha_no_despejo_responde_e_mantem_a_conexao(tmp_path):
+    diretorio = tmp_path / "sessoes"
+    servidor = ServidorSpider(str(diretorio), max_sessoes=1)
+
+    async def conversar():
+        srv = await asyncio.start_server(servidor._conexao, "127.0.0.1", 0)
+        porta = srv.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", porta)
+
+        async def pedir(pedido):
+            writer.write(json.dumps(pedido).encode() + b"\n")
+            await writer.drain()
+            return json.loads(await reader.readline())
+
+        respostas = [await pedir({"op": []})]
+        respostas.append(await pedir({"op": "novo", "semente": 1}))
+        os.rmdir(str(diretorio))  # o despejo da primeira sessão não tem onde gravar
+        respostas.append(await pedir({"op": "novo", "semente": 2}))
+        respostas.append(await pedir({"op": "estado", "sessao": respostas[1]["sessao"]}))
+        writer.close()
+        srv.close()
+        await srv.wait_closed()
+        return respostas
+
+    invalido, primeira, falhou, estado = asyncio.run(conversar())
+    assert invalido["erro"] == "op deve ser uma string"
+    assert not falhou["ok"] and falhou["erro"].startswith("erro interno: FileNotFoundError")
+    # A sessão que não conseguiu ir para o disco continua em memória
+    assert estado["ok"] and estado["jogadas"] == 0
+    assert list(servidor.sessoes) == [primeira["sessao"]]
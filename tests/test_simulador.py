@@ -0,0 +1,32 @@
+import pytest
+
+from spider_simulador import intervalo_wilson, simular, simular_partida
+
+
+def test_intervalo_wilson_fica_entre_zero_e_um():
+    assert intervalo_wilson(0, 0) == (0.0, 0.0)
+    for n in (1, 7, 40, 1000):
+        baixo, alto = intervalo_wilson(0, n)
+        assert baixo == 0.0 and f"{100 * baixo:.2f}" == "0.00" and 0 < alto < 1
+        baixo, alto = intervalo_wilson(n, n)
+        assert 0 < baixo < 1 and alto == 1.0
+    baixo, alto = intervalo_wilson(16, 40)
+    assert baixo == pytest.approx(0.2635, abs=1e-4) and alto == pytest.approx(0.5540, abs=1e-4)
+
+
+@pytest.mark.parametrize("politica", ["gulosa", "dica"])
+def test_simulacao_deterministica_ganha_partidas(politica):
+    resultados = sorted(simular(10, 1, politica), key=lambda r: r["semente"])
+    assert [r["semente"] for r in resultados] == list(range(10))
+    # Mesma semente, mesma partida
+    again = simular_partida((resultados[1]["semente"], politica))
+    assert {k: v for k, v in again.items() if k != "segundos"} == \
+        {k: v for k, v in resultados[1].items() if k != "segundos"}
+    # As duas políticas ganham a semente 1 (que o solver resolve) e só
+    # perdem depois de distribuir todo o estoque
+    assert resultados[1]["vitoria"] and resultados[1]["fundacao"] == 8
+    for r in resultados:
+        assert r["vitoria"] == (r["fundacao"] == 8)
+        assert r["vitoria"] or r["distribuicoes"] == 5
+    if politica == "gulosa":
+        assert sum(r["vitoria"] for r in resultados) >= 5
@@ -0,0 +1,66 @@
+import spider_solver
+from spider_estado import EstadoCompacto
+from spider_solver import DESCONHECIDO, INSOLUVEL, RESOLVIDO, aplicar, aplicar_no_jogo, resolver
+
+
+def _estado(pilhas, ocultas, estoque, fundacao):
+    return EstadoCompacto([bytearray(p) for p in pilhas], list(ocultas), bytes(estoque), 0,
+                          bytearray(fundacao))
+
+
+# Restam duas sequências (♠ e ♥) e a coluna 9 está vazia. Para ganhar é preciso
+# levar a coluna 2 inteira para a 9 antes de distribuir: o resultado só difere
+# de encher a 9 com outra carta pela ordem das colunas, e a carta k do estoque
+# cai na coluna k.
+PILHAS = [[7, 18], [3, 17, 14], [11], [9], [21], [19], [24, 16, 5], [12, 1], [25, 23], []]
+OCULTAS = [0, 1, 0, 0, 0, 0, 1, 1, 1, 0]
+ESTOQUE = [15, 8, 0, 10, 22, 13, 20, 4, 2, 6]
+FUNDACAO = [2, 2, 3, 3, 0, 0]
+
+
+def test_chave_canonica_respeita_ordem_das_colunas_com_estoque():
+    a = _estado(PILHAS, OCULTAS, ESTOQUE, FUNDACAO)
+    ordem = [9, 0, 1, 2, 3, 4, 5, 6, 7, 8]
+    b = _estado([PILHAS[i] for i in ordem], [OCULTAS[i] for i in ordem], ESTOQUE, FUNDACAO)
+    assert a.chave_canonica() != b.chave_canonica()
+    assert a.hash_canonico() != b.hash_canonico()
+    # Sem estoque a ordem das colunas não importa mais
+    a.pos_estoque = b.pos_estoque = len(ESTOQUE)
+    assert a.chave_canonica() == b.chave_canonica()
+    assert a.hash_canonico() == b.hash_canonico()
+
+
+def test_nao_declara_insoluvel_partida_que_depende_da_ordem_das_colunas():
+    estado = _estado(PILHAS, OCULTAS, ESTOQUE, FUNDACAO)
+    res = resolver(estado, 2_000_000, 60.0)
+    assert res.status == RESOLVIDO
+    copia = estado.copia()
+    assert all(aplicar(copia, m) for m in res.movimentos)
+    assert copia.verificar_vitoria()
+    # A solução também vale no motor de objetos
+    jogo = estado.para_jogo()
+    assert all(aplicar_no_jogo(jogo, m) for m in res.movimentos)
+    assert jogo.verificar_vitoria()
+
+
+def test_cancelar_entre_as_buscas_nao_declara_insoluvel(monkeypatch):
+    # Dez ases e nenhuma carta no estoque: nenhum movimento, a busca esgota na hora
+    estado = EstadoCompacto([bytearray([0]) for _ in range(10)], [0] * 10, b"", 0,
+                            bytearray([0, 0, 1, 1, 2, 2]))
+    assert resolver(estado).status == INSOLUVEL
+
+    buscas = []
+    terminadas = []
+    original = spider_solver._buscar
+
+    def buscar(raiz, completo, *args):
+        buscas.append(completo)
+        r = original(raiz, completo, *args)
+        terminadas.append(r[0])
+        return r
+
+    monkeypatch.setattr(spider_solver, "_buscar", buscar)
+    # parar() só fica verdadeiro depois que a primeira busca (com poda) terminou
+    res = resolver(estado, parar=lambda: bool(terminadas))
+    assert buscas == [False] and terminadas == [INSOLUVEL]
+    assert res.status == DESCONHECIDO